@@ -2,16 +2,24 @@
 # pylint: disable=invalid-name,broad-except,missing-function-docstring,too-few-public-methods,missing-class-docstring
 # pylint: disable=missing-module-docstring,line-too-long,too-many-locals,logging-fstring-interpolation
 import abc
+import archive_cache
 import argparse
+import ast
+import concurrent.futures
+import contextlib
 import functools
-import itertools
+import hashlib
+import inspect
+import io
 import json
 import logging
 import os
+import queue
 import re
-import subprocess
+import shutil
 import sys
 import tempfile
+import threading
 import yaml
 import ipaddress
 import pathlib
@@ -19,22 +27,29 @@ from collections import OrderedDict, defaultdict, Counter
 from datetime import datetime
 from textwrap import dedent
 
+import cluster_events
+import cluster_model
 import colorlog
 import consts
 import dateutil.parser
+import download_cache
+import insights_runner
 import jira
-import nestedarchive
+import log_templates
+import logrus_logs
+import must_gather_scan
+import remote_tar
 import requests
+import run_metrics
+import signature_results
+import similarity_groups
 import tqdm
-from fuzzywuzzy import fuzz
+import triage_state
 from tabulate import tabulate
 
 DEFAULT_DAYS_TO_HANDLE = 30
 
 
-NEW_LOG_BUNDLE_PATH = "*_bootstrap_*.tar/*_bootstrap_*.tar.gz/logs_host_*/log-bundle-*.tar.gz/log-bundle-*/"
-OLD_LOG_BUNDLE_PATH = "*_bootstrap_*.tar.gz/logs_host_*/log-bundle-*.tar.gz/log-bundle-*/"
-
 FIELD_LABELS = "labels"
 CUSTOM_FIELD_USER = "12319044"
 CUSTOM_FIELD_DOMAIN = "12319045"
@@ -104,6 +119,264 @@ def days_ago(datestr):
         return 9999
 
 
+class ConcurrencyLimiter:
+    """
+    Caps the number of concurrent requests made to a remote service when
+    tickets are processed by multiple workers. A limit of None means no cap.
+    """
+
+    def __init__(self, limit=None):
+        self.set_limit(limit)
+
+    def set_limit(self, limit):
+        self._semaphore = threading.BoundedSemaphore(limit) if limit else None
+
+    def __enter__(self):
+        if self._semaphore is not None:
+            self._semaphore.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._semaphore is not None:
+            self._semaphore.release()
+
+
+LOG_SERVER_LIMITER = ConcurrencyLimiter()
+JIRA_LIMITER = ConcurrencyLimiter()
+
+
+def limit_jira_concurrency(jira_client, limiter=JIRA_LIMITER):
+    """
+    Route every request of the Jira client through the given limiter. Issue and
+    comment resources share the client session, so their updates are limited too.
+    """
+    session = jira_client._session
+    request = session.request
+
+    @functools.wraps(request)
+    def limited_request(*args, **kwargs):
+        with limiter:
+            return request(*args, **kwargs)
+
+    session.request = limited_request
+    return jira_client
+
+
+def count_jira_requests(jira_client, metrics=None):
+    """
+    Count every request of the Jira client as a Jira read or write of the
+    signature being measured, see run_metrics
+    """
+    session = jira_client._session
+    request = session.request
+
+    @functools.wraps(request)
+    def counted_request(method, *args, **kwargs):
+        (metrics or RUN_METRICS).count("jira_reads" if method.upper() == "GET" else "jira_writes")
+        return request(method, *args, **kwargs)
+
+    session.request = counted_request
+    return jira_client
+
+
+# Measurements of the current run, see run_metrics
+RUN_METRICS = run_metrics.RunMetrics()
+
+
+def _count_log_server_request(response, *args, **kwargs):
+    RUN_METRICS.count("log_server_requests")
+
+
+# Shared by everything that talks to the log server, so connections are reused and requests are counted
+LOG_SERVER_SESSION = requests.Session()
+LOG_SERVER_SESSION.mount("http://", requests.adapters.HTTPAdapter(pool_maxsize=64))
+LOG_SERVER_SESSION.mount("https://", requests.adapters.HTTPAdapter(pool_maxsize=64))
+LOG_SERVER_SESSION.hooks["response"].append(_count_log_server_request)
+
+
+# State of previous runs, see configure_state_store
+STATE_STORE = None
+
+
+def configure_state_store(path):
+    global STATE_STORE
+    STATE_STORE = triage_state.TriageStateStore(path) if path else None
+
+
+# Results of the signatures on every ticket, see configure_results_store
+RESULTS_STORE = None
+
+
+def configure_results_store(path):
+    global RESULTS_STORE
+    RESULTS_STORE = signature_results.SignatureResultsStore(path) if path else None
+
+
+# Templates of the host logs mined across tickets, see configure_log_templates and RareLogTemplates
+LOG_TEMPLATES = None
+
+
+def configure_log_templates(path):
+    global LOG_TEMPLATES
+    LOG_TEMPLATES = log_templates.LogTemplateStore(path) if path else None
+
+
+# Part of every signature_version, bump it when changing shared code that
+# signatures reach through attributes rather than by name (e.g. TicketContext,
+# HostLogScans, JiraTicketSnapshot, cluster_model, logrus_logs, log_templates) in a way that changes their results
+SIGNATURE_ENGINE_VERSION = 1
+
+
+def _code_names(obj):
+    """
+    The global names referenced by the code of a function or class, including nested functions
+    """
+    if isinstance(obj, type):
+        codes = []
+        for attribute in vars(obj).values():
+            if isinstance(attribute, (staticmethod, classmethod)):
+                attribute = attribute.__func__
+            if isinstance(attribute, property):
+                codes.extend(f.__code__ for f in (attribute.fget, attribute.fset) if f is not None)
+            elif inspect.isfunction(attribute):
+                codes.append(attribute.__code__)
+    else:
+        codes = [obj.__code__]
+
+    names = set()
+    while codes:
+        code = codes.pop()
+        names.update(code.co_names)
+        codes.extend(const for const in code.co_consts if inspect.iscode(const))
+    return names
+
+
+@functools.lru_cache(maxsize=None)
+def _top_level_sources(module_name):
+    """
+    The source of every top-level function and class of a module, by name
+    """
+    source = inspect.getsource(sys.modules[module_name])
+    lines = source.splitlines(keepends=True)
+    return {
+        node.name: "".join(lines[node.lineno - 1 : node.end_lineno])
+        for node in ast.parse(source).body
+        if isinstance(node, (ast.FunctionDef, ast.ClassDef))
+    }
+
+
+@functools.lru_cache(maxsize=None)
+def signature_version(signature_class):
+    """
+    The version of a signature's code. Changes whenever the code of the class,
+    of its base classes, or of the functions and classes of this module they
+    use by name (transitively) changes, or when SIGNATURE_ENGINE_VERSION is bumped.
+    """
+    module_globals = sys.modules[signature_class.__module__].__dict__
+    try:
+        module_sources = _top_level_sources(signature_class.__module__)
+    except (OSError, TypeError):
+        return None
+
+    pending = [cls for cls in signature_class.__mro__ if cls.__module__ == signature_class.__module__]
+    seen = set()
+    sources = []
+    while pending:
+        obj = pending.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        if obj.__name__ not in module_sources:
+            return None
+        sources.append(module_sources[obj.__name__])
+
+        for name in _code_names(obj):
+            dependency = module_globals.get(name)
+            if (inspect.isfunction(dependency) or isinstance(dependency, type)) and getattr(
+                dependency, "__module__", None
+            ) == signature_class.__module__:
+                pending.append(dependency)
+
+    digest = hashlib.sha256(str(SIGNATURE_ENGINE_VERSION).encode())
+    for source in sorted(sources):
+        digest.update(source.encode())
+    return digest.hexdigest()
+
+
+# Persistent cache of log server downloads, see configure_download_cache
+DOWNLOAD_CACHE = None
+
+
+def configure_download_cache(directory, max_bytes=download_cache.DEFAULT_MAX_BYTES):
+    global DOWNLOAD_CACHE
+    DOWNLOAD_CACHE = (
+        download_cache.DownloadCache(directory, max_bytes=max_bytes, session=LOG_SERVER_SESSION) if directory else None
+    )
+
+
+# Archives opened by tickets, kept open for the next tickets within a byte budget, see configure_archive_cache
+ARCHIVE_CACHE = archive_cache.ArchiveCache()
+
+
+def configure_archive_cache(max_bytes=archive_cache.DEFAULT_MAX_BYTES):
+    global ARCHIVE_CACHE
+    ARCHIVE_CACHE.close()
+    ARCHIVE_CACHE = archive_cache.ArchiveCache(max_bytes=max_bytes)
+
+
+# Insights runs of MustGatherAnalysis, in the background of the tickets, see configure_insights_runner
+INSIGHTS_RUNNER = insights_runner.InsightsRunner()
+
+
+def configure_insights_runner(workers=1, timeout=insights_runner.DEFAULT_TIMEOUT_SECONDS, cache_dir=None):
+    global INSIGHTS_RUNNER
+    INSIGHTS_RUNNER.close()
+    INSIGHTS_RUNNER = insights_runner.InsightsRunner(workers=workers, timeout=timeout, cache_dir=cache_dir)
+
+
+def get_log_server_file_validator(url):
+    """
+    Returns a string that changes whenever the contents of the given log server
+    file change (based on its ETag / Last-Modified / Content-Length), "missing" if
+    the file doesn't exist, or None if the server doesn't provide validators
+    """
+    with LOG_SERVER_LIMITER:
+        res = LOG_SERVER_SESSION.head(url, allow_redirects=True)
+    if res.status_code == 404:
+        return "missing"
+    res.raise_for_status()
+
+    validators = [res.headers.get(header) for header in ("ETag", "Last-Modified", "Content-Length")]
+    if not any(validators[:2]):
+        return None
+    return "/".join(validator or "" for validator in validators)
+
+
+def get_log_server_file(url):
+    with LOG_SERVER_LIMITER:
+        if DOWNLOAD_CACHE is not None:
+            return DOWNLOAD_CACHE.get(url)
+
+        res = LOG_SERVER_SESSION.get(url)
+        res.raise_for_status()
+        return res.content
+
+
+def stream_log_server_file(url, use):
+    """
+    Calls use with an iterator over the contents of the given log server file,
+    in chunks, and returns what it returns. Unlike get_log_server_file, the
+    contents are never all in memory.
+    """
+    with LOG_SERVER_LIMITER:
+        if DOWNLOAD_CACHE is not None:
+            return DOWNLOAD_CACHE.stream(url, use)
+
+        with LOG_SERVER_SESSION.get(url, stream=True) as res:
+            res.raise_for_status()
+            return use(res.iter_content(chunk_size=download_cache.CHUNK_SIZE))
+
+
 class FailedToGetMetadataException(Exception):
     pass
 
@@ -112,75 +385,65 @@ class FailedToGetInstallConfigException(Exception):
     pass
 
 
-@functools.lru_cache(maxsize=1000)
 def get_metadata_json(cluster_url):
     try:
-        res = requests.get("{}/metadata.json".format(cluster_url))
-        res.raise_for_status()
-        return res.json()
+        return json.loads(get_log_server_file("{}/metadata.json".format(cluster_url)))
     except Exception as e:
         raise FailedToGetMetadataException from e
 
 
-@functools.lru_cache(maxsize=1000)
 def get_installconfig_yaml(cluster_url):
     try:
-        res = requests.get("{}/cluster_files/install-config.yaml".format(cluster_url))
-        res.raise_for_status()
-        return yaml.safe_load(res._content)
+        return yaml.safe_load(get_log_server_file("{}/cluster_files/install-config.yaml".format(cluster_url)))
     except Exception as e:
         raise FailedToGetInstallConfigException from e
 
 
-def partition(iterator, predicate):
+def _get_cluster_events(logs_url, cluster_id):
     """
-    Partition an iterator into partitions separated by items that match
-    a given predicate.
-
-    For example:
-
-    > partition(range(10), lambda x: x % 4 == 0)
-    [[1, 2, 3], [5, 6, 7], [9]]
+    The events of the latest installation attempt of the cluster, for which
+    this ticket was created, as a cluster_events.EventsStore. The events file
+    is parsed as it's downloaded, the events of previous attempts are only counted.
     """
-    return [
-        list(partition)
-        for predicate_result, partition in itertools.groupby(iterator, key=predicate)
-        if not predicate_result
-    ]
+    return stream_log_server_file(
+        f"{logs_url}/cluster_{cluster_id}_events.json",
+        lambda chunks: cluster_events.EventsStore.from_events(cluster_events.iter_json_array(chunks), EVENT_MESSAGES),
+    )
 
 
-@functools.lru_cache(maxsize=1000)
-def _get_all_cluster_events(logs_url, cluster_id):
-    """
-    WARNING - It's likely you do not want to use this function
-    as it returns all recorded events for this cluster rather than
-    just the events relevant to the latest installation attempt for
-    which this ticket was created
-    """
-    res = requests.get(f"{logs_url}/cluster_{cluster_id}_events.json")
-    res.raise_for_status()
-    return res.json()
+def get_remote_archive(tar_url):
+    if DOWNLOAD_CACHE is None:
+        # Only the members that signatures actually read are downloaded, each request holds the limiter
+        return remote_tar.RangeRemoteArchive(tar_url, session=LOG_SERVER_SESSION, limiter=LOG_SERVER_LIMITER)
+
+    with LOG_SERVER_LIMITER:
+        # On the cache's filesystem, so the archive is hard-linked rather than copied
+        tmpdir = DOWNLOAD_CACHE.mkdtemp()
+        root_tar_file_path = os.path.join(tmpdir, os.path.basename(tar_url))
+        try:
+            DOWNLOAD_CACHE.fetch_to(tar_url, root_tar_file_path)
+        except Exception:
+            shutil.rmtree(tmpdir, ignore_errors=True)
+            raise
+        return remote_tar.LocalNestedArchive(root_tar_file_path, tmpdir=tmpdir)
 
 
-def _partition_cluster_events(logs_url, cluster_id):
+class _MeteredArchive:
     """
-    Use the reset event to partition the events list into separate installations
+    Counts the bytes read from an archive as archive_bytes of the signature being measured
     """
-    return partition(
-        _get_all_cluster_events(logs_url, cluster_id), lambda event: event["name"] == "cluster_installation_reset"
-    )
-
 
-def get_cluster_installation_events(logs_url, cluster_id):
-    # Use just the last partition, as it contains all the events that apply to
-    # this current installation, as the logs for this failure were collected
-    # right after this installation failed, before the cluster was reset.
-    return _partition_cluster_events(logs_url, cluster_id)[-1]
+    def __init__(self, archive):
+        self._archive = archive
 
+    def __getattr__(self, name):
+        return getattr(self._archive, name)
 
-@functools.lru_cache(maxsize=100)
-def get_remote_archive(tar_url):
-    return nestedarchive.RemoteNestedArchive(tar_url, init_download=True)
+    def get(self, path, *args, **kwargs):
+        content = self._archive.get(path, *args, **kwargs)
+        if isinstance(content, (str, bytes)):
+            RUN_METRICS.count("archive_bytes", len(content))
+        return content
 
 
 class FailedToGetLogsTarException(Exception):
@@ -195,53 +458,124 @@ def get_triage_logs_tar(triage_url, cluster_id):
         raise FailedToGetLogsTarException from e
 
 
-def get_controller_logs(triage_url):
-    return get_triage_logs_tar(triage_url=triage_url, cluster_id=get_metadata_json(triage_url)["cluster"]["id"]).get(
-        "controller_logs.tar.gz/assisted-installer-controller-*.logs"
-    )
+class TriageLogsIndex:
+    """
+    Lookups in a cluster's logs tar by host ID and by control-plane node IP.
 
+    The logs of every host are in a logs_host_<id> directory, in one of two layouts:
+    - new: <host>.tar/<host>.tar.gz/logs_host_<id>/
+    - old (TODO(MGMT-13705): drop once MGMT-13454 is in production): <host>.tar.gz/logs_host_<id>/
 
-def get_host_log_file(triage_logs_tar, host_id, filename):
-    # The file is already uniquely determined by the host_id, we can omit the hostname
-    hostname = "*"
+    The bootstrap host's logs have the log bundle, which has a
+    control-plane/<node IP>/ directory per control-plane node.
 
-    new_logs_path = f"{hostname}.tar/{hostname}.tar.gz/logs_host_{host_id}/{filename}"
-    old_logs_path = f"{hostname}.tar.gz/logs_host_{host_id}/{filename}"
-    try:
-        agent_logs = triage_logs_tar.get(new_logs_path)
-    except FileNotFoundError:  # backward compatibility
-        # TODO(MGMT-13705): Remove this when MGMT-13454 is in production
-        logger.warning(f"Could not find logs under {new_logs_path}, attempting {old_logs_path}")
-        return triage_logs_tar.get(old_logs_path)
+    Every lookup is resolved once, from the member index of the archive (see
+    remote_tar), and answered from memory afterwards.
+    """
 
-    return agent_logs
+    HOST_ARCHIVES = {"new": "*.tar/*.tar.gz", "old": "*.tar.gz"}
+    BOOTSTRAP_ARCHIVES = {"new": "*_bootstrap_*.tar/*_bootstrap_*.tar.gz", "old": "*_bootstrap_*.tar.gz"}
 
+    def __init__(self, triage_logs_tar):
+        self.archive = triage_logs_tar
+        self._host_dirs = None
+        self._bootstrap = None
+        self._node_dirs = None
 
-def get_journal(triage_logs_tar, host_ip, journal_file):
-    new_logs_path = NEW_LOG_BUNDLE_PATH + f"control-plane/{host_ip}/journals/{journal_file}"
-    old_logs_path = OLD_LOG_BUNDLE_PATH + f"control-plane/{host_ip}/journals/{journal_file}"
-    try:
-        logs = triage_logs_tar.get(new_logs_path)
-    except FileNotFoundError:  # backward compatibility
-        # TODO(MGMT-13705): Remove this when MGMT-13454 is in production
-        logger.warning(f"Could not find the journal log under {new_logs_path}, attempting {old_logs_path}")
-        return triage_logs_tar.get(old_logs_path)
+    def _host_dir(self, archive_path):
+        root_dir = self.archive.root_dir(archive_path)
+        if root_dir is None or not root_dir.startswith("logs_host_"):
+            return None
+        return f"{archive_path}/{root_dir}"
+
+    def host_dir(self, host_id):
+        """
+        Path of the logs_host_<id> directory of the given host
+        """
+        if self._host_dirs is None:
+            self._host_dirs = {}
+            for pattern in self.HOST_ARCHIVES.values():
+                for archive_path in self.archive.glob(pattern):
+                    host_dir = self._host_dir(archive_path)
+                    if host_dir is not None:
+                        self._host_dirs[host_dir.rsplit("/logs_host_", 1)[1]] = host_dir
 
-    return logs
+        try:
+            return self._host_dirs[host_id]
+        except KeyError:
+            raise FileNotFoundError(f"The logs tar doesn't have the logs of host {host_id}") from None
 
+    def _bootstrap_host(self):
+        """
+        The layout of the bootstrap host's logs and the path of their directory
+        """
+        if self._bootstrap is None:
+            self._bootstrap = next(
+                (
+                    (layout, host_dir)
+                    for layout, pattern in self.BOOTSTRAP_ARCHIVES.items()
+                    for host_dir in map(self._host_dir, self.archive.glob(pattern))
+                    if host_dir is not None
+                ),
+                (None, None),
+            )
+        return self._bootstrap
 
-def get_events_by_host(logs_url, cluster_id):
-    events_by_host = defaultdict(list)
-    for event in get_cluster_installation_events(logs_url, cluster_id):
-        if "host_id" not in event:
-            # Cluster-level event, no host_id associated with it
-            continue
-        events_by_host[event["host_id"]].append(event)
-    return events_by_host
+    @property
+    def layout(self):
+        """
+        "new" or "old", see the class docstring, None if there are no bootstrap host logs
+        """
+        return self._bootstrap_host()[0]
 
+    @property
+    def log_bundle_path(self):
+        """
+        Path of the log bundle directory, with a trailing slash
+        """
+        bootstrap_dir = self._bootstrap_host()[1]
+        if bootstrap_dir is None:
+            raise FileNotFoundError("The logs tar doesn't have the logs of the bootstrap host")
+        return f"{bootstrap_dir}/log-bundle-*.tar.gz/log-bundle-*/"
 
-def get_event_timestamp(event):
-    return dateutil.parser.isoparse(event["event_time"])
+    def node_dirs(self):
+        """
+        Node IP to the path of its directory in the log bundle, for every control-plane node
+        """
+        if self._node_dirs is None:
+            self._node_dirs = {
+                node_dir.rsplit("/", 1)[1]: node_dir
+                for node_dir in self.archive.glob(self.log_bundle_path + "control-plane/*")
+            }
+        return self._node_dirs
+
+    def node_dir(self, node_ip):
+        try:
+            return self.node_dirs()[node_ip]
+        except KeyError:
+            raise FileNotFoundError(f"The log bundle doesn't have the logs of node {node_ip}") from None
+
+
+def get_host_log_file(triage_logs_index, host_id, filename):
+    return triage_logs_index.archive.get(f"{triage_logs_index.host_dir(host_id)}/{filename}")
+
+
+def _is_missing_input_error(error):
+    """
+    Whether loading an input failed because it doesn't exist, rather than
+    because of e.g. a transient log server error
+    """
+    while error is not None:
+        if isinstance(error, FileNotFoundError):
+            return True
+        if isinstance(error, requests.exceptions.HTTPError):
+            return error.response is not None and error.response.status_code == 404
+        error = error.__cause__
+    return False
+
+
+def get_journal(triage_logs_index, host_ip, journal_file):
+    return triage_logs_index.archive.get(f"{triage_logs_index.node_dir(host_ip)}/journals/{journal_file}")
 
 
 class FailedToGetMustgatherException(Exception):
@@ -258,10 +592,653 @@ def get_mustgather(triage_logs_tar):
         raise FailedToGetMustgatherException from e
 
 
+# Patterns of the event messages signatures look for, see TicketContext.events_store
+EVENT_MESSAGES = cluster_events.MessageClassifier()
+
+
+class MatchCollector:
+    """
+    Line consumer that collects the matches of a regex, optionally stopping after
+    a limit. Use limit=1 when only the first match (or whether there is any) matters.
+    """
+
+    def __init__(self, pattern, limit=None):
+        self.pattern = pattern
+        self.limit = limit
+        self.matches = []
+        self.done = False
+
+    def feed(self, line):
+        match = self.pattern.search(line)
+        if match is None:
+            return
+
+        self.matches.append(match)
+        if self.limit is not None and len(self.matches) >= self.limit:
+            self.done = True
+
+
+class RecordCollector:
+    """
+    Record consumer that collects the logrus records (see logrus_logs) for
+    which predicate is true, optionally stopping after a limit
+    """
+
+    def __init__(self, predicate, limit=None):
+        self.predicate = predicate
+        self.limit = limit
+        self.records = []
+        self.done = False
+
+    def feed_record(self, record):
+        if not self.predicate(record):
+            return
+
+        self.records.append(record)
+        if self.limit is not None and len(self.records) >= self.limit:
+            self.done = True
+
+
+class TemplateCollector:
+    """
+    Record consumer that mines the templates of the logrus records, with their
+    level as first token (see log_templates), and keeps the first message of
+    every template as an example. It goes through the whole log, at a bounded
+    cost per record.
+    """
+
+    def __init__(self):
+        self.miner = log_templates.TemplateMiner()
+        self.examples = {}
+        self.done = False
+
+    def feed_record(self, record):
+        template = self.miner.add_tokens([record.level] + log_templates.tokenize(record.msg))
+        self.examples.setdefault(template.id, record.msg)
+
+
+class HostLogScans:
+    """
+    Scans the per-host log files of a ticket (agent.logs, journal.logs, ...) in
+    a single pass per file. Signatures register a line consumer factory for a
+    file before running. The first time the results for a file are requested,
+    the file of every host is read and iterated once, and each line is fed to
+    a fresh consumer of every registered signature for that host.
+
+    A consumer is any object with a feed(line) method and a done attribute,
+    see MatchCollector. Consumers with a feed_record(record) method instead
+    are fed the logrus records of the lines, see RecordCollector, each line is
+    parsed once for all of them.
+    """
+
+    def __init__(self, context):
+        self._context = context
+        self._factories = defaultdict(dict)
+        self._results = defaultdict(dict)
+        self._prefetched_files = {}
+
+    def register(self, filename, key, consumer_factory):
+        self._factories[filename][key] = consumer_factory
+
+    def results(self, filename, key):
+        """
+        Returns a dict of host ID to the consumer of the given key, for every
+        host that has the given file
+        """
+        if key not in self._results[filename]:
+            if key not in self._factories[filename]:
+                raise KeyError(f"{key} didn't register a scan of {filename}")
+            pending = {
+                pending_key: factory
+                for pending_key, factory in self._factories[filename].items()
+                if pending_key not in self._results[filename]
+            }
+            self._results[filename].update(self._scan(filename, pending))
+
+        # The scan may have happened for another signature, the caller still depends on the logs
+        self._context.consumed_inputs.update(("metadata", "logs_tar"))
+        return self._results[filename][key]
+
+    def prefetch(self):
+        """
+        Download the registered files of every host ahead of the scans
+        """
+        for filename in self._factories:
+            for host in self._context.cluster["hosts"]:
+                try:
+                    logs = get_host_log_file(self._context.logs_index, host["id"], filename)
+                except FileNotFoundError:
+                    logs = None
+                self._prefetched_files[(filename, host["id"])] = logs
+
+    def _host_log_file(self, filename, host_id):
+        if (filename, host_id) not in self._prefetched_files:
+            return get_host_log_file(self._context.logs_index, host_id, filename)
+
+        logs = self._prefetched_files.pop((filename, host_id))
+        if logs is None:
+            raise FileNotFoundError(f"{filename} of host {host_id}")
+        return logs
+
+    def _scan(self, filename, factories):
+        results = {key: {} for key in factories}
+        for host in self._context.cluster["hosts"]:
+            try:
+                logs = self._host_log_file(filename, host["id"])
+            except FileNotFoundError:
+                continue
+
+            consumers = [(key, factory()) for key, factory in factories.items()]
+            for key, consumer in consumers:
+                results[key][host["id"]] = consumer
+
+            line_consumers = [consumer for _key, consumer in consumers if not hasattr(consumer, "feed_record")]
+            record_consumers = [consumer for _key, consumer in consumers if hasattr(consumer, "feed_record")]
+            for line in io.StringIO(logs):
+                line = line.rstrip("\n")
+                for consumer in line_consumers:
+                    consumer.feed(line)
+                if record_consumers and (record := logrus_logs.parse_line(line)) is not None:
+                    for consumer in record_consumers:
+                        consumer.feed_record(record)
+                if any(consumer.done for consumer in line_consumers + record_consumers):
+                    line_consumers = [consumer for consumer in line_consumers if not consumer.done]
+                    record_consumers = [consumer for consumer in record_consumers if not consumer.done]
+                    if not line_consumers and not record_consumers:
+                        break
+
+        return results
+
+
+class JiraTicketSnapshot:
+    """
+    The Jira state of a single triage ticket - its fields and comments -
+    fetched once, on first use, and shared by all the signatures that run on
+    the ticket. Writes go through the snapshot, which applies them to its local
+    copy as well, so later signatures see them without fetching the ticket again.
+
+    With defer_writes, writes are only applied locally and queued until flush
+    is called, e.g. by the writer stage of the process_issues pipeline. Writes
+    are attributed to the signature that made them, see writes_by, so a failed
+    write only affects the later writes of the same signature.
+    """
+
+    def __init__(self, jira_client, issue_key, defer_writes=False):
+        self._jira_client = jira_client
+        self.issue_key = issue_key
+        self._issue = None
+        self._comments = None
+        self._pending_writes = [] if defer_writes else None
+        self._writer = None
+
+    @property
+    def issue(self):
+        if self._issue is None:
+            self._issue = self._jira_client.issue(self.issue_key, fields="*all")
+        return self._issue
+
+    @property
+    def fields(self):
+        return self.issue.fields
+
+    @property
+    def comments(self):
+        if self._comments is None:
+            comment_field = getattr(self.fields, "comment", None)
+            if comment_field is not None and len(comment_field.comments) >= comment_field.total:
+                self._comments = list(comment_field.comments)
+            else:
+                # Jira only returns the first page of comments with the issue
+                self._comments = self._jira_client.comments(self.issue_key)
+        return self._comments
+
+    def add_comment(self, body):
+        if self._pending_writes is None:
+            comment = self._jira_client.add_comment(self.issue_key, body)
+        else:
+            comment = _PendingComment(body)
+            self._write(lambda: self._jira_client.add_comment(self.issue_key, comment.body))
+        self.comments.append(comment)
+        return comment
+
+    def update_comment(self, comment, body):
+        if not isinstance(comment, _PendingComment):
+            self._write(functools.partial(self._put, comment, {"body": body}))
+            comment.raw["body"] = body
+        # The update of a comment that wasn't added yet is folded into its addition
+        comment.body = body
+
+    def update_fields(self, fields):
+        self._write(functools.partial(self._put, self.issue, {"fields": dict(fields)}))
+        for name, value in fields.items():
+            setattr(self.fields, name, value)
+            self.issue.raw["fields"][name] = value
+
+    def add_attachment(self, path):
+        with open(path, "rb") as f:
+            content = f.read()
+        self._write(
+            lambda: self._jira_client.add_attachment(
+                issue=self.issue_key, attachment=io.BytesIO(content), filename=os.path.basename(path)
+            )
+        )
+
+    def linked_issue_keys(self, link_type):
+        """
+        The keys of the tickets linked to this one with link_type (its name, inward or outward description)
+        """
+        keys = set()
+        for link in getattr(self.fields, "issuelinks", None) or []:
+            if link_type not in (link.type.name, link.type.inward, link.type.outward):
+                continue
+            other_issue = getattr(link, "outwardIssue", None) or getattr(link, "inwardIssue", None)
+            if other_issue is not None:
+                keys.add(other_issue.key)
+        return keys
+
+    def create_issue_link(self, link_type, other_issue_key):
+        self._write(lambda: self._jira_client.create_issue_link(link_type, self.issue_key, other_issue_key))
+
+    def after_writes(self, callback):
+        """
+        Call callback once all the writes made so far have been sent to Jira
+        """
+        self._write(callback)
+
+    @contextlib.contextmanager
+    def writes_by(self, writer):
+        """
+        Attribute the writes made within the block to writer (a signature name)
+        """
+        self._writer = writer
+        try:
+            yield
+        finally:
+            self._writer = None
+
+    def flush(self):
+        """
+        Send the deferred writes to Jira, in order. A failed write is logged,
+        and the later writes of the same writer (including its after_writes
+        callbacks) are dropped, other writers aren't affected.
+        """
+        if self._pending_writes is None:
+            return
+
+        pending_writes, self._pending_writes = self._pending_writes, []
+        failed_writers = set()
+        for writer, write in pending_writes:
+            if writer in failed_writers:
+                continue
+            try:
+                with RUN_METRICS.measure(self.issue_key, writer or "(writes)"):
+                    write()
+            except Exception:
+                logger.exception(f"Error writing {writer or 'changes'} to {self.issue_key}")
+                failed_writers.add(writer)
+
+    def _write(self, write):
+        if self._pending_writes is None:
+            write()
+        else:
+            self._pending_writes.append((self._writer, write))
+
+    def _put(self, resource, data):
+        # Unlike this, Resource.update fetches the whole resource again after writing it
+        self._jira_client._session.put(resource.self, data=json.dumps(data))
+
+
+class _PendingComment:
+    """
+    Local copy of a comment whose addition was deferred, see JiraTicketSnapshot
+    """
+
+    def __init__(self, body):
+        self.body = body
+
+
+CLUSTER_ID_DESCRIPTION_REGEX = re.compile(r"\*Cluster ID:\* \[([^|\]]+)\|")
+
+
+def get_cluster_id_from_issue(issue):
+    """
+    The cluster ID of a triage ticket, from its Cluster ID field once
+    FailureDescription filled it in, or else from its description
+    """
+    raw_fields = getattr(issue, "raw", None) or {}
+    cluster_id = raw_fields.get("fields", {}).get(custom_field_name(CUSTOM_FIELD_CLUSTER_ID))
+    if cluster_id:
+        return cluster_id.strip()
+
+    description = raw_fields.get("fields", {}).get("description") or ""
+    if m := CLUSTER_ID_DESCRIPTION_REGEX.search(description):
+        return m.group(1).strip()
+    return None
+
+
+class ClusterTickets:
+    """
+    The keys of the triage tickets of clusters, by cluster ID, shared by the
+    tickets of a run, see AllInstallationAttemptsSignature.
+
+    The clusters of the tickets of a run are looked up ahead of processing
+    them, see prefetch, with queries covering CLUSTERS_PER_QUERY clusters each
+    that only fetch the Cluster ID field. Any other cluster is looked up on
+    its first use.
+
+    Links created during the run are recorded as well, so the tickets of a
+    cluster don't link back to tickets that already linked to them.
+    """
+
+    CLUSTERS_PER_QUERY = 50
+    PAGE_SIZE = 100
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._keys = {}
+        self._links = set()
+
+    def prefetch(self, jira_client, cluster_ids):
+        with self._lock:
+            missing = sorted(set(cluster_ids) - self._keys.keys())
+        for start in range(0, len(missing), self.CLUSTERS_PER_QUERY):
+            self._search(jira_client, missing[start : start + self.CLUSTERS_PER_QUERY])
+
+    def ticket_keys(self, jira_client, cluster_id):
+        with self._lock:
+            keys = self._keys.get(cluster_id)
+        if keys is None:
+            keys = self._search(jira_client, [cluster_id])[cluster_id]
+        return keys
+
+    def _search(self, jira_client, cluster_ids):
+        field = custom_field_name(CUSTOM_FIELD_CLUSTER_ID)
+        clusters = " OR ".join(f'cf[{CUSTOM_FIELD_CLUSTER_ID}] ~ "{cluster_id}"' for cluster_id in cluster_ids)
+        query = f"project = AITRIAGE AND ({clusters}) ORDER BY key"
+
+        found = {cluster_id: [] for cluster_id in cluster_ids}
+        start_at = 0
+        while True:
+            page = jira_client.search_issues(query, startAt=start_at, maxResults=self.PAGE_SIZE, fields=[field])
+            for issue in page:
+                # The ~ operator is a text search, so it may match other clusters too
+                cluster_id = (issue.raw["fields"].get(field) or "").strip()
+                if cluster_id in found:
+                    found[cluster_id].append(issue.key)
+            start_at += len(page)
+            if not page or start_at >= page.total:
+                break
+
+        with self._lock:
+            self._keys.update(found)
+        return found
+
+    def add_link(self, issue_key, other_issue_key):
+        """
+        Record a link between the tickets, returns whether they weren't linked during the run yet
+        """
+        link = frozenset((issue_key, other_issue_key))
+        with self._lock:
+            if link in self._links:
+                return False
+            self._links.add(link)
+            return True
+
+    def clear(self):
+        with self._lock:
+            self._keys.clear()
+            self._links.clear()
+
+
+CLUSTER_TICKETS = ClusterTickets()
+
+
+class TicketContext:
+    """
+    The inputs of a single triage ticket (metadata, install-config, events and
+    the logs archive). Every input is loaded lazily, at most once, and shared
+    by all the signatures that run on the ticket. Failures are remembered as
+    well, so an input that is missing is only probed once.
+
+    The Jira state of the ticket is available through jira_ticket, see
+    JiraTicketSnapshot.
+
+    The names of the inputs used are collected in consumed_inputs, so the
+    engine can fingerprint what a signature looked at, see fingerprint.
+
+    Signatures declare the artifacts they can't do without in
+    REQUIRED_INPUTS, see ARTIFACTS and missing_inputs.
+
+    Call close once the ticket is done to release everything that was loaded.
+    """
+
+    # Inputs that are derived from another input, fingerprinted through it
+    DERIVED_INPUTS = {
+        "cluster_model": "metadata",
+        "controller_logs": "logs_tar",
+        "controller_log_records": "logs_tar",
+        "logs_index": "logs_tar",
+        "log_bundle": "logs_tar",
+        "must_gather": "logs_tar",
+        "insights_report": "logs_tar",
+    }
+
+    # The artifacts signatures can declare in REQUIRED_INPUTS, and how they're resolved
+    ARTIFACTS = {
+        "metadata": lambda context: context.metadata,
+        "install_config": lambda context: context.install_config,
+        "events": lambda context: context.events_store,
+        "controller_logs": lambda context: context.controller_logs,
+        # The per-host logs are in the logs tar, a host without logs is up to the signatures
+        "host_logs": lambda context: context.logs_tar,
+        "log_bundle": lambda context: context.log_bundle,
+        "must_gather": lambda context: context.must_gather,
+    }
+
+    def __init__(self, logs_url, jira_ticket=None):
+        self.logs_url = logs_url
+        self.jira_ticket = jira_ticket
+        self.io_counts = Counter()
+        self.host_log_scans = HostLogScans(self)
+        self.consumed_inputs = set()
+        self._loaded = {}
+        self._digests = {}
+        self._logs_tar_key = None
+
+    def _load(self, name, loader):
+        self.consumed_inputs.add(name)
+        if name not in self._loaded:
+            self.io_counts[name] += 1
+            try:
+                self._loaded[name] = (loader(), None)
+            except Exception as e:
+                self._loaded[name] = (None, e)
+
+        value, error = self._loaded[name]
+        if error is not None:
+            raise error
+        return value
+
+    @property
+    def metadata(self):
+        return self._load("metadata", lambda: get_metadata_json(self.logs_url))
+
+    @property
+    def cluster(self):
+        return self.metadata["cluster"]
+
+    @property
+    def cluster_model(self):
+        """
+        The cluster of the metadata as a cluster_model.Cluster, host inventories are parsed lazily
+        """
+        return self._load("cluster_model", lambda: cluster_model.Cluster(self.cluster))
+
+    @property
+    def hosts(self):
+        return self.cluster_model.hosts
+
+    @property
+    def cluster_id(self):
+        return self.cluster["id"]
+
+    @property
+    def install_config(self):
+        return self._load("install_config", lambda: get_installconfig_yaml(self.logs_url))
+
+    @property
+    def events_store(self):
+        """
+        The events of the latest installation attempt, as a cluster_events.EventsStore.
+        That's just the last attempt in the events file, as the logs for this failure
+        were collected right after this installation failed, before the cluster was reset.
+        """
+        return self._load("events", lambda: _get_cluster_events(self.logs_url, self.cluster_id))
+
+    @property
+    def logs_tar(self):
+        def open_logs_tar():
+            # Pinned in the cache until close
+            self._logs_tar_key = self._input_url("logs_tar")
+            return _MeteredArchive(
+                ARCHIVE_CACHE.acquire(
+                    self._logs_tar_key,
+                    lambda: get_triage_logs_tar(triage_url=self.logs_url, cluster_id=self.cluster_id),
+                )
+            )
+
+        return self._load("logs_tar", open_logs_tar)
+
+    @property
+    def controller_logs(self):
+        return self._load(
+            "controller_logs", lambda: self.logs_tar.get("controller_logs.tar.gz/assisted-installer-controller-*.logs")
+        )
+
+    @property
+    def controller_log_records(self):
+        """
+        The records of the controller logs, as logrus_logs.LogRecords
+        """
+        return self._load("controller_log_records", lambda: logrus_logs.LogRecords(self.controller_logs))
+
+    @property
+    def logs_index(self):
+        return self._load("logs_index", lambda: TriageLogsIndex(self.logs_tar))
+
+    @property
+    def log_bundle(self):
+        """
+        Path of the bootstrap log bundle directory in logs_tar, in the layout of this ticket's logs tar
+        """
+        return self._load("log_bundle", lambda: self.logs_index.log_bundle_path)
+
+    @property
+    def must_gather(self):
+        return self._load("must_gather", lambda: get_mustgather(self.logs_tar))
+
+    @property
+    def insights_report(self):
+        """
+        A future of the insights_runner.InsightsReport of must_gather, the
+        analysis starts the first time this is used
+        """
+        return self._load("insights_report", lambda: INSIGHTS_RUNNER.submit(self.must_gather))
+
+    def missing_inputs(self, names):
+        """
+        The given artifacts (see ARTIFACTS) that this ticket doesn't have.
+        An artifact that couldn't be loaded for another reason (e.g. the log
+        server failing) isn't missing, the signature using it reports that.
+        """
+        missing = []
+        for name in names:
+            try:
+                self.ARTIFACTS[name](self)
+            except Exception as e:
+                if _is_missing_input_error(e):
+                    missing.append(name)
+        return missing
+
+    def _input_url(self, name):
+        return {
+            "metadata": lambda: f"{self.logs_url}/metadata.json",
+            "install_config": lambda: f"{self.logs_url}/cluster_files/install-config.yaml",
+            "events": lambda: f"{self.logs_url}/cluster_{self.cluster_id}_events.json",
+            "logs_tar": lambda: f"{self.logs_url}/cluster_{self.cluster_id}_logs.tar",
+        }[name]()
+
+    def input_digest(self, name):
+        """
+        A string that changes whenever the given input changes on the log
+        server, or None if that can't be determined
+        """
+        name = self.DERIVED_INPUTS.get(name, name)
+        if name not in self._digests:
+            try:
+                url = self._input_url(name)
+                digest = get_log_server_file_validator(url)
+                if digest is None and name != "logs_tar" and DOWNLOAD_CACHE is not None:
+                    # No validators, hash the contents instead, as long as
+                    # that doesn't mean downloading them again on every run
+                    digest = hashlib.sha256(get_log_server_file(url)).hexdigest()
+            except Exception:
+                logger.debug(f"Couldn't get the digest of {name} at {self.logs_url}", exc_info=True)
+                digest = None
+            self._digests[name] = digest
+
+        return self._digests[name]
+
+    def fingerprint(self, version, inputs):
+        """
+        Fingerprint of the given signature version running on the given inputs
+        of this ticket, None if any of them can't be fingerprinted
+        """
+        if version is None:
+            return None
+
+        digests = {self.DERIVED_INPUTS.get(name, name) for name in inputs}
+        digests = sorted((name, self.input_digest(name)) for name in digests)
+        if any(digest is None for _name, digest in digests):
+            return None
+
+        return hashlib.sha256(json.dumps([version, digests]).encode()).hexdigest()
+
+    def prefetch(self, inputs):
+        """
+        Download the given artifacts (see ARTIFACTS) ahead of the analysis,
+        including the archive members the registered host log scans read.
+        Failures are remembered and raised to the signatures that use the
+        input, as usual.
+        """
+        self.missing_inputs(inputs)
+
+        try:
+            self.host_log_scans.prefetch()
+        except Exception:
+            pass
+
+        if self.jira_ticket is not None:
+            self.jira_ticket.comments
+
+    def close(self):
+        """
+        Release everything that was loaded, can be called more than once
+        """
+        logs_tar, _error = self._loaded.pop("logs_tar", (None, None))
+        if logs_tar is not None:
+            ARCHIVE_CACHE.release(self._logs_tar_key)
+        self._loaded.clear()
+        self.host_log_scans = HostLogScans(self)
+
+
 ############################
 # Common functionality
 ############################
 class Signature(abc.ABC):
+    # The artifacts the signature needs, it's not run on tickets missing any of them, see TicketContext.ARTIFACTS
+    REQUIRED_INPUTS = ("metadata",)
+
     def __init__(
         self,
         jira_client,
@@ -270,17 +1247,40 @@ class Signature(abc.ABC):
         dry_run_file=None,
         should_reevaluate=False,
         old_comment_string=None,
+        context=None,
     ):
         self._jira_client = jira_client
+        self.context = context
         self._identifing_string = comment_identifying_string
         self._old_identifing_string = old_comment_string
         self.dry_run_file = dry_run_file
         self.should_reevaluate = should_reevaluate
         self.issue_key = issue_key
+        # The report of the last run on the ticket, None if the signature didn't match
+        self.report = None
 
     def process_ticket(self, url, issue_key):
+        """
+        Returns whether the signature ran to completion on the ticket
+        """
+        self.report = None
+        owns_context = self.context is None
+        if owns_context:
+            self.context = TicketContext(
+                self._logs_url_to_api(url), jira_ticket=JiraTicketSnapshot(self._jira_client, issue_key)
+            )
+            self.register_scans(self.context.host_log_scans)
+
+        missing_inputs = self.context.missing_inputs(self.REQUIRED_INPUTS)
+        if missing_inputs:
+            logger.info(
+                f"{get_ticket_browse_url(issue_key)} is missing {', '.join(missing_inputs)}, skipping {type(self).__name__}"
+            )
+            return False
+
         try:
             self._process_ticket(self._logs_url_to_api(url), issue_key)
+            return True
         except FailedToGetMetadataException as e:
             browse_url = get_ticket_browse_url(issue_key)
             logger.error(f"Error getting metadata for {browse_url} at {url}: {e.__cause__}, it may have been deleted")
@@ -289,17 +1289,49 @@ class Signature(abc.ABC):
                 logger.warning(
                     f"{get_ticket_browse_url(issue_key)} doesn't have a log tar, skipping {type(self).__name__}"
                 )
-                return
+                return False
             raise
         except Exception:
             logger.exception("error updating ticket %s", issue_key)
+        finally:
+            if owns_context:
+                self.context.close()
+
+        return False
 
     @abc.abstractmethod
     def _process_ticket(self, url, issue_key):
         pass
 
+    def register_scans(self, host_log_scans):
+        """
+        Signatures that look for patterns in host log files register their line
+        consumers here, see HostLogScans
+        """
+
+    def result_labels(self):
+        """
+        The labels the signature sets on the tickets it matches, see RESULTS_STORE
+        """
+        return []
+
+    def start_background_work(self):
+        """
+        Signatures that wait on work outside of this process (e.g. running a
+        tool) start it here, it's called before any signature runs on the
+        ticket, ahead of them when the ticket is prefetched
+        """
+
+    def _jira_ticket(self, issue_key):
+        """
+        The shared snapshot of the ticket being processed, or a new one for any other ticket
+        """
+        if self.context is not None and self.context.jira_ticket is not None and issue_key == self.issue_key:
+            return self.context.jira_ticket
+        return JiraTicketSnapshot(self._jira_client, issue_key)
+
     def _add_labels_to_field(self, issue_key, labels_to_add, field_name):
-        field_existing_labels = self._jira_client.issue(issue_key).fields.__dict__[field_name] or []
+        field_existing_labels = self._jira_ticket(issue_key).fields.__dict__[field_name] or []
         new_labels = [label for label in labels_to_add if label not in field_existing_labels]
 
         if len(new_labels) != 0:
@@ -314,11 +1346,18 @@ class Signature(abc.ABC):
     def _add_signature_labels(self, issue_key, labels_to_add):
         self._add_labels_to_field(issue_key, labels_to_add, FIELD_LABELS)
 
+    @property
+    def identifying_strings(self):
+        """
+        The strings find_signature_comment looks for in the comments, the current one first
+        """
+        return [self._identifing_string] + ([self._old_identifing_string] if self._old_identifing_string else [])
+
     def find_signature_comment(self, key=None, comments=None):
         assert key or comments
 
         if comments is None:
-            comments = self._jira_client.comments(key)
+            comments = self._jira_ticket(key).comments
 
         for comment in comments:
             if self._identifing_string in comment.body:
@@ -334,6 +1373,7 @@ class Signature(abc.ABC):
         report += self._identifing_string + "\n"
         if comment is not None:
             report += comment
+        self.report = report
 
         jira_comment = self.find_signature_comment(self.issue_key)
         signature_name = type(self).__name__
@@ -347,7 +1387,7 @@ class Signature(abc.ABC):
                 signature_name,
                 self.issue_key,
             )
-            self._jira_client.add_comment(self.issue_key, report)
+            self._jira_ticket(self.issue_key).add_comment(report)
             return True
         elif self.should_reevaluate:
             logger.info(
@@ -355,7 +1395,7 @@ class Signature(abc.ABC):
                 signature_name,
                 self.issue_key,
             )
-            jira_comment.update(body=report)
+            self._jira_ticket(self.issue_key).update_comment(jira_comment, report)
             return True
         else:
             logger.debug(
@@ -366,19 +1406,16 @@ class Signature(abc.ABC):
             return False
 
     def _update_description(self, key, new_description):
-        i = self._jira_client.issue(key)
-        i.update(fields={"description": new_description})
+        self._jira_ticket(key).update_fields({"description": new_description})
 
     def _update_fields(self, key, fields_dict):
-        i = self._jira_client.issue(key)
-        i.update(fields=fields_dict)
+        self._jira_ticket(key).update_fields(fields_dict)
 
     def _upload_attachment(self, key, file):
         if self.dry_run_file is not None:
             return
 
-        i = self._jira_client
-        i.add_attachment(issue=key, attachment=file)
+        self._jira_ticket(key).add_attachment(file)
 
     @staticmethod
     def _generate_table_for_report(hosts):
@@ -406,6 +1443,9 @@ class Signature(abc.ABC):
 
     @staticmethod
     def _get_hostname(host):
+        if isinstance(host, cluster_model.Host):
+            return host.hostname
+
         hostname = host.get("requested_hostname")
         if hostname:
             return hostname
@@ -471,6 +1511,9 @@ class ErrorSignature(Signature, abc.ABC):
         self._function_impact_label = function_impact_label
         self._label = label
 
+    def result_labels(self):
+        return ["SIGNATURE_" + label for label in (self._function_impact_label, self._label) if label is not None]
+
     def _update_triaging_ticket(self, comment):
         if super()._update_triaging_ticket(comment) and self.dry_run_file is None:
             if self._function_impact_label is not None:
@@ -496,10 +1539,10 @@ class HostsStatusSignature(Signature):
         )
 
     def _process_ticket(self, url, issue_key):
-        md = get_metadata_json(url)
+        cluster = self.context.cluster_model
 
         try:
-            installconfig = get_installconfig_yaml(url)
+            installconfig = self.context.install_config
         except FailedToGetInstallConfigException:
             logger.exception("Failed to get install-config.yaml")
             self._update_triaging_ticket(
@@ -507,14 +1550,11 @@ class HostsStatusSignature(Signature):
             )
             return
 
-        cluster = md["cluster"]
-
         hosts = []
-        for host in cluster["hosts"]:
+        for host in self.context.hosts:
             info = host["status_info"]
-            role = host["role"]
-            inventory = json.loads(host["inventory"])
-            if host.get("bootstrap", False):
+            role = host.role
+            if host.bootstrap:
                 role = "bootstrap"
             hosts.append(
                 OrderedDict(
@@ -523,7 +1563,7 @@ class HostsStatusSignature(Signature):
                     progress=host["progress"]["current_stage"],
                     status=host["status"],
                     role=role,
-                    boot_mode=inventory.get("boot", {}).get("current_boot_mode", "N/A"),
+                    boot_mode=host.inventory.boot_mode or "N/A",
                     status_info=str(info),
                     logs_info=host.get("logs_info", ""),
                     last_checked_in_at=format_time(
@@ -615,7 +1655,7 @@ class FailureDescription(Signature):
         if not should_reevaluate:
             logger.debug("Not updating description of %s", issue_key)
             return
-        md = get_metadata_json(url)
+        md = self.context.metadata
 
         cluster = md["cluster"]
 
@@ -652,9 +1692,8 @@ class FailureDetails(Signature):
             }
             r = re.compile(r"(AI_[^_]*_)(.*)")
 
-            i = self._jira_client.issue(issue_key)
             cluster_md = {}
-            for label in i.fields.labels:
+            for label in self._jira_ticket(issue_key).fields.labels:
                 m = r.match(label)
                 if m is None or len(m.groups()) != 2:
                     continue
@@ -666,7 +1705,7 @@ class FailureDetails(Signature):
 
         cluster_md = []
         try:
-            md = get_metadata_json(url)
+            md = self.context.metadata
             cluster_md = md["cluster"]
         except Exception:
             # if we cannot find the failure logs on the log-server, we'll just use whatever information we
@@ -723,24 +1762,20 @@ class HostsExtraDetailSignature(Signature):
         )
 
     def _process_ticket(self, url, issue_key):
-        md = get_metadata_json(url)
-
-        cluster = md["cluster"]
-
         hosts = []
-        for host in cluster["hosts"]:
-            inventory = json.loads(host["inventory"])
+        for host in self.context.hosts:
+            inventory = host.inventory
             hosts.append(
                 OrderedDict(
-                    id=host["id"],
-                    hostname=inventory["hostname"],
+                    id=host.id,
+                    hostname=inventory.hostname,
                     requested_hostname=host.get("requested_hostname", "N/A"),
                     last_contacted=format_time(host["checked_in_at"]),
                     installation_disk=host.get("installation_disk_path", "N/A"),
-                    product_name=inventory["system_vendor"].get("product_name", "Unavailable"),
-                    manufacturer=inventory["system_vendor"].get("manufacturer", "Unavailable"),
-                    virtual_host=inventory["system_vendor"].get("virtual", False),
-                    disks_count=len(inventory["disks"]),
+                    product_name=inventory.system_vendor.product_name or "Unavailable",
+                    manufacturer=inventory.system_vendor.manufacturer or "Unavailable",
+                    virtual_host=inventory.system_vendor.virtual,
+                    disks_count=len(inventory.disks),
                 )
             )
 
@@ -763,7 +1798,7 @@ class MasterFailedToPullIgnitionSignature(ErrorSignature):
 
     def _process_ticket(self, url, issue_key):
         hosts = []
-        cluster_hosts = get_metadata_json(url)["cluster"]["hosts"]
+        cluster_hosts = self.context.hosts
         # this signature is not relevant for SNO
         if len(cluster_hosts) <= 1:
             return
@@ -772,18 +1807,16 @@ class MasterFailedToPullIgnitionSignature(ErrorSignature):
             if host["role"] == "bootstrap" and host["progress"]["current_stage"] == "WaitingForControlPlane":
                 # We probably failed due to other issues, so we don't want to sign this ticket
                 return
-            inventory = json.loads(host["inventory"])
-            boot_mode = inventory.get("boot", {}).get("current_boot_mode", "N/A")
             if (
-                host["role"] == "master"
-                and host["progress"]["current_stage"] == "Rebooting"
-                and host["status"] == "error"
-                and boot_mode == "bios"
+                host.role == "master"
+                and host.current_stage == "Rebooting"
+                and host.status == "error"
+                and host.inventory.boot_mode == "bios"
             ):
                 hosts.append(
                     OrderedDict(
-                        HostID=host["id"],
-                        Hostname=inventory["hostname"],
+                        HostID=host.id,
+                        Hostname=host.inventory.hostname,
                         Progress=host["progress"]["current_stage"],
                     )
                 )
@@ -800,7 +1833,11 @@ class MasterFailedToPullIgnitionSignature(ErrorSignature):
 
 
 class InstallationDiskFIOSignature(Signature):
-    fio_regex = re.compile(r"\(fdatasync duration:\s(\d+)\sms\)")
+    REQUIRED_INPUTS = ("metadata", "events")
+
+    fio_regex = EVENT_MESSAGES.add(
+        "fdatasync_duration", r"\(fdatasync duration:\s(\d+)\sms\)", literal="fdatasync duration"
+    )
 
     def __init__(self, *args, **kwargs):
         super().__init__(
@@ -809,35 +1846,17 @@ class InstallationDiskFIOSignature(Signature):
             comment_identifying_string="h1. Host slow installation disks:",
         )
 
-    @classmethod
-    def _get_fio_events(cls, events):
-        def get_duration(event):
-            matches = cls.fio_regex.findall(event["message"])
-            if len(matches) == 0:
-                return None
-
-            return int(matches[0])
-
-        return ((event, get_duration(event)) for event in events if get_duration(event) is not None)
-
     def _process_ticket(self, url, issue_key):
-        md = get_metadata_json(url)
-
-        cluster = md["cluster"]
-
-        cluster_id = cluster["id"]
-        events = get_cluster_installation_events(url, cluster_id)
-        fio_events = self._get_fio_events(events)
+        events = self.context.events_store
 
-        fio_events_by_host = defaultdict(list)
-        for event, fio_duration in fio_events:
-            fio_events_by_host[event["host_id"]].append((event, fio_duration))
+        fio_durations_by_host = defaultdict(list)
+        for row, match in events.matches("fdatasync_duration"):
+            fio_durations_by_host[events.host_id(row)].append(int(match.group(1)))
 
         hosts = []
-        for host in cluster["hosts"]:
-            host_fio_events = fio_events_by_host[host["id"]]
-            if len(host_fio_events) != 0:
-                _events, host_fio_events_durations = zip(*fio_events_by_host[host["id"]])
+        for host in self.context.hosts:
+            host_fio_events_durations = fio_durations_by_host[host.id]
+            if len(host_fio_events_durations) != 0:
                 fio_message = (
                     "{color:red}Installation disk is too slow, fio durations: "
                     + ", ".join(f"{duration}ms" for duration in host_fio_events_durations)
@@ -859,8 +1878,12 @@ class InstallationDiskFIOSignature(Signature):
 
 
 class SlowImageDownload(ErrorSignature):
-    image_download_regex = re.compile(
-        r"Host (?P<hostname>.+?): New image status (?P<image>.+?). result:.+?; download rate: (?P<download_rate>.+?) MBps"
+    REQUIRED_INPUTS = ("metadata", "events")
+
+    image_download_regex = EVENT_MESSAGES.add(
+        "image_download_rate",
+        r"^Host (?P<hostname>.+?): New image status (?P<image>.+?). result:.+?; download rate: (?P<download_rate>.+?) MBps",
+        literal="download rate",
     )
     minimum_download_rate_mb = 10
 
@@ -872,22 +1895,12 @@ class SlowImageDownload(ErrorSignature):
             comment_identifying_string="h1. Host slow download rate:",
         )
 
-    @classmethod
-    def _list_image_download_info(cls, events):
-        def get_image_download_info(event):
-            match = cls.image_download_regex.match(event["message"])
-            if match:
-                return match.groupdict()
-
-        return [image_info for event in events if (image_info := get_image_download_info(event)) is not None]
+    @staticmethod
+    def _list_image_download_info(events):
+        return [match.groupdict() for _row, match in events.matches("image_download_rate")]
 
     def _process_ticket(self, url, issue_key):
-        md = get_metadata_json(url)
-
-        cluster = md["cluster"]
-
-        cluster_id = cluster["id"]
-        events = get_cluster_installation_events(url, cluster_id)
+        events = self.context.events_store
         image_info_list = self._list_image_download_info(events)
 
         abnormal_image_info = []
@@ -914,27 +1927,20 @@ class StorageDetailSignature(Signature):
         )
 
     def _process_ticket(self, url, issue_key):
-        md = get_metadata_json(url)
-
-        cluster = md["cluster"]
-
         hosts = []
-        for host in cluster["hosts"]:
-            inventory = json.loads(host["inventory"])
-            disks = inventory["disks"]
+        for host in self.context.hosts:
             disks_details = defaultdict(list)
-            for d in disks:
-                disk_type = d.get("drive_type", "Not available")
-                disks_details["type"].append(disk_type)
-                disks_details["bootable"].append(str(d.get("bootable", False)))
-                disks_details["name"].append(d.get("name", "Not available"))
-                disks_details["path"].append(d.get("path", "Not available"))
-                disks_details["by-path"].append(d.get("by_path", "Not available"))
+            for disk in host.inventory.disks:
+                disks_details["type"].append(disk.drive_type or "Not available")
+                disks_details["bootable"].append(str(disk.bootable))
+                disks_details["name"].append(disk.name or "Not available")
+                disks_details["path"].append(disk.path or "Not available")
+                disks_details["by-path"].append(disk.by_path or "Not available")
             hosts.append(
                 OrderedDict(
                     {
-                        "Host ID": host["id"],
-                        "Hostname": self._get_hostname(host),
+                        "Host ID": host.id,
+                        "Hostname": host.hostname,
                         "Disk Name": "\n".join(disks_details["name"]),
                         "Disk Type": "\n".join(disks_details["type"]),
                         "Disk Path": "\n".join(disks_details["path"]),
@@ -953,24 +1959,17 @@ class SNOMachineCidrSignature(Signature):
         super().__init__(*args, **kwargs, comment_identifying_string="h1. Invalid machine cidr")
 
     def _process_ticket(self, url, issue_key):
-        md = get_metadata_json(url)
+        cluster = self.context.cluster_model
 
-        cluster = md["cluster"]
-
-        if cluster.get("high_availability_mode") != "None":
+        if not cluster.is_sno:
             return
 
-        host = cluster["hosts"][0]
-        inventory = json.loads(host["inventory"])
+        host = cluster.hosts[0]
         # The first one is the machine_cidr that will be used for network configuration
-        machine_cidr = ipaddress.ip_network(cluster["machine_networks"][0]["cidr"])
-        for route in inventory["routes"]:
+        machine_cidr = ipaddress.ip_network(cluster.machine_cidrs[0])
+        for route in host.inventory.routes:
             # currently only relevant for ipv4
-            if (
-                route.get("destination") == "0.0.0.0"
-                and route.get("gateway")
-                and ipaddress.ip_address(route["gateway"]) in machine_cidr
-            ):
+            if route.destination == "0.0.0.0" and route.gateway and ipaddress.ip_address(route.gateway) in machine_cidr:
                 return
 
         report = (
@@ -991,7 +1990,7 @@ class ComponentsVersionSignature(Signature):
         )
 
     def _process_ticket(self, url, issue_key):
-        md = get_metadata_json(url)
+        md = self.context.metadata
 
         report = ""
         release_tag = md.get("release_tag")
@@ -1021,47 +2020,46 @@ class LibvirtRebootFlagSignature(ErrorSignature):
         )
 
     def _process_ticket(self, url, issue_key):
-        md = get_metadata_json(url)
-
-        cluster = md["cluster"]
+        cluster_hosts = self.context.hosts
 
         # this signature is not relevant for SNO
-        if len(cluster["hosts"]) <= 1:
+        if len(cluster_hosts) <= 1:
             return
 
         # this signature is relevant only if all hosts, but the bootstrap is in 'Rebooting' stage
         hosts = []
-        for host in cluster["hosts"]:
-            inventory = json.loads(host["inventory"])
+        for host in cluster_hosts:
+            inventory = host.inventory
 
             if (
-                len(inventory["disks"]) == 1
-                and "KVM" in inventory["system_vendor"]["product_name"]
-                and host["progress"]["current_stage"] == "Rebooting"
-                and host["status"] == "error"
+                len(inventory.disks) == 1
+                and "KVM" in (inventory.system_vendor.product_name or "")
+                and host.current_stage == "Rebooting"
+                and host.status == "error"
             ):
-                if host["role"] == "bootstrap":
+                if host.role == "bootstrap":
                     return
 
                 hosts.append(
                     OrderedDict(
-                        id=host["id"],
-                        hostname=self._get_hostname(host),
-                        role=host["role"],
-                        progress=host["progress"]["current_stage"],
-                        status=host["status"],
-                        num_disks=len(inventory.get("disks", [])),
+                        id=host.id,
+                        hostname=host.hostname,
+                        role=host.role,
+                        progress=host.current_stage,
+                        status=host.status,
+                        num_disks=len(inventory.disks),
                     )
                 )
 
-        if len(hosts) + 1 == len(cluster["hosts"]):
+        if len(hosts) + 1 == len(cluster_hosts):
             report = self._generate_table_for_report(hosts)
             self._update_triaging_ticket(report)
 
 
 class ApiInvalidCertificateSignature(ErrorSignature):
+    REQUIRED_INPUTS = ("metadata", "controller_logs")
 
-    LOG_PATTERN = re.compile('time=".*" level=error msg=".*x509: certificate is valid.* not .*')
+    MSG_PATTERN = re.compile("x509: certificate is valid.* not ")
 
     def __init__(self, *args, **kwargs):
         super().__init__(
@@ -1072,12 +2070,12 @@ class ApiInvalidCertificateSignature(ErrorSignature):
         )
 
     def _process_ticket(self, url, issue_key):
-        try:
-            controller_logs = get_controller_logs(url)
-        except FileNotFoundError:
-            return
-
-        invalid_api_log_lines = self.LOG_PATTERN.findall(controller_logs)
+        controller_log_records = self.context.controller_log_records
+        invalid_api_log_lines = [
+            controller_log_records.line(record)
+            for record in controller_log_records.select(level="error", contains="x509: certificate is valid")
+            if self.MSG_PATTERN.search(record.msg)
+        ]
         if invalid_api_log_lines:
             ticket_inform = "see: https://issues.redhat.com/browse/MGMT-4039\n"
             logs_text = "{code}" + "\n".join(invalid_api_log_lines[:5]) + "{code}"
@@ -1094,6 +2092,7 @@ class ApiInvalidCertificateSignature(ErrorSignature):
 
 
 class ApiExpiredCertificateSignature(ErrorSignature):
+    REQUIRED_INPUTS = ("metadata", "log_bundle")
 
     LOG_PATTERN = re.compile("x509: certificate has expired or is not yet valid.*")
 
@@ -1107,9 +2106,7 @@ class ApiExpiredCertificateSignature(ErrorSignature):
 
     def _process_ticket_helper(self, url, path):
         try:
-            bootstrap_kube_apiserver_logs = get_triage_logs_tar(
-                triage_url=url, cluster_id=get_metadata_json(url)["cluster"]["id"]
-            ).get(path)
+            bootstrap_kube_apiserver_logs = self.context.logs_tar.get(path)
         except FileNotFoundError:
             return
         if invalid_api_log_lines := self.LOG_PATTERN.findall(bootstrap_kube_apiserver_logs):
@@ -1119,13 +2116,9 @@ class ApiExpiredCertificateSignature(ErrorSignature):
             self._update_triaging_ticket(report)
 
     def _process_ticket(self, url, issue_key):
-        new_logs_path = NEW_LOG_BUNDLE_PATH + "bootstrap/containers/bootstrap-control-plane/kube-apiserver.log"
-        old_logs_path = OLD_LOG_BUNDLE_PATH + "bootstrap/containers/bootstrap-control-plane/kube-apiserver.log"
-        try:
-            self._process_ticket_helper(url, new_logs_path)
-        except FileNotFoundError:
-            logger.warning(f"Could not find the kube-apiserver log under {new_logs_path}, attempting {old_logs_path}")
-            self._process_ticket_helper(url, old_logs_path)
+        self._process_ticket_helper(
+            url, self.context.log_bundle + "bootstrap/containers/bootstrap-control-plane/kube-apiserver.log"
+        )
 
 
 class AllInstallationAttemptsSignature(Signature):
@@ -1136,18 +2129,17 @@ class AllInstallationAttemptsSignature(Signature):
             comment_identifying_string="h1. all installation attempts of a cluster",
         )
 
+    LINK_TYPE = "is related to"
+
     def _process_ticket(self, url, issue_key):
-        md = get_metadata_json(url)
-        cluster = md["cluster"]
-        cluster_id = cluster["id"]
-        cluster_triage_tickets = self._jira_client.search_issues(
-            f"""project = AITRIAGE AND "Cluster ID" ~ {cluster_id}"""
-        )
-        for ticket in cluster_triage_tickets:
-            if issue_key == ticket.key:
+        cluster_id = self.context.metadata["cluster"]["id"]
+        jira_ticket = self._jira_ticket(issue_key)
+        linked = jira_ticket.linked_issue_keys(self.LINK_TYPE)
+        for ticket_key in CLUSTER_TICKETS.ticket_keys(self._jira_client, cluster_id):
+            if ticket_key == issue_key or ticket_key in linked:
                 continue
-
-            self._jira_client.create_issue_link("is related to", issue_key, ticket.key)
+            if CLUSTER_TICKETS.add_link(issue_key, ticket_key):
+                jira_ticket.create_issue_link(self.LINK_TYPE, ticket_key)
 
 
 class MediaDisconnectionSignature(ErrorSignature):
@@ -1168,11 +2160,8 @@ class MediaDisconnectionSignature(ErrorSignature):
         )
 
     def _process_ticket(self, url, issue_key):
-        md = get_metadata_json(url)
-        cluster = md["cluster"]
-
         hosts = list()
-        for host in cluster["hosts"]:
+        for host in self.context.hosts:
             status_info = host["status_info"]
             if self.ERRORS_PATTERNS in status_info:
                 hosts.append(
@@ -1211,11 +2200,8 @@ class CoreOSInstallerErrorSignature(ErrorSignature):
         )
 
     def _process_ticket(self, url, issue_key):
-        md = get_metadata_json(url)
-        cluster = md["cluster"]
-
         hosts = list()
-        for host in cluster["hosts"]:
+        for host in self.context.hosts:
             status_info = host["status_info"]
             if search_patterns_in_string(status_info, self.ERROR_PATTERN):
                 hosts.append(
@@ -1242,13 +2228,13 @@ class AgentStepFailureSignature(Signature):
     This signature creates a report of all agent step failures that were encountered in the logs
     """
 
+    REQUIRED_INPUTS = ("metadata", "host_logs")
+
     # This has to be maintained to be the same format as
     # https://github.com/openshift/assisted-installer-agent/blob/aebd94105b4ed6442f21a7a26ab4e40eafd936aa/src/commands/step_processor.go#L81
     # Remember to maintain backwards compatibility if that format ever changes - create
     # PATTERN_NEW and try to match both.
-    LOG_PATTERN = re.compile(
-        r'time="(?P<time>.+)" level=(?P<severity>[a-z]+) msg="(?P<message>Step execution failed.*)" file=.+'
-    )
+    MSG_PREFIX = "Step execution failed"
 
     MSG_PATTERN = re.compile(
         r"Step execution failed \(exit code (?P<exit_code>\-?\d+)\): <(?P<step_id>[a-z\-0-9]+)>, "
@@ -1294,30 +2280,29 @@ class AgentStepFailureSignature(Signature):
 
         return "".join(output_lines)
 
-    def _process_ticket(self, url, issue_key):
-        md = get_metadata_json(url)
-
-        cluster = md["cluster"]
-        cluster_id = cluster["id"]
+    def register_scans(self, host_log_scans):
+        host_log_scans.register(
+            "agent.logs",
+            type(self).__name__,
+            lambda: RecordCollector(
+                lambda record: record.file is not None and record.msg.startswith(self.MSG_PREFIX),
+                limit=self.MAX_FAILURES_PER_HOST,
+            ),
+        )
 
-        triage_logs_tar = get_triage_logs_tar(triage_url=url, cluster_id=cluster_id)
+    def _process_ticket(self, url, issue_key):
+        agent_logs_scans = self.context.host_log_scans.results("agent.logs", type(self).__name__)
 
         report = ""
-        for host in cluster["hosts"]:
+        for host in self.context.hosts:
             host_id = host["id"]
 
-            try:
-                agent_logs = get_host_log_file(triage_logs_tar, host_id, "agent.logs")
-            except FileNotFoundError:
+            if host_id not in agent_logs_scans:
                 continue
 
             failures = []
-            for _failure_idx, step_failure_log_match in zip(
-                range(self.MAX_FAILURES_PER_HOST),
-                self.LOG_PATTERN.finditer(agent_logs),
-            ):
-                step_failure_log = step_failure_log_match.groupdict()
-                step_failure_message_match = self.MSG_PATTERN.match(step_failure_log["message"])
+            for step_failure_log in agent_logs_scans[host_id].records:
+                step_failure_message_match = self.MSG_PATTERN.match(step_failure_log.msg)
 
                 if step_failure_message_match is None:
                     logger.warning(
@@ -1330,7 +2315,7 @@ class AgentStepFailureSignature(Signature):
                 if not self._filter_message(step_failure_message):
                     failures.append(
                         OrderedDict(
-                            time=step_failure_log["time"],
+                            time=step_failure_log.time,
                             exit_code=step_failure_message["exit_code"],
                             step_id=step_failure_message["step_id"],
                             stderr=self._prepare_output(step_failure_message["stderr"]),
@@ -1353,6 +2338,8 @@ class MissingMustGatherLogs(ErrorSignature):
     This signature is added in case must-gather logs weren't collected after the failure of the installation
     """
 
+    REQUIRED_INPUTS = ("metadata", "host_logs")
+
     def __init__(self, *args, **kwargs):
         super().__init__(
             *args,
@@ -1362,7 +2349,7 @@ class MissingMustGatherLogs(ErrorSignature):
         )
 
     def _process_ticket(self, url, issue_key):
-        md = get_metadata_json(url)
+        md = self.context.metadata
         cluster_hosts = md["cluster"]["hosts"]
         bootstrap_node = [host for host in cluster_hosts if host["bootstrap"]][0]
 
@@ -1375,11 +2362,7 @@ class MissingMustGatherLogs(ErrorSignature):
             return
 
         if md["cluster"]["logs_info"] in ("timeout", "completed"):
-            cluster_id = md["cluster"]["id"]
-            triage_logs_tar = get_triage_logs_tar(triage_url=url, cluster_id=cluster_id)
-            try:
-                get_mustgather(triage_logs_tar)
-            except FailedToGetMustgatherException:
+            if self.context.missing_inputs(["must_gather"]):
                 self._update_triaging_ticket(
                     "This cluster's collected logs are missing must-gather logs although it should be collected, why is it missing?"
                 )
@@ -1390,6 +2373,8 @@ class MustGatherAnalysis(Signature):
     This signature analyses must-gather collected after the failure of the installation.
     """
 
+    REQUIRED_INPUTS = ("metadata", "must_gather")
+
     def __init__(self, *args, **kwargs):
         super().__init__(
             *args,
@@ -1397,49 +2382,36 @@ class MustGatherAnalysis(Signature):
             comment_identifying_string="h1. Must-gather Analysis:",
         )
 
-    def _process_ticket(self, url, issue_key):
-        md = get_metadata_json(url)
-        cluster_id = md["cluster"]["id"]
-        triage_logs_tar = get_triage_logs_tar(triage_url=url, cluster_id=cluster_id)
+    def start_background_work(self):
+        # The tickets go on while Insights runs, errors are reported by _process_ticket
+        with contextlib.suppress(Exception):
+            self.context.insights_report
 
-        try:
-            mustgather = get_mustgather(triage_logs_tar)
-        except FailedToGetMustgatherException:
-            return
-
-        with tempfile.NamedTemporaryFile(suffix=".tar.gz") as tmp_mustgather:
-            logger.debug(f"Writing must-gather as {tmp_mustgather.name}")
-            try:
-                tmp_mustgather.write(mustgather)
-                tmp_mustgather.flush()
-                report = subprocess.run(
-                    [
-                        "insights",
-                        "run",
-                        "-p",
-                        "ccx_rules_ocp",
-                        tmp_mustgather.name,
-                    ],
-                    stdout=subprocess.PIPE,
-                )
-                with tempfile.NamedTemporaryFile(prefix="insights-report-", suffix=".txt") as tmp_report:
-                    try:
-                        logger.debug(f"Writing Insights report as {tmp_report.name}")
-                        tmp_report.write(report.stdout)
-                        tmp_report.flush()
-                        self._upload_attachment(issue_key, tmp_report.name)
-                    except Exception:
-                        logger.exception(f"Error while writing and uploading {tmp_report.name}")
-            except Exception:
-                logger.exception(f"Error while handling must-gather in {tmp_mustgather.name}")
-
-        report = "*Insights report:* See {} attachment\n".format(tmp_report.name)
+    def _process_ticket(self, url, issue_key):
+        # Raises subprocess.TimeoutExpired if Insights timed out
+        insights_report = self.context.insights_report.result()
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            # Named after the must-gather, so the comment doesn't change as long as the must-gather doesn't
+            report_path = os.path.join(tmpdir, f"insights-report-{insights_report.digest[:16]}.txt")
+            logger.debug(f"Writing Insights report as {report_path}")
+            with open(report_path, "wb") as report_file:
+                report_file.write(insights_report.content)
+            self._upload_attachment(issue_key, report_path)
+
+        report = "*Insights report:* See {} attachment\n".format(report_path)
         self._update_triaging_ticket(report)
 
 
 class OSInstallationTime(Signature):
-    writing_image_start_event_regex = re.compile(r".*reached installation stage Writing image to disk$")
-    writing_image_end_event_regex = re.compile(r".*reached installation stage Writing image to disk: 100%$")
+    REQUIRED_INPUTS = ("metadata", "events")
+
+    writing_image_start_event_regex = EVENT_MESSAGES.add(
+        "writing_image_start", r"reached installation stage Writing image to disk$", literal="Writing image to disk"
+    )
+    writing_image_end_event_regex = EVENT_MESSAGES.add(
+        "writing_image_end", r"reached installation stage Writing image to disk: 100%$", literal="disk: 100%"
+    )
 
     unknown_message = "{color:darkgreen}OS installation time duration could not be determined for this host{color}"
     slow_message = "{{color:red}}OS installation was rather slow, it took {} seconds{{color}}"
@@ -1458,41 +2430,32 @@ class OSInstallationTime(Signature):
         )
 
     @classmethod
-    def _get_last_event(cls, all_events, regex):
+    def _get_last_event_time(cls, events, label, host_id):
         """
-        Returns the last event out of all_events that matches the given regex.
+        Returns the time of the last event of the host whose message matches
+        the EVENT_MESSAGES pattern registered under label.
 
-        We want to get the last event because sometimes the list of all events
-        for a triage ticket contains events from previous installations. The
-        last ones however, are always relevant to the ticket in question.
+        We want to get the last event because the host may have gone through
+        the same stage more than once (e.g. after rebooting), the last one is
+        the one relevant to the ticket in question.
         """
-        try:
-            *_, last = (event for event in all_events if regex.match(event["message"]) is not None)
-        except ValueError:
+        matches = events.matches(label, host_id)
+        if not matches:
             raise cls.NoEventFound
 
-        return last
+        last_row, _match = matches[-1]
+        return events.time(last_row)
 
     @classmethod
-    def _get_start_event_timestamp(cls, all_events):
-        return get_event_timestamp(
-            cls._get_last_event(
-                all_events,
-                cls.writing_image_start_event_regex,
-            )
-        )
+    def _get_start_event_timestamp(cls, events, host_id):
+        return cls._get_last_event_time(events, "writing_image_start", host_id)
 
     @classmethod
-    def _get_end_event_timestamp(cls, all_events):
-        return get_event_timestamp(
-            cls._get_last_event(
-                all_events,
-                cls.writing_image_end_event_regex,
-            )
-        )
+    def _get_end_event_timestamp(cls, events, host_id):
+        return cls._get_last_event_time(events, "writing_image_end", host_id)
 
     @classmethod
-    def host_entry(cls, host, host_events):
+    def host_entry(cls, host, events):
         entry = OrderedDict(
             id=host["id"],
             hostname=cls._get_hostname(host),
@@ -1502,7 +2465,7 @@ class OSInstallationTime(Signature):
 
         try:
             total_duration_seconds = (
-                cls._get_end_event_timestamp(host_events) - cls._get_start_event_timestamp(host_events)
+                cls._get_end_event_timestamp(events, host.id) - cls._get_start_event_timestamp(events, host.id)
             ).total_seconds()
         except cls.NoEventFound:
             return entry
@@ -1520,9 +2483,8 @@ class OSInstallationTime(Signature):
         return entry
 
     def _process_ticket(self, url, issue_key):
-        cluster = get_metadata_json(url)["cluster"]
-        events_by_host = get_events_by_host(url, cluster["id"])
-        host_entries = [self.host_entry(host, events_by_host[host["id"]]) for host in cluster["hosts"]]
+        events = self.context.events_store
+        host_entries = [self.host_entry(host, events) for host in self.context.hosts]
 
         # Only report if we have at least one slow host
         if any("slow" in host["duration"] for host in host_entries):
@@ -1534,6 +2496,8 @@ class OSInstallationTime(Signature):
 
 
 class NonstandardNetworkType(ErrorSignature):
+    REQUIRED_INPUTS = ("install_config",)
+
     allowed_network_types = [
         "OpenShiftSDN",
         "OVNKubernetes",
@@ -1548,7 +2512,7 @@ class NonstandardNetworkType(ErrorSignature):
         )
 
     def _process_ticket(self, url, issue_key):
-        install_config = get_installconfig_yaml(url)
+        install_config = self.context.install_config
         network_type = install_config["networking"]["networkType"]
 
         if network_type not in self.allowed_network_types:
@@ -1558,10 +2522,17 @@ class NonstandardNetworkType(ErrorSignature):
 
 
 class FlappingValidations(ErrorSignature):
-    validation_name_regexp = re.compile(r"Host .+: validation '(.+)'.+")
+    REQUIRED_INPUTS = ("metadata", "events")
 
-    succeed_to_failing_regexp = re.compile(r"Host .+: validation '.+' that used to succeed is now failing")
-    now_fixed_regexp = re.compile(r"Host .+: validation '.+' is now fixed")
+    # The validation name is the first group
+    succeed_to_failing_regexp = EVENT_MESSAGES.add(
+        "validation_failing",
+        r"^Host .+: validation '(.+)' that used to succeed is now failing",
+        literal="that used to succeed is now failing",
+    )
+    now_fixed_regexp = EVENT_MESSAGES.add(
+        "validation_fixed", r"^Host .+: validation '(.+)' is now fixed", literal="is now fixed"
+    )
 
     def __init__(self, *args, **kwargs):
         super().__init__(
@@ -1572,21 +2543,15 @@ class FlappingValidations(ErrorSignature):
         )
 
     def _process_ticket(self, url, issue_key):
-        events = get_events_by_host(url, get_metadata_json(url)["cluster"]["id"])
+        events = self.context.events_store
 
         host_tables = {}
-        for host, events in events.items():
+        for host in events.host_ids:
             succeed_to_failing_counter = Counter(
-                self.validation_name_regexp.match(event["message"]).groups()[0]
-                for event in events
-                if self.succeed_to_failing_regexp.match(event["message"])
+                match.group(1) for _row, match in events.matches("validation_failing", host)
             )
 
-            now_fixed = Counter(
-                self.validation_name_regexp.match(event["message"]).groups()[0]
-                for event in events
-                if self.now_fixed_regexp.match(event["message"])
-            )
+            now_fixed = Counter(match.group(1) for _row, match in events.matches("validation_fixed", host))
 
             table = [
                 OrderedDict(
@@ -1612,8 +2577,11 @@ class WrongBootOrderSignature(ErrorSignature):
     This signature creates a report of hosts which should be manually rebooted from the installation disk.
     """
 
+    REQUIRED_INPUTS = ("metadata", "events")
+
     ERROR_PATTERN = "a manual booting from installation disk"
     EVENT_PATTERN = "please boot the host"
+    EVENT_MESSAGES.add("boot_from_installation_disk", re.escape(EVENT_PATTERN), literal=EVENT_PATTERN)
 
     def __init__(self, *args, **kwargs):
         super().__init__(
@@ -1624,7 +2592,7 @@ class WrongBootOrderSignature(ErrorSignature):
         )
 
     def _process_ticket(self, url, issue_key):
-        md = get_metadata_json(url)
+        md = self.context.metadata
 
         cluster = md["cluster"]
         status_info = cluster["status_info"]
@@ -1632,23 +2600,20 @@ class WrongBootOrderSignature(ErrorSignature):
         if self.ERROR_PATTERN not in status_info:
             return
 
-        cluster_id = cluster["id"]
         report = ""
-        events = get_cluster_installation_events(url, cluster_id)
-        reboot_events_by_host = defaultdict(list)
-        for event in events:
-            if self.EVENT_PATTERN in event["message"]:
-                reboot_events_by_host[event["host_id"]].append(event)
+        events = self.context.events_store
+        first_reboot_event_by_host = {}
+        for row, _match in events.matches("boot_from_installation_disk"):
+            first_reboot_event_by_host.setdefault(events.host_id(row), row)
 
         hosts = []
-        for host in cluster["hosts"]:
-            events = reboot_events_by_host[host["id"]]
-            if len(events) != 0:
+        for host in self.context.hosts:
+            if host.id in first_reboot_event_by_host:
                 hosts.append(
                     OrderedDict(
-                        id=host["id"],
-                        hostname=self._get_hostname(host),
-                        message=events[0]["message"],
+                        id=host.id,
+                        hostname=host.hostname,
+                        message=events.message(first_reboot_event_by_host[host.id]),
                     )
                 )
 
@@ -1668,6 +2633,8 @@ class ReleasePullErrorSignature(ErrorSignature):
     This signature finds tickets for clusters where release image cannot be pulled by bootstrap node
     """
 
+    REQUIRED_INPUTS = ("metadata", "host_logs")
+
     ERROR_PATTERN = re.compile(r"release-image-download\.sh\[.+\]: Pull failed")
 
     def __init__(self, *args, **kwargs):
@@ -1678,25 +2645,22 @@ class ReleasePullErrorSignature(ErrorSignature):
             label="release_pull_error",
         )
 
-    def _process_ticket(self, url, issue_key):
-
-        md = get_metadata_json(url)
-
-        cluster = md["cluster"]
-        cluster_id = cluster["id"]
+    def register_scans(self, host_log_scans):
+        host_log_scans.register(
+            "journal.logs", type(self).__name__, lambda: MatchCollector(self.ERROR_PATTERN, limit=1)
+        )
 
-        triage_logs_tar = get_triage_logs_tar(triage_url=url, cluster_id=cluster_id)
+    def _process_ticket(self, url, issue_key):
+        journal_logs_scans = self.context.host_log_scans.results("journal.logs", type(self).__name__)
 
         report = ""
-        for host in cluster["hosts"]:
+        for host in self.context.hosts:
             host_id = host["id"]
 
-            try:
-                journal_logs = get_host_log_file(triage_logs_tar, host_id, "journal.logs")
-            except FileNotFoundError:
+            if host_id not in journal_logs_scans:
                 continue
 
-            if self.ERROR_PATTERN.findall(journal_logs):
+            if journal_logs_scans[host_id].matches:
                 report += dedent(
                     f"""
                 h2. Release image cannot be pulled on {host_id} ({self._get_hostname(host)})"""
@@ -1714,6 +2678,8 @@ class EventsInstallationAttempts(Signature):
     begins.
     """
 
+    REQUIRED_INPUTS = ("metadata", "events")
+
     def __init__(self, *args, **kwargs):
         super().__init__(
             *args,
@@ -1722,21 +2688,16 @@ class EventsInstallationAttempts(Signature):
         )
 
     def _process_ticket(self, url, issue_key):
-        md = get_metadata_json(url)
+        events = self.context.events_store
+        installation_attempts = events.attempts
 
-        cluster = md["cluster"]
-        cluster_id = cluster["id"]
-
-        installation_attempts = len(_partition_cluster_events(url, cluster_id))
-
-        if installation_attempts != 1:
-            last_attempt_first_event = get_cluster_installation_events(url, cluster_id)[0]
+        if installation_attempts > 1:
             self._update_triaging_ticket(
                 dedent(
                     f"""
                     The events file for this cluster contains events from {installation_attempts} installation attempts.
                     When reading the events for this ticket, make sure you look only at the events for the last installation attempt,
-                    the first event in that attempt happened around {{*}}{last_attempt_first_event["event_time"]}{{*}}.
+                    the first event in that attempt happened around {{*}}{events.first_event_time}{{*}}.
                     """
                 ).strip()
             )
@@ -1749,6 +2710,8 @@ class ControllerOperatorStatus(Signature):
     format
     """
 
+    REQUIRED_INPUTS = ("metadata", "controller_logs")
+
     def __init__(self, *args, **kwargs):
         super().__init__(
             *args,
@@ -1757,15 +2720,12 @@ class ControllerOperatorStatus(Signature):
         )
 
     def _process_ticket(self, url, issue_key):
-        try:
-            controller_logs = get_controller_logs(url)
-        except FileNotFoundError:
-            return
+        controller_log_records = self.context.controller_log_records
 
         # We want to consider unhealthy operators that have a condition explicitly marking them as
         # degraded, unavailable or progressing and also operators that don't have any explicit
         # condition:
-        operator_statuses = operator_statuses_from_controller_logs(controller_logs, include_empty=True)
+        operator_statuses = operator_statuses_from_controller_logs(controller_log_records, include_empty=True)
         unhealthy_operators = filter_operators(
             operator_statuses,
             (
@@ -1804,6 +2764,8 @@ class DualStackBadRoute(ErrorSignature):
     Looks for https://bugzilla.redhat.com/show_bug.cgi?id=2088346
     """
 
+    REQUIRED_INPUTS = ("metadata", "log_bundle")
+
     fatal_error_regex = re.compile(r"^F.*failed to get default gateway interface$", re.MULTILINE)
 
     def __init__(self, *args, **kwargs):
@@ -1816,9 +2778,7 @@ class DualStackBadRoute(ErrorSignature):
 
     def _process_ticket_helper(self, url, path):
         try:
-            ovnkube_logs = get_triage_logs_tar(triage_url=url, cluster_id=get_metadata_json(url)["cluster"]["id"]).get(
-                path
-            )
+            ovnkube_logs = self.context.logs_tar.get(path)
         except FileNotFoundError:
             return
 
@@ -1832,13 +2792,7 @@ class DualStackBadRoute(ErrorSignature):
             )
 
     def _process_ticket(self, url, issue_key):
-        new_logs_path = NEW_LOG_BUNDLE_PATH + "control-plane/*/containers/ovnkube-node-*.log"
-        old_logs_path = OLD_LOG_BUNDLE_PATH + "control-plane/*/containers/ovnkube-node-*.log"
-        try:
-            self._process_ticket_helper(url, new_logs_path)
-        except FileNotFoundError:
-            logger.warning(f"Could not find the ovnkube-node log under {new_logs_path}, attempting {old_logs_path}")
-            self._process_ticket_helper(url, old_logs_path)
+        self._process_ticket_helper(url, self.context.log_bundle + "control-plane/*/containers/ovnkube-node-*.log")
 
 
 class StaticNetworking(Signature):
@@ -1864,7 +2818,7 @@ class StaticNetworking(Signature):
         )
 
     def _process_ticket(self, url, issue_key):
-        infraenvs = get_metadata_json(url).get("infraenvs", [])
+        infraenvs = self.context.metadata.get("infraenvs", [])
         messages = [
             f"""Infraenv {infraenv["name"]} has static network config:
 {{code}}
@@ -1885,6 +2839,8 @@ class NodeStatus(Signature):
     Dumps the node statuses from the installer gather
     """
 
+    REQUIRED_INPUTS = ("metadata", "log_bundle")
+
     def __init__(self, *args, **kwargs):
         super().__init__(
             *args,
@@ -1903,9 +2859,7 @@ class NodeStatus(Signature):
 
     def _process_ticket_helper(self, url, path):
         try:
-            nodes_json = get_triage_logs_tar(triage_url=url, cluster_id=get_metadata_json(url)["cluster"]["id"]).get(
-                path
-            )
+            nodes_json = self.context.logs_tar.get(path)
         except FileNotFoundError:
             return
 
@@ -1935,14 +2889,7 @@ class NodeStatus(Signature):
         self._update_triaging_ticket(report)
 
     def _process_ticket(self, url, issue_key):
-        new_logs_path = NEW_LOG_BUNDLE_PATH + "resources/nodes.json"
-        old_logs_path = OLD_LOG_BUNDLE_PATH + "resources/nodes.json"
-        try:
-            report = self._process_ticket_helper(url, new_logs_path)
-        except FileNotFoundError:
-            logger.warning(f"Could not find nodes.json under {new_logs_path}, attempting {old_logs_path}")
-            return self._process_ticket_helper(url, old_logs_path)
-        return report
+        self._process_ticket_helper(url, self.context.log_bundle + "resources/nodes.json")
 
 
 class HostsInterfacesSignature(Signature):
@@ -1954,17 +2901,13 @@ class HostsInterfacesSignature(Signature):
         )
 
     def _process_ticket(self, url, issue_key):
-        md = get_metadata_json(url)
-
-        cluster = md["cluster"]
-
         hosts = []
-        for host in cluster["hosts"]:
+        for host in self.context.hosts:
             interfaces = self._get_interfaces(host)
             hosts.append(
                 OrderedDict(
-                    id=host["id"],
-                    hostname=self._get_hostname(host),
+                    id=host.id,
+                    hostname=host.hostname,
                     name="\n".join(interfaces["name"]),
                     mac_address="\n".join(interfaces["mac_address"]),
                     ipv4_addresses="\n".join(interfaces["ipv4_addresses"]),
@@ -1975,22 +2918,22 @@ class HostsInterfacesSignature(Signature):
         report = self._generate_table_for_report(hosts)
         self._update_triaging_ticket(report)
 
-    def _get_interfaces(self, host: dict):
-        inventory = json.loads(host["inventory"])
+    def _get_interfaces(self, host: cluster_model.Host):
         interfaces_details = defaultdict(list)
-        for interface in inventory.get("interfaces", []):
-            name = interface.get("name")
-            if not name:
+        for interface in host.inventory.interfaces:
+            if not interface.name:
                 continue
-            interfaces_details["name"].append(name)
-            interfaces_details["mac_address"].append(json.dumps(interface.get("mac_address")))
-            interfaces_details["ipv4_addresses"].append(json.dumps(interface.get("ipv4_addresses", [])))
-            interfaces_details["ipv6_addresses"].append(json.dumps(interface.get("ipv6_addresses", [])))
+            interfaces_details["name"].append(interface.name)
+            interfaces_details["mac_address"].append(json.dumps(interface.mac_address))
+            interfaces_details["ipv4_addresses"].append(json.dumps(interface.ipv4_addresses))
+            interfaces_details["ipv6_addresses"].append(json.dumps(interface.ipv6_addresses))
 
         return interfaces_details
 
 
 class ErrorCreatingReadWriteLayer(ErrorSignature):
+    REQUIRED_INPUTS = ("metadata", "must_gather")
+
     def __init__(self, *args, **kwargs):
         super().__init__(
             *args,
@@ -2013,27 +2956,17 @@ class ErrorCreatingReadWriteLayer(ErrorSignature):
         )
 
     @classmethod
-    def _get_namespace_pods(cls, namespace_dir: pathlib.Path):
-        podsYaml = namespace_dir / "core" / "pods.yaml"
-        if podsYaml.exists():
-            with podsYaml.open() as f:
-                yield from (pod for pod in yaml.safe_load(f).get("items", []))
-
-    @classmethod
-    def _get_all_pods(cls, must_gather_namespaces_dir):
-        for namespace_dir in must_gather_namespaces_dir.iterdir():
-            if namespace_dir.is_dir():
-                yield from cls._get_namespace_pods(namespace_dir)
-
-    @classmethod
-    def _get_bad_pods(cls, must_gather_namespace_dir):
-        return (pod for pod in cls._get_all_pods(must_gather_namespace_dir) if cls.is_bad_pod(pod))
+    def _get_bad_pods(cls, must_gather_namespaces_dir: pathlib.Path):
+        # Bad pods have the CreateContainerError reason, the pods.yaml files that don't aren't parsed
+        return must_gather_scan.scan_namespace_resources(
+            must_gather_namespaces_dir, "core/pods.yaml", cls.is_bad_pod, prefilter=b"CreateContainerError"
+        )
 
     def _process_ticket(self, url, issue_key):
         try:
-            must_gather_namespaces_dir = get_triage_logs_tar(
-                triage_url=url, cluster_id=get_metadata_json(url)["cluster"]["id"]
-            ).get("controller_logs.tar.gz/must-gather.tar.gz/must-gather.local.*/*/namespaces")
+            must_gather_namespaces_dir = self.context.logs_tar.get(
+                "controller_logs.tar.gz/must-gather.tar.gz/must-gather.local.*/*/namespaces"
+            )
         except FileNotFoundError:
             return
 
@@ -2046,6 +2979,8 @@ class ErrorCreatingReadWriteLayer(ErrorSignature):
 
 
 class DualstackrDNSBug(ErrorSignature):
+    REQUIRED_INPUTS = ("metadata", "log_bundle")
+
     def __init__(self, *args, **kwargs):
         super().__init__(
             *args,
@@ -2055,7 +2990,7 @@ class DualstackrDNSBug(ErrorSignature):
         )
 
     def _process_ticket_helper(self, url, path):
-        triage_logs_tar = get_triage_logs_tar(triage_url=url, cluster_id=get_metadata_json(url)["cluster"]["id"])
+        triage_logs_tar = self.context.logs_tar
 
         try:
             kubeapiserver_logs = triage_logs_tar.get(path)
@@ -2068,13 +3003,7 @@ class DualstackrDNSBug(ErrorSignature):
             )
 
     def _process_ticket(self, url, issue_key):
-        new_logs_path = NEW_LOG_BUNDLE_PATH + "bootstrap/containers/kube-apiserver-*.log"
-        old_logs_path = OLD_LOG_BUNDLE_PATH + "bootstrap/containers/kube-apiserver-*.log"
-        try:
-            self._process_ticket_helper(url, new_logs_path)
-        except FileNotFoundError:
-            logger.warning(f"Could not find kube-apiserver logs under {new_logs_path}, attempting {old_logs_path}")
-            self._process_ticket_helper(url, old_logs_path)
+        self._process_ticket_helper(url, self.context.log_bundle + "bootstrap/containers/kube-apiserver-*.log")
 
 
 class InsufficientLVMCleanup(ErrorSignature):
@@ -2087,13 +3016,11 @@ class InsufficientLVMCleanup(ErrorSignature):
         )
 
     def _process_ticket(self, url, issue_key):
-        cluster = get_metadata_json(url)["cluster"]
-
         host_messages = [
-            f"Host {self._get_hostname(host)} has LVM disks and has the 'Can't open' coreos-installer error, this is probably due to MGMT-11695"
-            for host in cluster["hosts"]
+            f"Host {host.hostname} has LVM disks and has the 'Can't open' coreos-installer error, this is probably due to MGMT-11695"
+            for host in self.context.hosts
             if "Can't open" in host.get("status_info", "")
-            and any(disk.get("drive_type") == "LVM" for disk in json.loads(host["inventory"]).get("disks", []))
+            and any(disk.drive_type == "LVM" for disk in host.inventory.disks)
         ]
 
         if host_messages:
@@ -2105,11 +3032,13 @@ class ErrorOnCleanupInstallDevice(Signature):
     This signature monitors errors on cleanupInstallDevice function
     """
 
+    REQUIRED_INPUTS = ("metadata", "host_logs")
+
     # This has to be maintained to be the same format as
     # https://github.com/openshift/assisted-installer/blob/51c021f3245ef1d9e1a50a3e31dc23350cdc5d32/src/installer/installer.go#L98
     # Remember to maintain backwards compatibility if that format ever changes - create
     # PATTERN_NEW and try to match both.
-    LOG_PATTERN = re.compile(r'msg="(?P<message>failed to prepare install device.*)"')
+    MSG_PREFIX = "failed to prepare install device"
 
     def __init__(self, *args, **kwargs):
         super().__init__(
@@ -2118,24 +3047,28 @@ class ErrorOnCleanupInstallDevice(Signature):
             comment_identifying_string="h1. Non-fatal error(s) occured trying to perform best-effort cleanup on installation disk",
         )
 
+    def register_scans(self, host_log_scans):
+        host_log_scans.register(
+            "installer.logs",
+            type(self).__name__,
+            lambda: RecordCollector(lambda record: record.msg.startswith(self.MSG_PREFIX), limit=1),
+        )
+
     def _process_ticket(self, url, issue_key):
-        cluster = get_metadata_json(url)["cluster"]
-        triage_logs_tar = get_triage_logs_tar(triage_url=url, cluster_id=cluster["id"])
+        installer_logs_scans = self.context.host_log_scans.results("installer.logs", type(self).__name__)
 
         hosts = []
-        for host in cluster["hosts"]:
+        for host in self.context.hosts:
             host_id = host["id"]
 
-            try:
-                installer_logs = get_host_log_file(triage_logs_tar, host_id, "installer.logs")
-            except FileNotFoundError:
+            if host_id not in installer_logs_scans:
                 continue
 
-            if match := self.LOG_PATTERN.search(installer_logs):
+            if records := installer_logs_scans[host_id].records:
                 hosts.append(
                     OrderedDict(
                         host=self._get_hostname(host),
-                        message=match.group("message"),
+                        message=records[0].msg,
                     )
                 )
 
@@ -2146,6 +3079,8 @@ class ErrorOnCleanupInstallDevice(Signature):
 
 
 class UserManagedNetworkingLoadBalancer(ErrorSignature):
+    REQUIRED_INPUTS = ("metadata", "controller_logs")
+
     lb_operators = {"authentication", "console", "ingress"}
 
     def __init__(self, *args, **kwargs):
@@ -2157,7 +3092,7 @@ class UserManagedNetworkingLoadBalancer(ErrorSignature):
         )
 
     def _process_ticket(self, url, issue_key):
-        md = get_metadata_json(url)
+        md = self.context.metadata
         cluster_md = md["cluster"]
         if not cluster_md.get("user_managed_networking", False):
             return
@@ -2165,13 +3100,8 @@ class UserManagedNetworkingLoadBalancer(ErrorSignature):
         if cluster_md.get("high_availability_mode") == "None":
             return
 
-        try:
-            controller_logs = get_controller_logs(url)
-        except FileNotFoundError:
-            return
-
         unhealthy_operators = filter_operators(
-            operator_statuses_from_controller_logs(controller_logs),
+            operator_statuses_from_controller_logs(self.context.controller_log_records),
             (("Degraded", True), ("Available", False), ("Progressing", True)),
             aggregation_function=any,
         )
@@ -2197,7 +3127,7 @@ class TagAnalysis(Signature):
         )
 
     def _process_ticket(self, url, issue_key):
-        tags = set(get_metadata_json(url)["cluster"].get("tags", "").split(","))
+        tags = set(self.context.cluster.get("tags", "").split(","))
 
         if tags == {""}:
             return
@@ -2233,7 +3163,7 @@ class SkipDisks(ErrorSignature):
     def _process_ticket(self, url, issue_key):
         skip_disks = {
             host["id"]: host["skip_formatting_disks"].split(",")
-            for host in get_metadata_json(url)["cluster"].get("hosts", [])
+            for host in self.context.cluster.get("hosts", [])
             if host.get("skip_formatting_disks", None) is not None and host["skip_formatting_disks"] != ""
         }
 
@@ -2251,13 +3181,14 @@ class FailedRequestTriggersHostTimeout(Signature):
     This signature looks for failed requests that could have caused an host timeout, ultimately failing installation
     """
 
+    REQUIRED_INPUTS = ("metadata", "host_logs")
+
     # This has to be maintained to be the same format as
     # https://github.com/openshift/assisted-installer-agent/blob/aebd94105b4ed6442f21a7a26ab4e40eafd936aa/src/commands/step_processor.go#L81
     # Remember to maintain backwards compatibility if that format ever changes - create
     # PATTERN_NEW and try to match both.
-    LOG_PATTERN = re.compile(
-        r'time="(?P<time>.+)" level=(?P<severity>[a-z]+) msg="(?P<message>.*api\.openshift\.com/api/assisted-install.*Service Unavailable)" file=.+'
-    )
+    API_URL = "api.openshift.com/api/assisted-install"
+    MSG_SUFFIX = "Service Unavailable"
 
     HOST_TIMED_OUT_STATUS_INFO = "Host failed to install due to timeout while connecting to host"
 
@@ -2268,11 +3199,22 @@ class FailedRequestTriggersHostTimeout(Signature):
             comment_identifying_string="h1. Failed request triggering host timeout",
         )
 
+    def register_scans(self, host_log_scans):
+        host_log_scans.register(
+            "agent.logs",
+            type(self).__name__,
+            lambda: RecordCollector(
+                lambda record: record.file is not None
+                and record.msg.endswith(self.MSG_SUFFIX)
+                and self.API_URL in record.msg,
+                limit=1,
+            ),
+        )
+
     def _process_ticket(self, url, issue_key):
-        cluster = get_metadata_json(url)["cluster"]
-        triage_logs_tar = get_triage_logs_tar(triage_url=url, cluster_id=cluster["id"])
+        cluster = self.context.cluster
 
-        failed_requests_hosts = self._failed_requests_hosts(cluster, triage_logs_tar)
+        failed_requests_hosts = self._failed_requests_hosts()
         timed_out_hosts = self._timed_out_hosts(cluster)
         messages = [
             f"h2. Host {host_id} has request failures and timed out. Did the request cause the host to timeout?"
@@ -2286,18 +3228,9 @@ class FailedRequestTriggersHostTimeout(Signature):
         if len(messages) > 0:
             self._update_triaging_ticket("\n".join(messages))
 
-    @classmethod
-    def _failed_requests_hosts(cls, cluster, triage_logs_tar):
-        failed_requests_hosts = set()
-        for host in cluster["hosts"]:
-            try:
-                agent_logs = get_host_log_file(triage_logs_tar, host["id"], "agent.logs")
-            except FileNotFoundError:
-                continue
-
-            if len(re.findall(cls.LOG_PATTERN, agent_logs)) > 0:
-                failed_requests_hosts.add(host["id"])
-        return failed_requests_hosts
+    def _failed_requests_hosts(self):
+        agent_logs_scans = self.context.host_log_scans.results("agent.logs", type(self).__name__)
+        return {host_id for host_id, agent_logs_scan in agent_logs_scans.items() if agent_logs_scan.records}
 
     @classmethod
     def _timed_out_hosts(cls, cluster):
@@ -2309,6 +3242,8 @@ class ControllerWarnings(Signature):
     This signature looks at the controller logs and searches for warnings
     """
 
+    REQUIRED_INPUTS = ("metadata", "controller_logs")
+
     def __init__(self, *args, **kwargs):
         super().__init__(
             *args,
@@ -2317,14 +3252,8 @@ class ControllerWarnings(Signature):
         )
 
     def _process_ticket(self, url, issue_key):
-        try:
-            controller_logs = get_controller_logs(url)
-        except FileNotFoundError:
-            logger.info("Skipping ControllerWarnings signature because no controller logs")
-            return
-
         max_shown = 10
-        warnings = warnings_from_controller_logs(controller_logs)
+        warnings = warnings_from_controller_logs(self.context.controller_log_records)
         if len(warnings) != 0:
             warning_text = "\n".join(warnings[:max_shown])
 
@@ -2341,6 +3270,8 @@ class MissingOSTreePivot(ErrorSignature):
     This signature looks for missing pivot URL in rpm-ostree status of the control-plane hosts
     """
 
+    REQUIRED_INPUTS = ("metadata", "log_bundle")
+
     PIVOT_URL_PATTERN = re.compile(r"pivot://.*")
 
     def __init__(self, *args, **kwargs):
@@ -2351,21 +3282,15 @@ class MissingOSTreePivot(ErrorSignature):
             comment_identifying_string="h1. MCO didn't pivot some hosts",
         )
 
-    def _process_ticket_helper(self, url, path):
-        triage_logs_tar = get_triage_logs_tar(triage_url=url, cluster_id=get_metadata_json(url)["cluster"]["id"])
+    def _process_ticket(self, url, issue_key):
+        triage_logs_tar = self.context.logs_tar
         hosts = []
 
-        try:
-            # Fetch control-plane directory from the bootstrap log bundle
-            control_plane_dir = triage_logs_tar.get(path)
-        except FileNotFoundError:
-            return
-
-        for node_dir in control_plane_dir.iterdir():
-            node_ip = os.path.basename(node_dir)
+        # The control-plane node directories of the bootstrap log bundle
+        for node_ip, node_dir in self.context.logs_index.node_dirs().items():
             try:
                 # Fetch ostree status file for the node
-                ostree_status_file = triage_logs_tar.get(f"{path}/{node_ip}/rpm-ostree/status")
+                ostree_status_file = triage_logs_tar.get(f"{node_dir}/rpm-ostree/status")
             except FileNotFoundError:
                 return
 
@@ -2373,7 +3298,7 @@ class MissingOSTreePivot(ErrorSignature):
             if not self.PIVOT_URL_PATTERN.search(ostree_status_file):
                 try:
                     # Get hostname according to node_ip
-                    hostname = triage_logs_tar.get(f"{path}/{node_ip}/network/hostname.txt")
+                    hostname = triage_logs_tar.get(f"{node_dir}/network/hostname.txt")
                 except FileNotFoundError:
                     return
 
@@ -2395,21 +3320,14 @@ class MissingOSTreePivot(ErrorSignature):
                 )
             )
 
-    def _process_ticket(self, url, issue_key):
-        new_logs_path = NEW_LOG_BUNDLE_PATH + "control-plane"
-        old_logs_path = OLD_LOG_BUNDLE_PATH + "control-plane"
-        try:
-            self._process_ticket_helper(url, new_logs_path)
-        except FileNotFoundError:
-            logger.warning(f"Could not find the host log under {new_logs_path}, attempting {old_logs_path}")
-            self._process_ticket_helper(url, old_logs_path)
-
 
 class ControllerFailedToStart(ErrorSignature):
     """
     This signature looks for missing pivot URL in rpm-ostree status of the control-plane hosts
     """
 
+    REQUIRED_INPUTS = ("metadata", "log_bundle")
+
     def __init__(self, *args, **kwargs):
         super().__init__(
             *args,
@@ -2419,13 +3337,13 @@ class ControllerFailedToStart(ErrorSignature):
         )
 
     def _process_ticket_helper(self, url, path):
-        cluster = get_metadata_json(url)["cluster"]
+        cluster = self.context.cluster
         bootstrap_node = [host for host in cluster["hosts"] if host["bootstrap"]][0]
 
         if bootstrap_node["progress"]["current_stage"] != "Waiting for controller":
             return
 
-        triage_logs_tar = get_triage_logs_tar(triage_url=url, cluster_id=cluster["id"])
+        triage_logs_tar = self.context.logs_tar
         try:
             # Fetch pods.json from the bootstrap log bundle
             pods_json = triage_logs_tar.get(path)
@@ -2471,13 +3389,7 @@ class ControllerFailedToStart(ErrorSignature):
             )
 
     def _process_ticket(self, url, issue_key):
-        new_logs_path = NEW_LOG_BUNDLE_PATH + "resources/pods.json"
-        old_logs_path = OLD_LOG_BUNDLE_PATH + "resources/pods.json"
-        try:
-            self._process_ticket_helper(url, new_logs_path)
-        except FileNotFoundError:
-            logger.warning(f"Could not find the host log under {new_logs_path}, attempting {old_logs_path}")
-            self._process_ticket_helper(url, old_logs_path)
+        self._process_ticket_helper(url, self.context.log_bundle + "resources/pods.json")
 
 
 class MachineConfigDaemonErrorExtracting(ErrorSignature):
@@ -2485,6 +3397,8 @@ class MachineConfigDaemonErrorExtracting(ErrorSignature):
     Looks for https://issues.redhat.com/browse/OCPBUGS-5352
     """
 
+    REQUIRED_INPUTS = ("metadata", "log_bundle")
+
     mco_error = re.compile(r"must be empty, pass --confirm to overwrite contents of directory$", re.MULTILINE)
 
     def __init__(self, *args, **kwargs):
@@ -2496,7 +3410,7 @@ class MachineConfigDaemonErrorExtracting(ErrorSignature):
 
     def _process_ticket_helper(self, url, path):
         try:
-            mcd_logs = get_triage_logs_tar(triage_url=url, cluster_id=get_metadata_json(url)["cluster"]["id"]).get(path)
+            mcd_logs = self.context.logs_tar.get(path)
         except FileNotFoundError:
             return
 
@@ -2510,15 +3424,98 @@ class MachineConfigDaemonErrorExtracting(ErrorSignature):
             )
 
     def _process_ticket(self, url, issue_key):
-        new_logs_path = NEW_LOG_BUNDLE_PATH + "control-plane/*/journals/machine-config-daemon-firstboot.log"
-        old_logs_path = OLD_LOG_BUNDLE_PATH + "control-plane/*/journals/machine-config-daemon-firstboot.log"
-        try:
-            self._process_ticket_helper(url, new_logs_path)
-        except FileNotFoundError:
-            logger.warning(
-                f"Could not find the machine-config-daemon-firstboot log under {new_logs_path}, attempting {old_logs_path}"
+        self._process_ticket_helper(
+            url, self.context.log_bundle + "control-plane/*/journals/machine-config-daemon-firstboot.log"
+        )
+
+
+class RareLogTemplates(Signature):
+    """
+    Mines the templates of the agent and installer logs of the hosts (see
+    log_templates) into the table of templates seen across tickets, and reports
+    the warning and error templates that no, or few, other tickets have
+    """
+
+    REQUIRED_INPUTS = ("metadata", "host_logs")
+
+    FILENAMES = ("agent.logs", "installer.logs")
+    REPORTED_LEVELS = ("warning", "error", "fatal", "panic")
+    # Until the table has that many other tickets with a file, every template of the file is new
+    MIN_HISTORY_TICKETS = 20
+    # Templates seen in at most that many other tickets are rare
+    MAX_RARE_TICKETS = 2
+    MAX_SHOWN = 20
+    MAX_EXAMPLE_LENGTH = 300
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(
+            *args,
+            **kwargs,
+            comment_identifying_string="h1. Rare log templates",
+        )
+
+    def register_scans(self, host_log_scans):
+        for filename in self.FILENAMES:
+            host_log_scans.register(filename, type(self).__name__, TemplateCollector)
+
+    def _process_ticket(self, url, issue_key):
+        if LOG_TEMPLATES is None:
+            return
+
+        hostnames = {host["id"]: self._get_hostname(host) for host in self.context.hosts}
+        templates = []
+        for filename in self.FILENAMES:
+            collectors = self.context.host_log_scans.results(filename, type(self).__name__)
+            mined = [
+                (host_id, collector.examples[template.id], template)
+                for host_id, collector in collectors.items()
+                for template in collector.miner.templates
+            ]
+            history_tickets, observations = LOG_TEMPLATES.observe(
+                issue_key,
+                filename,
+                [(template.tokens, template.count) for _host_id, _example, template in mined],
+                record=self.dry_run_file is None,
             )
-            self._process_ticket_helper(url, old_logs_path)
+            if history_tickets < self.MIN_HISTORY_TICKETS:
+                continue
+
+            rare_templates = {}
+            for (host_id, example, _template), observation in zip(mined, observations):
+                level, *tokens = observation.template.tokens
+                if level not in self.REPORTED_LEVELS or observation.previous_tickets > self.MAX_RARE_TICKETS:
+                    continue
+
+                rare_template = rare_templates.setdefault(
+                    observation.template.id,
+                    OrderedDict(
+                        file=filename,
+                        level=level,
+                        template=" ".join(tokens).replace("|", "¦"),
+                        other_tickets=observation.previous_tickets or "never seen",
+                        lines=0,
+                        hosts=set(),
+                        example=example[: self.MAX_EXAMPLE_LENGTH].replace("|", "¦"),
+                    ),
+                )
+                rare_template["lines"] += observation.lines
+                rare_template["hosts"].add(hostnames.get(host_id, host_id))
+            templates.extend(rare_templates.values())
+
+        if not templates:
+            return
+
+        templates.sort(key=lambda template: (template["other_tickets"] != "never seen", -template["lines"]))
+        for template in templates:
+            template["hosts"] = ", ".join(sorted(template["hosts"]))
+        report = (
+            f"Warnings and errors of the host logs whose templates were seen in at most {self.MAX_RARE_TICKETS} "
+            "other tickets:\n"
+        )
+        report += self._generate_table_for_report(templates[: self.MAX_SHOWN])
+        if len(templates) > self.MAX_SHOWN:
+            report += f"There are {len(templates) - self.MAX_SHOWN} additional rare templates but they are not shown\n"
+        self._update_triaging_ticket(report)
 
 
 ############################
@@ -2568,6 +3565,7 @@ ALL_SIGNATURES = [
     MissingOSTreePivot,
     MachineConfigDaemonErrorExtracting,
     ControllerFailedToStart,
+    RareLogTemplates,
 ]
 
 ############################
@@ -2599,18 +3597,10 @@ def group_similar_strings(ls, ratio):
     Example:
     input: ['rakesh', 'zakesh', 'goldman LLC', 'oldman LLC', 'bakesh']
     output groups: [['rakesh', 'zakesh', 'bakesh'], ['goldman LLC', 'oldman LLC']]
-    """
-
-    groups = []
-    for item in ls:
-        for group in groups:
-            if all(fuzz.ratio(item, w) > ratio for w in group):
-                group.append(item)
-                break
-        else:
-            groups.append([item])
 
-    return groups
+    See similarity_groups for how this scales to large numbers of strings.
+    """
+    return similarity_groups.group_similar_strings(ls, ratio)
 
 
 def condition_has_result(operator_conditions, expected_condition_name: str, expected_condition_result: str) -> bool:
@@ -2632,15 +3622,19 @@ def filter_operators(operator_statuses, required_conditions, aggregation_functio
     }
 
 
-def operator_statuses_from_controller_logs(controller_log, include_empty=False):
-    operator_regex = re.compile(r"Operator ([a-z\-]+), statuses: \[(.*)\].*")
+def operator_statuses_from_controller_logs(controller_log_records, include_empty=False):
+    operator_regex = re.compile(r"Operator ([a-z\-]+), statuses: \[(.*)\]")
     conditions_regex = re.compile(r"\{(.+?)\}")
     condition_regex = re.compile(
         r"([A-Za-z]+) (False|True) ([0-9a-zA-Z\-]+ [0-9a-zA-Z\:]+ [0-9a-zA-Z\-\+]+ [A-Z]+) (.*)"
     )
     operator_statuses = defaultdict(dict)
 
-    for operator_name, operator_status in operator_regex.findall(controller_log):
+    for record in controller_log_records.select(contains="Operator "):
+        operator_match = operator_regex.search(record.msg)
+        if operator_match is None:
+            continue
+        operator_name, operator_status = operator_match.groups()
         if include_empty:
             operator_statuses[operator_name] = {}
         for operator_conditions_raw in conditions_regex.findall(operator_status):
@@ -2659,9 +3653,8 @@ def operator_statuses_from_controller_logs(controller_log, include_empty=False):
     return operator_statuses
 
 
-def warnings_from_controller_logs(controller_log):
-    warning_regex = re.compile(r'time=".*" level=warning msg=".*')
-    return warning_regex.findall(controller_log)
+def warnings_from_controller_logs(controller_log_records):
+    return [controller_log_records.line(record) for record in controller_log_records.select(level="warning")]
 
 
 def get_issue(jira_client, issue_key):
@@ -2698,11 +3691,13 @@ def get_logs_url_from_issue(issue):
     return m.groups()[0]
 
 
-def get_all_triage_tickets(jira_client, only_recent=False):
+def triage_tickets_jql(only_recent=False):
     recent_filter = "" if not only_recent else "and created >= -31d"
-    query = f"project = AITRIAGE AND component = Cloud-Triage {recent_filter}"
+    return f"project = AITRIAGE AND component = Cloud-Triage {recent_filter}".strip()
 
-    return jira_client.search_issues(query, maxResults=None)
+
+def get_all_triage_tickets(jira_client, only_recent=False):
+    return jira_client.search_issues(triage_tickets_jql(only_recent), maxResults=None)
 
 
 def get_issues(jira_client, issue, query=None, only_recent=True):
@@ -2722,44 +3717,228 @@ def get_ticket_browse_url(issue_key):
     return f"{JIRA_SERVER}/browse/{issue_key}"
 
 
+def _get_ticket_logs_url(issue):
+    logger.debug(f"Issue {issue}")
+    try:
+        ticket_logs_url = get_logs_url_from_issue(issue)
+    except Exception:
+        logger.exception("Error getting logs url of %s", issue.key)
+        return None
+
+    if ticket_logs_url is None:
+        logger.warning(f"Could not get URL from issue {get_ticket_browse_url(issue.key)}. Skipping")
+
+    return ticket_logs_url
+
+
+def process_issue(
+    jira_client,
+    issue,
+    should_reevaluate: bool,
+    only_specific_signatures,
+    dry_run_file,
+):
+    ticket_logs_url = _get_ticket_logs_url(issue)
+    if ticket_logs_url is None:
+        return
+
+    process_ticket_with_signatures(
+        jira_client,
+        ticket_logs_url,
+        issue.key,
+        should_reevaluate=should_reevaluate,
+        only_specific_signatures=only_specific_signatures,
+        dry_run_file=dry_run_file,
+    )
+
+    # Hacky solution to prevent tqdm from writing over the last line of the signature
+    if dry_run_file == sys.stdout:
+        sys.stdout.write("\n")
+
+
+_PIPELINE_DONE = object()
+
+
+class _IssuesPipeline:
+    """
+    Processes issues in three stages connected by queues, see TicketRun:
+
+    - prefetch threads load the inputs of the next tickets
+    - analysis workers run the signatures on the prefetched tickets
+    - the writer (the calling thread) sends the Jira writes of the analyzed
+      tickets, and their dry run output, one ticket at a time
+
+    A prefetch thread only starts loading a ticket once one of the prefetch
+    slots is free, a slot is released when a worker picks the ticket up. So at
+    most prefetch tickets are loaded ahead of the analysis, in addition to the
+    workers tickets being analyzed. Analyzed tickets only hold their pending
+    Jira writes, at most workers of them wait for the writer.
+
+    If the writer stops early (e.g. on KeyboardInterrupt), the other stages
+    are cancelled and the tickets they hold are discarded.
+    """
+
+    POLL_INTERVAL = 0.1
+
+    def __init__(self, jira_client, should_reevaluate, only_specific_signatures, dry_run_file, workers, prefetch):
+        self.jira_client = jira_client
+        self.should_reevaluate = should_reevaluate
+        self.only_specific_signatures = only_specific_signatures
+        self.dry_run_file = dry_run_file
+        self.workers = max(workers, 1)
+        self.prefetch = prefetch
+        self._prefetch_slots = threading.Semaphore(max(prefetch, 1))
+        self._prefetched = queue.Queue()
+        self._analyzed = queue.Queue(maxsize=self.workers)
+        self._cancelled = threading.Event()
+
+    def run(self, issues, progress_bar):
+        threads = [threading.Thread(target=self._prefetch_stage, args=(issues,), name="prefetch", daemon=True)]
+        threads += [
+            threading.Thread(target=self._analysis_stage, name=f"analysis-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for thread in threads:
+            thread.start()
+
+        try:
+            for _ in issues:
+                self._write(*self._analyzed.get())
+                progress_bar.update()
+        finally:
+            # Only has an effect if the writer stopped early
+            self._cancelled.set()
+            for thread in threads:
+                thread.join()
+            for pending in (self._prefetched, self._analyzed):
+                while not pending.empty():
+                    item = pending.get()
+                    if item is not _PIPELINE_DONE and item[1] is not None:
+                        item[1].discard()
+
+    def _put(self, pending, item):
+        while not self._cancelled.is_set():
+            try:
+                pending.put(item, timeout=self.POLL_INTERVAL)
+                return
+            except queue.Full:
+                continue
+
+        if item is not _PIPELINE_DONE and item[1] is not None:
+            item[1].discard()
+
+    def _get(self, pending):
+        while not self._cancelled.is_set():
+            try:
+                return pending.get(timeout=self.POLL_INTERVAL)
+            except queue.Empty:
+                continue
+        return _PIPELINE_DONE
+
+    def _prefetch_stage(self, issues):
+        # Without prefetching, this stage only resolves the tickets logs URLs
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=max(self.prefetch, 1), thread_name_prefix="prefetch"
+        ) as executor:
+            for _ in executor.map(self._prefetch, issues):
+                pass
+
+        for _ in range(self.workers):
+            self._put(self._prefetched, _PIPELINE_DONE)
+
+    def _prefetch(self, issue):
+        while not self._prefetch_slots.acquire(timeout=self.POLL_INTERVAL):
+            if self._cancelled.is_set():
+                return
+
+        ticket_run = None
+        try:
+            ticket_logs_url = _get_ticket_logs_url(issue)
+            if ticket_logs_url is not None:
+                ticket_run = TicketRun(
+                    self.jira_client,
+                    ticket_logs_url,
+                    issue.key,
+                    only_specific_signatures=self.only_specific_signatures,
+                    # Buffered, so the output of concurrently processed tickets never interleaves
+                    dry_run_file=io.StringIO() if self.dry_run_file is not None else None,
+                    should_reevaluate=self.should_reevaluate,
+                )
+                if self.prefetch > 0:
+                    ticket_run.prefetch()
+        except Exception:
+            logger.exception("Error prefetching ticket %s", issue.key)
+
+        self._put(self._prefetched, (issue, ticket_run))
+
+    def _analysis_stage(self):
+        while (item := self._get(self._prefetched)) is not _PIPELINE_DONE:
+            self._prefetch_slots.release()
+            issue, ticket_run = item
+            if ticket_run is not None:
+                try:
+                    ticket_run.analyze()
+                except Exception:
+                    logger.exception("Error analyzing ticket %s", issue.key)
+            self._put(self._analyzed, (issue, ticket_run))
+
+    def _write(self, issue, ticket_run):
+        if ticket_run is None:
+            return
+
+        try:
+            ticket_run.write()
+            if self.dry_run_file is not None:
+                self.dry_run_file.write(ticket_run.dry_run_file.getvalue())
+                if self.dry_run_file == sys.stdout:
+                    self.dry_run_file.write("\n")
+                self.dry_run_file.flush()
+        except Exception:
+            logger.exception("Error writing to ticket %s", issue.key)
+
+
 def process_issues(
     jira_client,
     issues,
     should_reevaluate: bool,
     only_specific_signatures,
     dry_run_file,
+    workers=1,
+    prefetch=0,
 ):
     logger.info(f"Found {len(issues)} tickets, processing...")
+    if jira_client is not None and (
+        only_specific_signatures is None or AllInstallationAttemptsSignature.__name__ in only_specific_signatures
+    ):
+        CLUSTER_TICKETS.prefetch(jira_client, filter(None, map(get_cluster_id_from_issue, issues)))
 
     should_progress_bar = sys.stderr.isatty()
-    for issue in tqdm.tqdm(
-        issues,
+    with tqdm.tqdm(
+        total=len(issues),
         disable=not should_progress_bar,
         file=sys.stderr,
-    ):
-        logger.debug(f"Issue {issue}")
-        try:
-            ticket_logs_url = get_logs_url_from_issue(issue)
-        except Exception:
-            logger.exception("Error getting logs url of %s", issue.key)
-            continue
-
-        if ticket_logs_url is None:
-            logger.warning(f"Could not get URL from issue {get_ticket_browse_url(issue.key)}. Skipping")
-            continue
+    ) as progress_bar:
+        if workers <= 1 and prefetch <= 0:
+            for issue in issues:
+                process_issue(
+                    jira_client,
+                    issue,
+                    should_reevaluate=should_reevaluate,
+                    only_specific_signatures=only_specific_signatures,
+                    dry_run_file=dry_run_file,
+                )
+                progress_bar.update()
+            return
 
-        process_ticket_with_signatures(
+        pipeline = _IssuesPipeline(
             jira_client,
-            ticket_logs_url,
-            issue.key,
             should_reevaluate=should_reevaluate,
             only_specific_signatures=only_specific_signatures,
             dry_run_file=dry_run_file,
+            workers=workers,
+            prefetch=prefetch,
         )
-
-        # Hacky solution to prevent tqdm from writing over the last line of the signature
-        if dry_run_file == sys.stdout:
-            sys.stdout.write("\n")
+        pipeline.run(issues, progress_bar)
 
 
 def main(args):
@@ -2769,6 +3948,19 @@ def main(args):
         validate=True,
     )
 
+    LOG_SERVER_LIMITER.set_limit(args.log_server_concurrency)
+    JIRA_LIMITER.set_limit(args.jira_concurrency)
+    limit_jira_concurrency(jira_client)
+    count_jira_requests(jira_client)
+    configure_download_cache(args.download_cache_dir, max_bytes=int(args.download_cache_max_gb * 1024**3))
+    configure_archive_cache(max_bytes=int(args.archive_cache_max_gb * 1024**3))
+    configure_insights_runner(
+        workers=args.insights_workers, timeout=args.insights_timeout, cache_dir=args.insights_cache_dir
+    )
+    configure_state_store(args.state_db)
+    configure_log_templates(args.log_templates_db)
+    configure_results_store(args.results_db)
+
     issues = get_issues(
         jira_client,
         issue=args.issue,
@@ -2776,6 +3968,27 @@ def main(args):
         only_recent=args.recent_issues,
     )
 
+    try:
+        run_issues(jira_client, issues, args)
+        # With the archives of the last tickets still open
+        archive_cache_usage = ARCHIVE_CACHE.usage()
+    finally:
+        # Delete the temporary directories of the archives still open
+        ARCHIVE_CACHE.close()
+        INSIGHTS_RUNNER.close()
+
+    if DOWNLOAD_CACHE is not None:
+        logger.info(f"Download cache: {DOWNLOAD_CACHE.stats}")
+    logger.info(f"Insights runs: {dict(INSIGHTS_RUNNER.stats)}")
+
+    logger.info(f"Archive cache: {archive_cache_usage}")
+    for name, value in archive_cache_usage.items():
+        RUN_METRICS.set_gauge(f"archive_cache_{name}", value)
+
+    report_run_metrics(args)
+
+
+def run_issues(jira_client, issues, args):
     if args.dry_run_temp:
         with tempfile.NamedTemporaryFile(mode="w", delete=False) as dry_run_file:
             logger.info(f"Dry run output will be written to {dry_run_file.name}")
@@ -2786,23 +3999,199 @@ def main(args):
                 should_reevaluate=args.update,
                 only_specific_signatures=args.update_signature,
                 dry_run_file=dry_run_file,
+                workers=args.workers,
+                prefetch=args.prefetch,
             )
             logger.info(f"Dry run output written to {dry_run_file.name}")
-        return
+    else:
+        process_issues(
+            jira_client,
+            issues,
+            should_reevaluate=args.update,
+            only_specific_signatures=args.update_signature,
+            dry_run_file=sys.stdout if args.dry_run else None,
+            workers=args.workers,
+            prefetch=args.prefetch,
+        )
 
-    process_issues(
-        jira_client,
-        issues,
-        should_reevaluate=args.update,
-        only_specific_signatures=args.update_signature,
-        dry_run_file=sys.stdout if args.dry_run else None,
-    )
+
+def report_run_metrics(args):
+    logger.info(f"Slowest signatures:\n{RUN_METRICS.slowest_table(top=args.report_top)}")
+
+    if args.run_report:
+        RUN_METRICS.write_json_report(args.run_report)
+        logger.info(f"Run report written to {args.run_report}")
+
+    if args.prometheus_textfile:
+        RUN_METRICS.write_prometheus_textfile(args.prometheus_textfile)
+        logger.info(f"Prometheus metrics written to {args.prometheus_textfile}")
 
 
 def format_time(time_str):
     return dateutil.parser.isoparse(time_str).strftime("%Y-%m-%d %H:%M:%S")
 
 
+class TicketRun:
+    """
+    Processing of a single ticket by the signatures, split into the stages of
+    the process_issues pipeline:
+
+    - prefetch: select the signatures to run and load the ticket inputs
+    - analyze: run the signatures, their Jira writes are deferred
+    - write: send the Jira writes
+
+    Only the Jira snapshot is kept after analyze, the inputs are released then.
+
+    Every stage is measured in RUN_METRICS, the signatures under their name
+    (including their deferred writes), the rest as (select) and (prefetch).
+    An input that's loaded lazily is accounted to the first signature using it.
+    """
+
+    def __init__(
+        self,
+        jira_client,
+        ticket_logs_url,
+        issue_key,
+        only_specific_signatures,
+        dry_run_file,
+        should_reevaluate=False,
+    ):
+        self.ticket_logs_url = ticket_logs_url
+        self.issue_key = issue_key
+        self.dry_run_file = dry_run_file
+        self.jira_ticket = JiraTicketSnapshot(jira_client, issue_key, defer_writes=True)
+        self.context = TicketContext(Signature._logs_url_to_api(ticket_logs_url), jira_ticket=self.jira_ticket)
+        self._force = should_reevaluate or only_specific_signatures is not None
+        # Dry runs don't change the tickets, so they neither use nor update the state of previous runs
+        self._state_store = STATE_STORE if dry_run_file is None else None
+        # Nor record their results
+        self._results_store = RESULTS_STORE if dry_run_file is None else None
+
+        signatures = (
+            ALL_SIGNATURES
+            if only_specific_signatures is None
+            # Filter ALL_SIGNATURES by only_specific_signatures
+            else [
+                signature_class
+                for signature_class in ALL_SIGNATURES
+                if signature_class.__name__ in only_specific_signatures
+            ]
+        )
+        self.signatures = [
+            signature_class(
+                jira_client=jira_client,
+                should_reevaluate=True if only_specific_signatures is not None else should_reevaluate,
+                issue_key=issue_key,
+                dry_run_file=dry_run_file,
+                context=self.context,
+            )
+            for signature_class in signatures
+        ]
+        self._selected = False
+        self._background_work_started = False
+
+    def select_signatures(self):
+        """
+        Drop the signatures whose inputs didn't change since they last ran on
+        the ticket, and register the host log scans of the others
+        """
+        if self._selected:
+            return
+        self._selected = True
+
+        if self._state_store is not None and not self._force:
+            with RUN_METRICS.measure(self.issue_key, "(select)"):
+                self.signatures = [
+                    signature
+                    for signature in self.signatures
+                    if not _signature_inputs_unchanged(self._state_store, self.context, self.issue_key, signature)
+                ]
+
+        # Register all the host log scans up-front, so every host log file is only read once per ticket
+        for signature in self.signatures:
+            signature.register_scans(self.context.host_log_scans)
+
+    def prefetch(self):
+        self.select_signatures()
+        if self.signatures:
+            with RUN_METRICS.measure(self.issue_key, "(prefetch)"):
+                self.context.prefetch({name for signature in self.signatures for name in signature.REQUIRED_INPUTS})
+                self.start_background_work()
+
+    def start_background_work(self):
+        if self._background_work_started:
+            return
+        self._background_work_started = True
+
+        for signature in self.signatures:
+            signature.start_background_work()
+
+    def analyze(self):
+        """
+        Run the selected signatures, the inputs of the ticket are released afterwards
+        """
+        try:
+            self.select_signatures()
+            self.start_background_work()
+            for signature in self.signatures:
+                self._run_signature(signature)
+            if self._results_store is not None and self.signatures:
+                self._record_ticket()
+        finally:
+            logger.debug(f"Analyzed {self.issue_key}, inputs loaded: {dict(self.context.io_counts)}")
+            self.context.close()
+
+    def _run_signature(self, signature):
+        signature_name = type(signature).__name__
+        logger.debug(f"Running signature {signature_name}")
+        self.context.consumed_inputs.clear()
+        with self.jira_ticket.writes_by(signature_name):
+            with RUN_METRICS.measure(self.issue_key, signature_name):
+                completed = signature.process_ticket(self.ticket_logs_url, self.issue_key)
+            if not completed:
+                return
+
+            if self._results_store is not None:
+                labels = signature.result_labels() if signature.report is not None else []
+                self.jira_ticket.after_writes(
+                    functools.partial(
+                        self._results_store.put_result, self.issue_key, signature_name, signature.report, labels
+                    )
+                )
+            if self._state_store is None:
+                return
+
+            inputs = sorted(self.context.consumed_inputs)
+            fingerprint = self.context.fingerprint(signature_version(type(signature)), inputs)
+            if fingerprint is not None:
+                # Only recorded once the signature's Jira writes are done
+                self.jira_ticket.after_writes(
+                    functools.partial(self._state_store.put, self.issue_key, signature_name, inputs, fingerprint)
+                )
+
+    def _record_ticket(self):
+        try:
+            cluster = self.context.cluster
+        except FailedToGetMetadataException:
+            cluster = {}
+        self._results_store.put_ticket(
+            self.issue_key,
+            cluster_id=cluster.get("id"),
+            domain=cluster.get("email_domain"),
+            openshift_version=cluster.get("openshift_version"),
+            created_at=getattr(self.jira_ticket.fields, "created", None),
+        )
+
+    def write(self):
+        self.jira_ticket.flush()
+
+    def discard(self):
+        """
+        Drop a ticket that won't be analyzed
+        """
+        self.context.close()
+
+
 def process_ticket_with_signatures(
     jira_client,
     ticket_logs_url,
@@ -2811,28 +4200,30 @@ def process_ticket_with_signatures(
     dry_run_file,
     should_reevaluate=False,
 ):
-    signatures = (
-        ALL_SIGNATURES
-        if only_specific_signatures is None
-        # Filter ALL_SIGNATURES by only_specific_signatures
-        else [
-            signature_class
-            for signature_class in ALL_SIGNATURES
-            if signature_class.__name__ in only_specific_signatures
-        ]
+    ticket_run = TicketRun(
+        jira_client,
+        ticket_logs_url,
+        issue_key,
+        only_specific_signatures=only_specific_signatures,
+        dry_run_file=dry_run_file,
+        should_reevaluate=should_reevaluate,
     )
+    ticket_run.analyze()
+    ticket_run.write()
 
-    for signature_class in signatures:
-        logger.debug(f"Running signature {signature_class.__name__}")
-        signature_class(
-            jira_client=jira_client,
-            should_reevaluate=True if only_specific_signatures is not None else should_reevaluate,
-            issue_key=issue_key,
-            dry_run_file=dry_run_file,
-        ).process_ticket(
-            ticket_logs_url,
-            issue_key,
-        )
+
+def _signature_inputs_unchanged(state_store, context, issue_key, signature):
+    signature_name = type(signature).__name__
+    previous_run = state_store.get(issue_key, signature_name)
+    if previous_run is None:
+        return False
+
+    fingerprint = context.fingerprint(signature_version(type(signature)), previous_run.inputs)
+    if fingerprint != previous_run.fingerprint:
+        return False
+
+    logger.debug(f"Skipping {signature_name} on {issue_key}, unchanged since {previous_run.updated_at}")
+    return True
 
 
 def parse_args():
@@ -2892,7 +4283,7 @@ def parse_args():
         "-u",
         "--update",
         action="store_true",
-        help="Update ticket even if signature already exist",
+        help="Update ticket even if signature already exist, also re-runs signatures whose inputs haven't changed",
     )
     parser.add_argument(
         "-v",
@@ -2925,6 +4316,112 @@ def parse_args():
         help="Update tickets with only the signatures specified",
     )
 
+    concurrency_group = parser.add_argument_group(title="Concurrency options")
+    concurrency_group.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of tickets to analyze concurrently",
+    )
+    concurrency_group.add_argument(
+        "--prefetch",
+        type=int,
+        default=0,
+        help="Number of tickets whose inputs are downloaded ahead of their analysis, in parallel (default: none)",
+    )
+    concurrency_group.add_argument(
+        "--log-server-concurrency",
+        type=int,
+        default=None,
+        help="Maximum number of concurrent requests to the log server (default: no limit other than --workers)",
+    )
+    concurrency_group.add_argument(
+        "--jira-concurrency",
+        type=int,
+        default=None,
+        help="Maximum number of concurrent requests to Jira (default: no limit other than --workers)",
+    )
+
+    cache_group = parser.add_argument_group(title="Download cache options")
+    cache_group.add_argument(
+        "--download-cache-dir",
+        default=os.environ.get("TRIAGE_DOWNLOAD_CACHE_DIR"),
+        help="Directory of a persistent cache for log server downloads, shared between runs (default: no cache)",
+    )
+    cache_group.add_argument(
+        "--download-cache-max-gb",
+        type=float,
+        default=download_cache.DEFAULT_MAX_BYTES / 1024**3,
+        help="Size budget of the download cache in GiB, least recently used downloads are evicted beyond it",
+    )
+    cache_group.add_argument(
+        "--archive-cache-max-gb",
+        type=float,
+        default=archive_cache.DEFAULT_MAX_BYTES / 1024**3,
+        help="Budget in GiB of the logs archives kept open between tickets (their extracted files and indexes), "
+        "least recently used archives are closed beyond it",
+    )
+
+    insights_group = parser.add_argument_group(title="Must-gather analysis options")
+    insights_group.add_argument(
+        "--insights-workers",
+        type=int,
+        default=1,
+        help="Number of Insights analyses of must-gathers (MustGatherAnalysis) that run at the same time, in the "
+        "background of the tickets",
+    )
+    insights_group.add_argument(
+        "--insights-timeout",
+        type=float,
+        default=insights_runner.DEFAULT_TIMEOUT_SECONDS,
+        help="Seconds after which an Insights analysis is killed, the ticket then isn't commented",
+    )
+    insights_group.add_argument(
+        "--insights-cache-dir",
+        default=os.environ.get("TRIAGE_INSIGHTS_CACHE_DIR"),
+        help="Directory where Insights reports are kept by must-gather SHA-256, so identical must-gathers are only "
+        "analyzed once (default: no cache)",
+    )
+
+    state_group = parser.add_argument_group(title="Incremental run options")
+    state_group.add_argument(
+        "--state-db",
+        default=os.environ.get("TRIAGE_STATE_DB"),
+        help="SQLite file recording the inputs each signature ran on, signatures are skipped on tickets whose "
+        "inputs and signature code haven't changed since (default: run everything)",
+    )
+    state_group.add_argument(
+        "--log-templates-db",
+        default=os.environ.get("TRIAGE_LOG_TEMPLATES_DB"),
+        help="SQLite file of the templates of the host logs mined across tickets, RareLogTemplates reports the "
+        "templates of a ticket that are rare in it (default: RareLogTemplates reports nothing)",
+    )
+
+    report_group = parser.add_argument_group(title="Run report options")
+    report_group.add_argument(
+        "--results-db",
+        default=os.environ.get("TRIAGE_RESULTS_DB"),
+        help="SQLite file to record the results of every signature on every ticket in, query it with "
+        "signature_results.py (default: don't record them)",
+    )
+    report_group.add_argument(
+        "--run-report",
+        default=os.environ.get("TRIAGE_RUN_REPORT"),
+        help="Write a JSON report of the time and I/O of every signature on every ticket to this file",
+    )
+    report_group.add_argument(
+        "--prometheus-textfile",
+        default=os.environ.get("TRIAGE_PROMETHEUS_TEXTFILE"),
+        help="Write the per-signature totals of the run to this file, for the node exporter textfile collector",
+    )
+    report_group.add_argument(
+        "--report-top",
+        type=int,
+        default=10,
+        help="Number of slowest signatures to log at the end of the run",
+    )
+
     args = parser.parse_args()
 
     config_logger(args.verbose)
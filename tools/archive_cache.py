@@ -0,0 +1,133 @@
+"""
+A cache of open archives (remote_tar archives), shared by the tickets of a run
+and bounded by the bytes they take.
+
+Archives are opened once per key (their URL) and kept open after the tickets
+using them are done, for as long as the total of their usage (bytes in their
+temporary directories plus the estimated memory of their indexes) fits the
+budget. Beyond it, the least recently used archives are closed, which deletes
+their temporary directories. Archives are pinned while a ticket uses them
+(between acquire and release) and are never closed then, even over budget.
+"""
+import contextlib
+import threading
+from collections import OrderedDict
+
+DEFAULT_MAX_BYTES = 2 * 1024**3
+
+
+class _Entry:
+    __slots__ = ("archive", "pins")
+
+    def __init__(self, archive):
+        self.archive = archive
+        self.pins = 0
+
+    @property
+    def usage(self):
+        usage = getattr(self.archive, "usage", None)
+        return usage() if usage is not None else (0, 0)
+
+
+class ArchiveCache:
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.evictions = 0
+        self.peak_bytes = 0
+        self._lock = threading.Lock()
+        # Least recently used first
+        self._entries = OrderedDict()
+
+    def acquire(self, key, opener):
+        """
+        The archive of key, opened with opener unless it's cached, pinned until release(key)
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.pins += 1
+                self._entries.move_to_end(key)
+                return entry.archive
+
+        # Not holding the lock, opening an archive can take a while
+        archive = opener()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = _Entry(archive)
+            entry.pins += 1
+            self._entries.move_to_end(key)
+
+        if entry.archive is not archive:
+            # Opened concurrently by another ticket
+            _close(archive)
+        return entry.archive
+
+    def release(self, key):
+        """
+        Unpin the archive of key, it may get closed from now on
+        """
+        with self._lock:
+            self._entries[key].pins -= 1
+            evicted = self._evict()
+
+        for archive in evicted:
+            _close(archive)
+
+    @contextlib.contextmanager
+    def pinned(self, key, opener):
+        archive = self.acquire(key, opener)
+        try:
+            yield archive
+        finally:
+            self.release(key)
+
+    def _evict(self):
+        """
+        Must be called with the lock held, returns the archives to close
+        """
+        total = sum(sum(entry.usage) for entry in self._entries.values())
+        self.peak_bytes = max(self.peak_bytes, total)
+
+        evicted = []
+        for key, entry in list(self._entries.items()):
+            if total <= self.max_bytes:
+                break
+            if entry.pins > 0:
+                continue
+            total -= sum(entry.usage)
+            del self._entries[key]
+            evicted.append(entry.archive)
+            self.evictions += 1
+        return evicted
+
+    def usage(self):
+        with self._lock:
+            usages = [entry.usage for entry in self._entries.values()]
+            pinned = sum(1 for entry in self._entries.values() if entry.pins > 0)
+            self.peak_bytes = max(self.peak_bytes, sum(map(sum, usages)))
+            return {
+                "archives": len(usages),
+                "pinned": pinned,
+                "disk_bytes": sum(disk_bytes for disk_bytes, _memory_bytes in usages),
+                "memory_bytes": sum(memory_bytes for _disk_bytes, memory_bytes in usages),
+                "peak_bytes": self.peak_bytes,
+                "max_bytes": self.max_bytes,
+                "evictions": self.evictions,
+            }
+
+    def close(self):
+        """
+        Close every archive, pinned or not
+        """
+        with self._lock:
+            entries, self._entries = self._entries, OrderedDict()
+
+        for entry in entries.values():
+            _close(entry.archive)
+
+
+def _close(archive):
+    close = getattr(archive, "close", None)
+    if close is not None:
+        close()
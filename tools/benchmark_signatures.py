@@ -0,0 +1,463 @@
+#!/usr/bin/env python3
+"""
+Benchmarks of add_triage_signature on synthetic clusters.
+
+Generates cluster fixtures of configurable scale (number of hosts, number of
+events, size of the agent/installer/journal logs of every host), serves them
+from a local stand-in for the log server, and runs
+process_ticket_with_signatures against them with a fake Jira, once per
+signature and once with all the signatures (end to end).
+
+For every (scale, signature) it reports the wall time, the throughput in
+tickets per minute, and the peak memory allocated by Python during the run
+(measured with tracemalloc in a separate pass, as tracing slows the run down).
+
+Example:
+
+    ./benchmark_signatures.py --hosts 1 50 500 --events 1000 1000000 --log-kb 256
+"""
+import argparse
+import functools
+import http.server
+import io
+import json
+import logging
+import os
+import random
+import re
+import statistics
+import tarfile
+import tempfile
+import threading
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from tabulate import tabulate
+
+import add_triage_signature
+
+END_TO_END = "(all signatures)"
+CLUSTER_NAMESPACE = uuid.UUID("9f0c4f0e-6f1d-4a52-9d3c-2f8f3c0b0b0b")
+START_TIME = datetime(2023, 1, 1, tzinfo=timezone.utc)
+
+HOST_STAGES = ["Starting installation", "Installing", "Writing image to disk", "Rebooting", "Configuring", "Done"]
+
+LOG_LINES = {
+    "agent.logs": [
+        'time="{time}" level=info msg="Sending step <inventory-{n:08x}> reply output" file="step_processor.go:{n}"',
+        'time="{time}" level=info msg="next step runner" file="step_processor.go:{n}" request_id={n:08x}',
+        'time="{time}" level=warning msg="Failed to query api.openshift.com/api/assisted-install/v2 {n}" file="x.go:1"',
+    ],
+    "installer.logs": [
+        'time="{time}" level=info msg="Writing image and ignition to disk with arguments {n}"',
+        'time="{time}" level=info msg="Waiting for 2 master nodes, found {n}"',
+        'time="{time}" level=info msg="Updating node installation stage Rebooting {n}"',
+    ],
+    "journal.logs": [
+        "{time} localhost kubelet[{n}]: I0101 00:00:00.000000 {n} kubelet.go:2000] SyncLoop (PLEG)",
+        "{time} localhost systemd[1]: Started libcontainer container {n:064x}.",
+        '{time} localhost crio[{n}]: time="{time}" level=info msg="Checking image status {n}"',
+    ],
+}
+
+
+def host_id(cluster_id, index):
+    return str(uuid.uuid5(CLUSTER_NAMESPACE, f"{cluster_id}/{index}"))
+
+
+def format_time(timestamp):
+    return timestamp.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+
+
+def synthetic_host(cluster_id, index):
+    role = "master" if index < 3 else "worker"
+    inventory = {
+        "hostname": f"host-{index}",
+        "boot": {"current_boot_mode": "uefi"},
+        "system_vendor": {"manufacturer": "Red Hat", "product_name": "KVM", "virtual": True},
+        "disks": [
+            {"name": "vda", "path": "/dev/vda", "drive_type": "HDD", "size_bytes": 128 * 1024**3},
+            {"name": "sr0", "path": "/dev/sr0", "drive_type": "ODD", "size_bytes": 1024**3},
+        ],
+        "interfaces": [
+            {
+                "name": "ens3",
+                "mac_address": f"52:54:00:{index >> 16 & 0xFF:02x}:{index >> 8 & 0xFF:02x}:{index & 0xFF:02x}",
+                "ipv4_addresses": [f"192.168.{index >> 8 & 0xFF}.{index & 0xFF}/16"],
+            }
+        ],
+        "routes": [
+            {"destination": "0.0.0.0", "gateway": "192.168.0.1", "interface": "ens3", "family": 2},
+            {"destination": "192.168.0.0", "interface": "ens3", "family": 2},
+        ],
+    }
+    return {
+        "id": host_id(cluster_id, index),
+        "requested_hostname": f"host-{index}",
+        "role": role,
+        "bootstrap": index == 0,
+        "status": "installing-in-progress",
+        "status_info": "Host is installing",
+        "progress": {"current_stage": HOST_STAGES[index % len(HOST_STAGES)]},
+        "inventory": json.dumps(inventory),
+        "installation_disk_path": "/dev/vda",
+        "skip_formatting_disks": "",
+        "logs_info": "completed",
+        "checked_in_at": format_time(START_TIME),
+    }
+
+
+def synthetic_metadata(cluster_id, hosts):
+    cluster = {
+        "id": cluster_id,
+        "name": "benchmark",
+        "status": "error",
+        "status_info": "cluster has hosts in error",
+        "user_name": "benchmark",
+        "email_domain": "example.com",
+        "openshift_version": "4.14.0",
+        "openshift_cluster_id": str(uuid.uuid5(CLUSTER_NAMESPACE, cluster_id)),
+        "platform": {"type": "baremetal"},
+        "high_availability_mode": "None" if hosts == 1 else "Full",
+        "user_managed_networking": hosts == 1,
+        "created_at": format_time(START_TIME),
+        "install_started_at": format_time(START_TIME),
+        "status_updated_at": format_time(START_TIME + timedelta(hours=1)),
+        "machine_networks": [{"cidr": "192.168.0.0/16"}],
+        "feature_usage": json.dumps({"SNO": {"name": "SNO"}} if hosts == 1 else {}),
+        "tags": "benchmark",
+        "hosts": [synthetic_host(cluster_id, index) for index in range(hosts)],
+    }
+    return {"release_tag": "v2.30.0", "versions": {"assisted-installer": "benchmark"}, "cluster": cluster}
+
+
+def synthetic_events(cluster_id, hosts, count):
+    """
+    Events of two installation attempts (the first one reset), with the kinds
+    of messages the event-based signatures look for mixed in
+    """
+    reset_at = count // 3
+    host_ids = [host_id(cluster_id, index) for index in range(hosts)]
+    for index in range(count):
+        event_time = format_time(START_TIME + timedelta(milliseconds=index))
+        if index == reset_at:
+            yield {
+                "name": "cluster_installation_reset",
+                "message": "Reset cluster installation",
+                "event_time": event_time,
+            }
+            continue
+
+        host_index = index % hosts
+        hostname = f"host-{host_index}"
+        kind = index % 7
+        if kind == 0:
+            message = f"Host {hostname}: reached installation stage Writing image to disk: {index % 100}%"
+        elif kind == 1:
+            message = f"Host {hostname}: New image status quay.io/image:{index}. result: success; download rate: {index % 50} MBps"
+        elif kind == 2:
+            message = f"Host {hostname}: validation 'ntp-synced' is now fixed"
+        elif kind == 3:
+            message = f"Host {hostname}: validation 'ntp-synced' that used to succeed is now failing"
+        elif kind == 4:
+            message = f"Host {hostname}: updated status from known to installing (fdatasync duration: {index % 30} ms)"
+        else:
+            message = f"Host {hostname}: updated status from installing to installing-in-progress ({index})"
+        yield {
+            "name": "host_status_updated",
+            "host_id": host_ids[host_index],
+            "message": message,
+            "event_time": event_time,
+        }
+
+
+def synthetic_log(filename, size, seed):
+    templates = LOG_LINES[filename]
+    rand = random.Random(seed)
+    lines, written = [], 0
+    while written < size:
+        line = rand.choice(templates).format(
+            time=format_time(START_TIME + timedelta(seconds=len(lines))), n=rand.getrandbits(32)
+        )
+        lines.append(line)
+        written += len(line) + 1
+    return ("\n".join(lines) + "\n").encode()
+
+
+def _add_bytes(tar, name, content):
+    info = tarfile.TarInfo(name)
+    info.size = len(content)
+    info.mtime = int(START_TIME.timestamp())
+    tar.addfile(info, io.BytesIO(content))
+
+
+def _gzipped_tar(members):
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as tar:
+        for name, content in members:
+            _add_bytes(tar, name, content)
+    return buffer.getvalue()
+
+
+def write_logs_tar(path, cluster_id, hosts, log_bytes):
+    """
+    The cluster's logs tar, with the controller logs and a nested
+    <host>.tar/<host>.tar.gz/logs_host_<id>/ archive per host
+    """
+    with tarfile.open(path, mode="w") as tar:
+        controller_logs = synthetic_log("installer.logs", log_bytes, seed=cluster_id)
+        _add_bytes(
+            tar,
+            "controller_logs.tar.gz",
+            _gzipped_tar([("assisted-installer-controller-benchmark.logs", controller_logs)]),
+        )
+        for index in range(hosts):
+            host = host_id(cluster_id, index)
+            role = "bootstrap" if index == 0 else ("master" if index < 3 else "worker")
+            name = f"benchmark_{role}_{host}"
+            host_logs = [
+                (f"logs_host_{host}/{filename}", synthetic_log(filename, log_bytes, seed=f"{host}/{filename}"))
+                for filename in LOG_LINES
+            ]
+            host_tar = io.BytesIO()
+            with tarfile.open(fileobj=host_tar, mode="w") as inner:
+                _add_bytes(inner, f"{name}.tar.gz", _gzipped_tar(host_logs))
+            _add_bytes(tar, f"{name}.tar", host_tar.getvalue())
+
+
+def write_cluster(directory, hosts, events, log_bytes):
+    """
+    Write the files of a synthetic cluster the way the log server lays them out, returns its id
+    """
+    cluster_id = str(uuid.uuid5(CLUSTER_NAMESPACE, f"{hosts}-{events}-{log_bytes}"))
+    os.makedirs(os.path.join(directory, "cluster_files"), exist_ok=True)
+
+    with open(os.path.join(directory, "metadata.json"), "w") as metadata_file:
+        json.dump(synthetic_metadata(cluster_id, hosts), metadata_file)
+
+    with open(os.path.join(directory, "cluster_files", "install-config.yaml"), "w") as install_config_file:
+        install_config_file.write(
+            "apiVersion: v1\nbaseDomain: example.com\nnetworking:\n  networkType: OVNKubernetes\n"
+        )
+
+    # Streamed, a million events don't fit in memory comfortably as dicts
+    with open(os.path.join(directory, f"cluster_{cluster_id}_events.json"), "w") as events_file:
+        events_file.write("[")
+        for index, event in enumerate(synthetic_events(cluster_id, hosts, events)):
+            events_file.write(("," if index else "") + json.dumps(event))
+        events_file.write("]")
+
+    write_logs_tar(os.path.join(directory, f"cluster_{cluster_id}_logs.tar"), cluster_id, hosts, log_bytes)
+    return cluster_id
+
+
+class _LogServerHandler(http.server.SimpleHTTPRequestHandler):
+    """
+    Serves files like the log server does: with validators, and Range requests
+    """
+
+    def send_head(self):
+        path = self.translate_path(self.path)
+        if not os.path.isfile(path):
+            self.send_error(404)
+            return None
+
+        stat = os.stat(path)
+        start, end = 0, stat.st_size - 1
+        byte_range = re.fullmatch(r"bytes=(\d+)-(\d*)", self.headers.get("Range", ""))
+        if byte_range:
+            start = int(byte_range.group(1))
+            end = min(int(byte_range.group(2) or end), end)
+
+        self.send_response(206 if byte_range else 200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(max(end - start + 1, 0)))
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("ETag", f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"')
+        self.send_header("Last-Modified", self.date_time_string(stat.st_mtime))
+        if byte_range:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{stat.st_size}")
+        self.end_headers()
+
+        if not byte_range:
+            return open(path, "rb")
+        with open(path, "rb") as served_file:
+            served_file.seek(start)
+            return io.BytesIO(served_file.read(max(end - start + 1, 0)))
+
+    def log_message(self, format, *args):
+        pass
+
+
+@contextmanager
+def log_server(directory):
+    """
+    A stand-in for the log server serving the given directory, yields its URL
+    """
+    handler = functools.partial(_LogServerHandler, directory=directory)
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+class FakeJira:
+    """
+    Just enough of a Jira client for the signatures, tickets have no comments and writes are counted
+    """
+
+    def __init__(self):
+        self.writes = 0
+        self._session = SimpleNamespace(put=self._write)
+
+    def _write(self, *args, **kwargs):
+        self.writes += 1
+
+    def issue(self, key, fields=None):
+        function_impact = add_triage_signature.custom_field_name(add_triage_signature.CUSTOM_FIELD_FUNCTION_IMPACT)
+        fields = SimpleNamespace(
+            labels=[],
+            components=[],
+            description="",
+            comment=SimpleNamespace(comments=[], total=0),
+            **{function_impact: None},
+        )
+        return SimpleNamespace(key=key, self=f"http://jira/issue/{key}", fields=fields, raw={"fields": {}})
+
+    def comments(self, key):
+        return []
+
+    def add_comment(self, key, body):
+        self._write()
+        return SimpleNamespace(self=f"http://jira/issue/{key}/comment/{self.writes}", body=body, raw={"body": body})
+
+    def add_attachment(self, *args, **kwargs):
+        self._write()
+
+    def create_issue_link(self, *args, **kwargs):
+        self._write()
+
+    def search_issues(self, *args, **kwargs):
+        return []
+
+
+def run_once(ticket_url, signature_names):
+    add_triage_signature.process_ticket_with_signatures(
+        FakeJira(), ticket_url, "BENCHMARK-1", only_specific_signatures=signature_names, dry_run_file=None
+    )
+    # Every run starts cold, without the archive opened by the previous one
+    add_triage_signature.ARCHIVE_CACHE.close()
+
+
+def measure(ticket_url, signature_names, repeat, trace_memory):
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run_once(ticket_url, signature_names)
+        durations.append(time.perf_counter() - start)
+
+    peak_bytes = None
+    if trace_memory:
+        tracemalloc.start()
+        try:
+            run_once(ticket_url, signature_names)
+            _current, peak_bytes = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    seconds = statistics.median(durations)
+    return {
+        "seconds": seconds,
+        "tickets_per_minute": 60 / seconds if seconds else None,
+        "peak_bytes": peak_bytes,
+    }
+
+
+def benchmark(scales, signature_names, repeat=1, trace_memory=True, work_dir=None):
+    """
+    Benchmark every signature and all of them together on a synthetic cluster
+    of every (hosts, events, log_bytes) scale
+    """
+    results = []
+    with tempfile.TemporaryDirectory(dir=work_dir) as root, log_server(root) as server_url:
+        for hosts, events, log_bytes in scales:
+            ticket = f"benchmark-{hosts}-{events}-{log_bytes}"
+            write_cluster(os.path.join(root, "files", ticket), hosts, events, log_bytes)
+            ticket_url = f"{server_url}/files/{ticket}"
+            for name, only_specific_signatures in [(name, [name]) for name in signature_names] + [
+                (END_TO_END, signature_names)
+            ]:
+                result = measure(ticket_url, only_specific_signatures, repeat, trace_memory)
+                results.append({"hosts": hosts, "events": events, "log_bytes": log_bytes, "signature": name, **result})
+                logging.info(f"{ticket} {name}: {result['seconds']:.3f}s")
+    return results
+
+
+def results_table(results):
+    return tabulate(
+        [
+            {
+                "hosts": result["hosts"],
+                "events": result["events"],
+                "log KiB": result["log_bytes"] // 1024,
+                "signature": result["signature"],
+                "seconds": round(result["seconds"], 3),
+                "tickets/min": round(result["tickets_per_minute"] or 0, 1),
+                "peak MiB": "" if result["peak_bytes"] is None else round(result["peak_bytes"] / 1024**2, 1),
+            }
+            for result in results
+        ],
+        headers="keys",
+    )
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip().splitlines()[0], formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument("--hosts", type=int, nargs="+", default=[1, 5, 50], help="Numbers of hosts of the clusters")
+    parser.add_argument("--events", type=int, nargs="+", default=[1000, 100000], help="Numbers of cluster events")
+    parser.add_argument("--log-kb", type=int, nargs="+", default=[64], help="Size of every host log file, in KiB")
+    parser.add_argument(
+        "-s",
+        "--signatures",
+        nargs="+",
+        choices=[signature.__name__ for signature in add_triage_signature.ALL_SIGNATURES],
+        help="Signatures to benchmark, all of them by default",
+    )
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per measurement, the median is reported")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the peak memory measurement pass")
+    parser.add_argument("--work-dir", help="Where to write the synthetic clusters, they may be large")
+    parser.add_argument("-o", "--output", help="Write the results as JSON to this file")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Show the logs of the signatures")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(levelname)-10s %(message)s")
+    # The synthetic clusters are broken in every possible way, the signatures' reports of it are noise here
+    add_triage_signature.logger.setLevel(logging.DEBUG if args.verbose else logging.CRITICAL)
+
+    signature_names = args.signatures or [signature.__name__ for signature in add_triage_signature.ALL_SIGNATURES]
+    scales = [
+        (hosts, events, log_kb * 1024) for hosts in args.hosts for events in args.events for log_kb in args.log_kb
+    ]
+    results = benchmark(scales, signature_names, args.repeat, not args.no_memory, args.work_dir)
+
+    print(results_table(results))
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(results, output_file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
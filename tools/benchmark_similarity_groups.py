@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Benchmarks of group_similar_strings on synthetic host status_info and agent step failure strings.
+
+Generates strings from templates of real messages, filled in with random host
+names, addresses, durations and hashes, and groups sets of every size with
+similarity_groups. For every size it reports the wall time, the throughput,
+the number of groups, and the comparisons made and skipped thanks to the
+distance bounds.
+
+The first --reference strings are also grouped by comparing every string to
+every member of every group (the grouping similarity_groups reproduces), to
+check the groups are the same and measure the speedup.
+
+Example:
+
+    ./benchmark_similarity_groups.py --sizes 10000 100000 1000000 --ratio 80
+"""
+import argparse
+import json
+import logging
+import random
+import time
+
+from fuzzywuzzy import fuzz
+from tabulate import tabulate
+
+import similarity_groups
+
+TEMPLATES = [
+    "Host failed to install due to timeout while connecting to host",
+    "Host is insufficient: Require at least {n} GiB RAM for role master, found only {m} GiB",
+    "Host {host} failed to reboot within timeout, last stage: Rebooting",
+    "Failed to connect to {ip}:6443, connection refused after {n} attempts",
+    "Host failed to install because its installation stage Waiting for control plane took longer than expected {n}m0s",
+    "Failed - failed executing nsenter [--target 1 --cgroup --mount --ipc --pid -- coreos-installer install "
+    "--insecure -i /opt/install-dir/master-{uuid}.ign --append-karg ip=ens3:dhcp /dev/sd{disk}], "
+    'Error exit status 1, LastOutput "Error: checking for exclusive access to /dev/sd{disk}"',
+    "Step execution failed (exit code 1): <free-network-addresses-{hash}>, command: <free_addresses>, "
+    'args: <[["{ip}/24"]]>. Output:\\nstdout:\\n\\n\\nstderr:\\ntime out after {n} seconds\\n',
+    "Step execution failed (exit code 125): <image-availability-{hash}>, command: <podman>, "
+    "args: <[pull quay.io/openshift-release-dev/ocp-v4.0-art-dev@sha256:{sha}]>",
+    "failed to pull image quay.io/openshift-release-dev/ocp-release@sha256:{sha}: "
+    "reading manifest in quay.io: unauthorized",
+    "Unable to read from the discovery media {ip}: input/output error on sector {n}",
+    "ntp server {ip} is not reachable, clock skew of {n}ms detected on host {host}",
+    "Expected the host to boot from disk, but it booted the installation image - please reboot and fix boot order",
+]
+
+
+def synthetic_strings(count, seed=0):
+    """
+    Like the strings of a fleet, the values filled in come from pools of a
+    fixed size (hosts, clusters, release images), except for the numbers and
+    step IDs, so the number of distinct strings keeps growing with count
+    """
+    rng = random.Random(seed)
+    hosts = [f"worker-{rng.randrange(100)}.cluster-{rng.randrange(10**6)}.example.com" for _ in range(2000)]
+    cluster_ids = [f"{rng.getrandbits(128):032x}" for _ in range(2000)]
+    images = [f"{rng.getrandbits(256):064x}" for _ in range(50)]
+    # Like real messages, some are a lot more frequent than others
+    weights = [1 / (rank + 1) for rank in range(len(TEMPLATES))]
+    return [
+        template.format(
+            n=rng.randrange(1, 1000),
+            m=rng.randrange(1, 32),
+            host=rng.choice(hosts),
+            ip=f"192.168.{rng.randrange(256)}.{rng.randrange(256)}",
+            uuid=rng.choice(cluster_ids),
+            hash=f"{rng.getrandbits(32):08x}",
+            sha=rng.choice(images),
+            disk=rng.choice("abcd"),
+        )
+        for template in rng.choices(TEMPLATES, weights, k=count)
+    ]
+
+
+def exhaustive_group_similar_strings(items, ratio):
+    groups = []
+    for item in items:
+        for group in groups:
+            if all(fuzz.ratio(item, w) > ratio for w in group):
+                group.append(item)
+                break
+        else:
+            groups.append([item])
+    return groups
+
+
+def benchmark(sizes, ratio, reference_size=0, seed=0):
+    results = []
+    strings = synthetic_strings(max(sizes + [reference_size]), seed)
+    for size in sizes:
+        groups = similarity_groups.SimilarityGroups(ratio)
+        start = time.perf_counter()
+        groups.extend(strings[:size])
+        seconds = time.perf_counter() - start
+        results.append(
+            {
+                "strings": size,
+                "distinct": len(set(strings[:size])),
+                "groups": len(groups.groups),
+                "seconds": seconds,
+                "strings_per_second": size / seconds if seconds else None,
+                **groups.stats,
+            }
+        )
+        logging.info(f"{size} strings: {seconds:.3f}s, {len(groups.groups)} groups")
+
+    if reference_size:
+        start = time.perf_counter()
+        expected = exhaustive_group_similar_strings(strings[:reference_size], ratio)
+        reference_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        actual = similarity_groups.group_similar_strings(strings[:reference_size], ratio)
+        seconds = time.perf_counter() - start
+        results.append(
+            {
+                "strings": reference_size,
+                "reference_seconds": reference_seconds,
+                "seconds": seconds,
+                "speedup": reference_seconds / seconds if seconds else None,
+                "same_groups": actual == expected,
+            }
+        )
+    return results
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip().splitlines()[0], formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000], help="Numbers of strings to group")
+    parser.add_argument("--ratio", type=float, default=80, help="fuzz.ratio above which strings are similar")
+    parser.add_argument(
+        "--reference", type=int, default=2000, help="Number of strings to also group exhaustively, 0 to skip"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic strings")
+    parser.add_argument("-o", "--output", help="Write the results as JSON to this file")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(levelname)-10s %(message)s")
+
+    results = benchmark(args.sizes, args.ratio, args.reference, args.seed)
+    print(tabulate([result for result in results if "groups" in result], headers="keys", floatfmt=".3f"))
+    for result in results:
+        if "same_groups" in result:
+            print(
+                f"\nExhaustive grouping of {result['strings']} strings: {result['reference_seconds']:.3f}s, "
+                f"{result['speedup']:.1f}x slower, same groups: {result['same_groups']}"
+            )
+
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(results, output_file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
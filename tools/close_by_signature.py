@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 
 import os
+import re
 import sys
 import tempfile
 import logging
@@ -8,7 +9,9 @@ import argparse
 import pprint
 import textwrap
 import json
+from concurrent.futures import ThreadPoolExecutor
 
+import ahocorasick
 import jira
 from jira.exceptions import JIRAError
 import retry
@@ -17,11 +20,22 @@ import consts
 from add_triage_signature import (
     config_logger,
     get_issues,
+    triage_tickets_jql,
     ALL_SIGNATURES,
 )
 
 logger = logging.getLogger(__name__)
 
+# Issues whose comments are fetched by a single search
+COMMENTS_SEARCH_BATCH_SIZE = 100
+DEFAULT_JIRA_CONCURRENCY = 8
+
+CLOSED_STATUSES = ("Closed", "Done", "Obsolete")
+# Searches are GET requests, their JQL is kept well within the URL length limits
+MAX_JQL_LENGTH = 4000
+# Words that Jira's text search indexes as they are (but lowercased), unlike e.g. "v4.12" or "api.example.com"
+JQL_TEXT_WORD_REGEX = re.compile(r"[A-Za-z0-9]+")
+
 
 def parse_args():
     desc = textwrap.dedent(
@@ -87,6 +101,13 @@ def parse_args():
         "-t", "--dry-run-temp", action="store_true", help="Dry run. Don't update tickets. Write output to a temp file"
     )
 
+    parser.add_argument(
+        "--jira-concurrency",
+        type=int,
+        default=DEFAULT_JIRA_CONCURRENCY,
+        help="Maximum number of concurrent Jira requests fetching comments",
+    )
+
     return parser.parse_args()
 
 
@@ -97,6 +118,64 @@ class Filter:
         self.root_issue = root_issue
 
 
+class FilterMatcher:
+    """
+    Finds the first filter that applies to the comments of an issue, like
+    trying every filter in order, with find_signature_comment and then looking
+    for its message in the signature comment. The identifying strings of the
+    signatures and the messages of all the filters are compiled into a single
+    Aho-Corasick automaton, so every comment is only scanned once.
+    """
+
+    def __init__(self, filters):
+        self.filters = filters
+        self._automaton = ahocorasick.Automaton()
+        self._pattern_ids = {}
+        for _filter in filters:
+            for pattern in _filter.signature.identifying_strings + [_filter.message]:
+                if pattern and pattern not in self._pattern_ids:
+                    self._pattern_ids[pattern] = len(self._pattern_ids)
+                    self._automaton.add_word(pattern, self._pattern_ids[pattern])
+        if self._pattern_ids:
+            self._automaton.make_automaton()
+
+    def _patterns_in(self, text):
+        if not self._pattern_ids:
+            return set()
+        return {pattern_id for _end, pattern_id in self._automaton.iter(text)}
+
+    def match(self, comments):
+        """
+        The first filter that applies and the signature comment it applies to, (None, None) if no filter does
+        """
+        if not comments:
+            return None, None
+
+        patterns_by_comment = [self._patterns_in(comment.body) for comment in comments]
+        # Index of the first comment containing every pattern, that's the one find_signature_comment returns
+        first_comment_with = {}
+        for comment_index, pattern_ids in enumerate(patterns_by_comment):
+            for pattern_id in pattern_ids:
+                first_comment_with.setdefault(pattern_id, comment_index)
+
+        # The empty string is in every comment
+        first_comment_with[None] = 0
+        for _filter in self.filters:
+            comment_indexes = [
+                first_comment_with[self._pattern_ids.get(string)]
+                for string in _filter.signature.identifying_strings
+                if self._pattern_ids.get(string) in first_comment_with
+            ]
+            if not comment_indexes:
+                continue
+
+            comment_index = min(comment_indexes)
+            if not _filter.message or self._pattern_ids[_filter.message] in patterns_by_comment[comment_index]:
+                return _filter, comments[comment_index]
+
+        return None, None
+
+
 class IssueData:
     def __init__(self, issue, signature, root_issue, comment):
         self.issue = issue
@@ -145,28 +224,158 @@ def get_filters_from_json(filters_json, jira_client):
     return filters
 
 
-def filter_and_generate_issues(jira_client, filters, issues):
-    for issue in issues:
-        if issue.fields.status.name in ("Closed", "Done", "Obsolete"):
-            continue
+def jql_text_words(string):
+    """
+    The words of string Jira's text search is sure to find in a comment that contains it, lowercased so that
+    Lucene doesn't take AND/OR/NOT for operators
+    """
+    words = []
+    for piece in string.split():
+        word = piece.strip(".,:;!?()[]{}<>'\"*|")
+        if JQL_TEXT_WORD_REGEX.fullmatch(word):
+            words.append(word.lower())
+    return words
+
+
+def filter_jql_clause(_filter):
+    """
+    A JQL clause of the tickets that have a comment the filter may apply to, None if it can't be narrowed down.
+    Jira's text search is fuzzy, it only narrows the tickets down, the filters still apply locally.
+    """
+    signature_clauses = []
+    for identifying_string in _filter.signature.identifying_strings:
+        words = jql_text_words(identifying_string)
+        if not words:
+            return None
+        signature_clauses.append(_comment_text_clause(words))
+
+    clause = " OR ".join(signature_clauses)
+    message_words = jql_text_words(_filter.message or "")
+    if message_words:
+        clause = f"({clause}) AND {_comment_text_clause(message_words)}"
+    return f"({clause})"
+
+
+def _comment_text_clause(words):
+    text = " ".join(words)
+    return f'comment ~ "{text}"'
+
+
+def candidate_issues_jql_queries(filters, only_recent):
+    """
+    The JQL queries of the open triage tickets with comments the filters may apply to, together no longer than
+    MAX_JQL_LENGTH each. A single query of all the open tickets when a filter can't be narrowed down.
+    """
+    base_query = f"{triage_tickets_jql(only_recent)} AND status not in ({', '.join(CLOSED_STATUSES)})"
+    clauses = list(dict.fromkeys(filter_jql_clause(_filter) for _filter in filters))
+    if None in clauses:
+        return [f"{base_query} ORDER BY key"]
 
-        comments = get_issue_comments(jira_client, issue)
+    queries = []
+    chunk = []
+    for clause in clauses:
+        if chunk and len(_candidate_issues_jql_query(base_query, chunk + [clause])) > MAX_JQL_LENGTH:
+            queries.append(_candidate_issues_jql_query(base_query, chunk))
+            chunk = []
+        chunk.append(clause)
+    if chunk:
+        queries.append(_candidate_issues_jql_query(base_query, chunk))
+    return queries
+
+
+def _candidate_issues_jql_query(base_query, clauses):
+    return f"{base_query} AND ({' OR '.join(clauses)}) ORDER BY key"
+
+
+def get_candidate_issues(jira_client, filters, only_recent):
+    """
+    The open triage tickets with comments the filters may apply to, see candidate_issues_jql_queries
+    """
+    issues = {}
+    for query in candidate_issues_jql_queries(filters, only_recent):
+        logger.debug("Searching candidate issues with query=%s", query)
+        for issue in jira_client.search_issues(query, maxResults=None, fields=["status"]):
+            issues.setdefault(issue.key, issue)
+
+    logger.info("Found %d candidate issues", len(issues))
+    return list(issues.values())
+
+
+def filter_and_generate_issues(jira_client, filters, issues, jira_concurrency=DEFAULT_JIRA_CONCURRENCY):
+    matcher = FilterMatcher(filters)
+    open_issues = (issue for issue in issues if issue.fields.status.name not in CLOSED_STATUSES)
+    for issue, comments in get_issues_comments(jira_client, open_issues, jira_concurrency):
         if not comments:
             continue
 
-        for _filter in filters:
-            comment = _filter.signature.find_signature_comment(comments=comments)
-            if comment is None:
-                continue
+        _filter, comment = matcher.match(comments)
+        if _filter is not None:
+            yield IssueData(
+                issue=issue,
+                signature=_filter.signature,
+                root_issue=_filter.root_issue,
+                comment=comment,
+            )
 
-            elif not _filter.message or _filter.message in comment.body:
-                yield IssueData(
-                    issue=issue,
-                    signature=_filter.signature,
-                    root_issue=_filter.root_issue,
-                    comment=comment,
-                )
-                break
+
+def get_issues_comments(jira_client, issues, jira_concurrency=DEFAULT_JIRA_CONCURRENCY):
+    """
+    Yields every issue with its comments, None for issues that don't exist
+    anymore. The comments of a batch of issues are fetched by a single
+    search, only the issues with more comments than the search returns are
+    fetched one by one, concurrently.
+    """
+    batch = []
+    with ThreadPoolExecutor(max_workers=jira_concurrency) as executor:
+        for issue in issues:
+            batch.append(issue)
+            if len(batch) == COMMENTS_SEARCH_BATCH_SIZE:
+                yield from _get_batch_comments(jira_client, batch, executor)
+                batch = []
+        if batch:
+            yield from _get_batch_comments(jira_client, batch, executor)
+
+
+def _get_batch_comments(jira_client, issues, executor):
+    comment_fields = {issue.key: issue.fields.comment for issue in search_issues_comments(jira_client, issues)}
+    complete_comments = {}
+    incomplete_issues = []
+    for issue in issues:
+        comment_field = comment_fields.get(issue.key)
+        if comment_field is None:
+            # Doesn't exist anymore, or was moved
+            incomplete_issues.append(issue)
+        elif len(comment_field.comments) >= comment_field.total:
+            complete_comments[issue.key] = comment_field.comments
+        else:
+            # Jira only returns the first page of comments with the issue
+            incomplete_issues.append(issue)
+
+    fetched_comments = dict(
+        zip(
+            [issue.key for issue in incomplete_issues],
+            executor.map(lambda issue: get_issue_comments(jira_client, issue), incomplete_issues),
+        )
+    )
+    for issue in issues:
+        if issue.key in complete_comments:
+            yield issue, complete_comments[issue.key]
+        else:
+            yield issue, fetched_comments[issue.key]
+
+
+@retry.retry(exceptions=JIRAError, tries=3, delay=2)  # being resilient to 401 statuses
+def search_issues_comments(jira_client, issues):
+    """
+    The issues with their comment field, issues that don't exist anymore are left out
+    """
+    return jira_client.search_issues(
+        f"key in ({', '.join(issue.key for issue in issues)})",
+        maxResults=len(issues),
+        fields=["comment"],
+        # Otherwise Jira rejects the whole query when one of the issues was deleted
+        validate_query=False,
+    )
 
 
 @retry.retry(exceptions=JIRAError, tries=3, delay=2)  # being resilient to 401 statuses
@@ -191,11 +400,12 @@ def get_dry_run_stdout(args):
         return sys.stdout
 
 
-def close_tickets_by_filters(jira_client, filters, issues, dry_run_stdout):
+def close_tickets_by_filters(jira_client, filters, issues, dry_run_stdout, jira_concurrency=DEFAULT_JIRA_CONCURRENCY):
     filtered_issues_generator = filter_and_generate_issues(
         jira_client=jira_client,
         filters=filters,
         issues=issues,
+        jira_concurrency=jira_concurrency,
     )
     close_and_link_issues(
         jira_client=jira_client,
@@ -282,7 +492,10 @@ def run_using_cli(args):
     else:
         filters = get_filters_from_args(args, jira_client)
 
-    issues = get_issues(jira_client, args.issue, only_recent=args.recent_issues)
+    if args.issue:
+        issues = get_issues(jira_client, args.issue)
+    else:
+        issues = get_candidate_issues(jira_client, filters, only_recent=args.recent_issues)
 
     dry_run_stdout = get_dry_run_stdout(args)
     try:
@@ -291,6 +504,7 @@ def run_using_cli(args):
             filters=filters,
             issues=issues,
             dry_run_stdout=dry_run_stdout,
+            jira_concurrency=args.jira_concurrency,
         )
     finally:
         if dry_run_stdout:
@@ -0,0 +1,313 @@
+"""
+Columnar store of the events of a cluster's last installation attempt.
+
+The events file of a cluster is a JSON list of dicts, and it has the events of
+every installation attempt, separated by cluster_installation_reset events.
+EventsStore keeps only the events of the last attempt, in array-backed
+columns: timestamp (microseconds since the epoch), host index, interned event
+name and message. It's indexed by host and by event name, and time ranges are
+looked up by bisection.
+
+Signatures that look for particular messages register their patterns in a
+MessageClassifier, which classifies all the messages of the store in a single
+pass the first time any of its patterns is queried.
+
+Clusters that were reset many times have large events files, most of which is
+previous attempts. iter_json_array parses the file as it's downloaded, one
+event at a time, so with EventsStore the memory used is proportional to the
+last attempt rather than to the whole file.
+"""
+import bisect
+import codecs
+import itertools
+import json
+import re
+import sys
+from array import array
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+import dateutil.parser
+
+RESET_EVENT_NAME = "cluster_installation_reset"
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+NO_HOST = -1
+JSON_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+def iter_json_array(chunks):
+    """
+    Yields the items of the JSON array whose UTF-8 encoding is split in the
+    given byte chunks, parsing each one as soon as its chunks are available
+    """
+    text = codecs.getincrementaldecoder("utf-8")()
+    decoder = json.JSONDecoder()
+    buffer = ""
+    # What's expected next: "[", an item, "," or "]" after an item, or nothing once the array is done
+    expected = "["
+    for chunk in itertools.chain(chunks, [None]):
+        final = chunk is None
+        buffer += text.decode(b"" if final else chunk, final=final)
+        position = 0
+        while True:
+            position = JSON_WHITESPACE.match(buffer, position).end()
+            if position == len(buffer):
+                break
+
+            if expected == "":
+                raise ValueError(f"Extra data after the JSON array: {buffer[position:position + 20]!r}")
+            if expected == "[":
+                if buffer[position] != "[":
+                    raise ValueError("Not a JSON array")
+                position += 1
+                expected = "item or ]"
+                continue
+            if buffer[position] == "]" and expected != "item":
+                position += 1
+                expected = ""
+                continue
+            if expected == ", or ]":
+                if buffer[position] != ",":
+                    raise ValueError(f"Expected , or ] in the JSON array at {buffer[position:position + 20]!r}")
+                position += 1
+                expected = "item"
+                continue
+
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if final:
+                    raise
+                # The item isn't complete yet
+                break
+            if not final:
+                # Only the next delimiter tells whether a number goes on in the next chunk
+                delimiter = JSON_WHITESPACE.match(buffer, end).end()
+                if delimiter == len(buffer) or buffer[delimiter] not in ",]":
+                    break
+            yield item
+            position = end
+            expected = ", or ]"
+
+        buffer = buffer[position:]
+
+    if expected != "":
+        raise ValueError("Unterminated JSON array")
+
+
+def parse_event_time(event_time):
+    """
+    Microseconds since the epoch of an event_time, naive times are taken as UTC
+    """
+    try:
+        time = datetime.fromisoformat(event_time)
+    except ValueError:
+        time = dateutil.parser.isoparse(event_time)
+    return _microseconds(time)
+
+
+def _microseconds(time):
+    if isinstance(time, int):
+        return time
+    if isinstance(time, str):
+        return parse_event_time(time)
+    if time.tzinfo is None:
+        time = time.replace(tzinfo=timezone.utc)
+    return (time - EPOCH) // timedelta(microseconds=1)
+
+
+class MessageClassifier:
+    """
+    Named patterns searched for in event messages. A pattern can have a
+    literal, a substring every matching message has, which is checked before
+    running the regex.
+    """
+
+    def __init__(self):
+        self._patterns = {}
+
+    def add(self, label, pattern, literal=None):
+        """
+        Register pattern under label and return it compiled
+        """
+        if label in self._patterns:
+            raise ValueError(f"{label} is already registered")
+        regex = re.compile(pattern)
+        self._patterns[label] = (regex, literal)
+        return regex
+
+    def classify(self, messages):
+        """
+        A dict of every label to the (index, match) of the messages its pattern matches, in order
+        """
+        results = {label: [] for label in self._patterns}
+        patterns = [(results[label], regex.search, literal) for label, (regex, literal) in self._patterns.items()]
+        for index, message in enumerate(messages):
+            for label_results, search, literal in patterns:
+                if literal is not None and literal not in message:
+                    continue
+                match = search(message)
+                if match is not None:
+                    label_results.append((index, match))
+        return results
+
+
+class EventsStore:
+    """
+    The events of the last installation attempt, see the module docstring.
+    Rows are numbered in the order of the events file.
+    """
+
+    def __init__(self, classifier=None):
+        self.classifier = classifier or MessageClassifier()
+        # The number of events of every installation attempt seen so far, only the last one is kept
+        self.attempt_sizes = []
+        # As it appears in the events file
+        self.first_event_time = None
+        self._names = []
+        self._name_codes = {}
+        self._after_reset = False
+        self._clear()
+
+    @classmethod
+    def from_events(cls, events, classifier=None):
+        store = cls(classifier)
+        for event in events:
+            store.append(event)
+        return store
+
+    def _clear(self):
+        self.host_ids = []
+        self._host_indexes = {}
+        self._timestamps = array("q")
+        self._hosts = array("i")
+        self._name_column = array("I")
+        self._messages = []
+        self._rows_by_host = defaultdict(lambda: array("I"))
+        self._rows_by_name = defaultdict(lambda: array("I"))
+        self._time_sorted = True
+        self._time_order = None
+        self._classified = None
+
+    def append(self, event):
+        if event["name"] == RESET_EVENT_NAME:
+            self._after_reset = True
+            return
+
+        if self._after_reset or not self.attempt_sizes:
+            # The first event of a new installation attempt
+            if self.attempt_sizes:
+                self._clear()
+            self.attempt_sizes.append(0)
+            self.first_event_time = event["event_time"]
+            self._after_reset = False
+        self.attempt_sizes[-1] += 1
+
+        row = len(self._messages)
+        timestamp = parse_event_time(event["event_time"])
+        if self._timestamps and timestamp < self._timestamps[-1]:
+            self._time_sorted = False
+        self._timestamps.append(timestamp)
+
+        host_id = event.get("host_id")
+        host = NO_HOST if host_id is None else self._intern(host_id, self.host_ids, self._host_indexes)
+        self._hosts.append(host)
+        if host != NO_HOST:
+            self._rows_by_host[host].append(row)
+
+        name = self._intern(event["name"], self._names, self._name_codes)
+        self._name_column.append(name)
+        self._rows_by_name[name].append(row)
+
+        self._messages.append(event["message"])
+        self._time_order = None
+        self._classified = None
+
+    @property
+    def attempts(self):
+        return len(self.attempt_sizes)
+
+    @staticmethod
+    def _intern(value, values, codes):
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(values)
+            values.append(sys.intern(value))
+        return code
+
+    def __len__(self):
+        return len(self._messages)
+
+    def host_id(self, row):
+        host = self._hosts[row]
+        return None if host == NO_HOST else self.host_ids[host]
+
+    def name(self, row):
+        return self._names[self._name_column[row]]
+
+    def message(self, row):
+        return self._messages[row]
+
+    def timestamp(self, row):
+        """
+        Microseconds since the epoch
+        """
+        return self._timestamps[row]
+
+    def time(self, row):
+        return EPOCH + timedelta(microseconds=self._timestamps[row])
+
+    def rows(self, host_id=None, name=None):
+        """
+        The rows of the given host and/or event name, in order
+        """
+        if host_id is None and name is None:
+            return range(len(self))
+
+        candidates = []
+        if host_id is not None:
+            if host_id not in self._host_indexes:
+                return array("I")
+            candidates.append(self._rows_by_host.get(self._host_indexes[host_id], array("I")))
+        if name is not None:
+            if name not in self._name_codes:
+                return array("I")
+            candidates.append(self._rows_by_name.get(self._name_codes[name], array("I")))
+
+        if len(candidates) == 1:
+            return candidates[0]
+
+        smaller, larger = sorted(candidates, key=len)
+        larger = set(larger)
+        return array("I", (row for row in smaller if row in larger))
+
+    def between(self, start, end):
+        """
+        The rows with start <= time < end, in time order. Times are datetimes,
+        event_time strings or microseconds since the epoch.
+        """
+        start, end = _microseconds(start), _microseconds(end)
+        if self._time_sorted:
+            return range(bisect.bisect_left(self._timestamps, start), bisect.bisect_left(self._timestamps, end))
+
+        if self._time_order is None:
+            self._time_order = array("I", sorted(range(len(self)), key=self._timestamps.__getitem__))
+        order = self._time_order
+        low = bisect.bisect_left(order, start, key=self._timestamps.__getitem__)
+        high = bisect.bisect_left(order, end, key=self._timestamps.__getitem__)
+        return order[low:high]
+
+    def matches(self, label, host_id=None):
+        """
+        The (row, match) of the messages matching the classifier pattern
+        registered under label, in order, only those of host_id if given
+        """
+        if self._classified is None:
+            self._classified = self.classifier.classify(self._messages)
+
+        matches = self._classified[label]
+        if host_id is None:
+            return matches
+
+        host = self._host_indexes.get(host_id)
+        return [(row, match) for row, match in matches if self._hosts[row] == host]
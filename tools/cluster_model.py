@@ -0,0 +1,144 @@
+"""
+Model of the cluster described in the metadata.json of a triage ticket.
+
+The metadata has the inventory of every host as a JSON string, which many
+signatures need. Host parses it lazily, at most once, into an Inventory that
+keeps just the parts signatures use (disks, interfaces, routes, boot mode and
+system vendor), so the parsed inventory dicts don't stay around.
+
+Host and Cluster still give access to the raw metadata with [] and get, for
+everything that isn't modeled.
+"""
+import json
+
+
+class SystemVendor:
+    __slots__ = ("manufacturer", "product_name", "virtual")
+
+    def __init__(self, system_vendor):
+        self.manufacturer = system_vendor.get("manufacturer")
+        self.product_name = system_vendor.get("product_name")
+        self.virtual = system_vendor.get("virtual", False)
+
+
+class Disk:
+    __slots__ = ("name", "path", "by_path", "drive_type", "bootable")
+
+    def __init__(self, disk):
+        self.name = disk.get("name")
+        self.path = disk.get("path")
+        self.by_path = disk.get("by_path")
+        self.drive_type = disk.get("drive_type")
+        self.bootable = disk.get("bootable", False)
+
+
+class Interface:
+    __slots__ = ("name", "mac_address", "ipv4_addresses", "ipv6_addresses")
+
+    def __init__(self, interface):
+        self.name = interface.get("name")
+        self.mac_address = interface.get("mac_address")
+        self.ipv4_addresses = interface.get("ipv4_addresses", [])
+        self.ipv6_addresses = interface.get("ipv6_addresses", [])
+
+
+class Route:
+    __slots__ = ("destination", "gateway", "interface", "family")
+
+    def __init__(self, route):
+        self.destination = route.get("destination")
+        self.gateway = route.get("gateway")
+        self.interface = route.get("interface")
+        self.family = route.get("family")
+
+
+class Inventory:
+    __slots__ = ("hostname", "boot_mode", "system_vendor", "disks", "interfaces", "routes")
+
+    def __init__(self, inventory):
+        self.hostname = inventory.get("hostname")
+        # None when the agent didn't report it
+        self.boot_mode = inventory.get("boot", {}).get("current_boot_mode")
+        self.system_vendor = SystemVendor(inventory.get("system_vendor", {}))
+        self.disks = tuple(Disk(disk) for disk in inventory.get("disks", []))
+        self.interfaces = tuple(Interface(interface) for interface in inventory.get("interfaces", []))
+        self.routes = tuple(Route(route) for route in inventory.get("routes", []))
+
+
+class Host:
+    __slots__ = ("_host", "_inventory")
+
+    def __init__(self, host):
+        self._host = host
+        self._inventory = None
+
+    def __getitem__(self, key):
+        return self._host[key]
+
+    def __contains__(self, key):
+        return key in self._host
+
+    def get(self, key, default=None):
+        return self._host.get(key, default)
+
+    @property
+    def id(self):
+        return self._host["id"]
+
+    @property
+    def role(self):
+        return self._host["role"]
+
+    @property
+    def status(self):
+        return self._host["status"]
+
+    @property
+    def current_stage(self):
+        return self._host["progress"]["current_stage"]
+
+    @property
+    def bootstrap(self):
+        return self._host.get("bootstrap", False)
+
+    @property
+    def inventory(self):
+        if self._inventory is None:
+            self._inventory = Inventory(json.loads(self._host["inventory"]))
+        return self._inventory
+
+    @property
+    def hostname(self):
+        """
+        The hostname the user asked for, if any, otherwise the one the host reported
+        """
+        return self._host.get("requested_hostname") or self.inventory.hostname
+
+
+class Cluster:
+    __slots__ = ("_cluster", "hosts")
+
+    def __init__(self, cluster):
+        self._cluster = cluster
+        self.hosts = [Host(host) for host in cluster.get("hosts", [])]
+
+    def __getitem__(self, key):
+        return self._cluster[key]
+
+    def __contains__(self, key):
+        return key in self._cluster
+
+    def get(self, key, default=None):
+        return self._cluster.get(key, default)
+
+    @property
+    def id(self):
+        return self._cluster["id"]
+
+    @property
+    def is_sno(self):
+        return self._cluster.get("high_availability_mode") == "None"
+
+    @property
+    def machine_cidrs(self):
+        return [network["cidr"] for network in self._cluster.get("machine_networks", [])]
@@ -0,0 +1,263 @@
+"""
+A persistent, content-addressed on-disk cache for files downloaded from the
+assisted logs server.
+
+Entries are keyed by URL and revalidated with the server on every use
+(If-None-Match / If-Modified-Since), so a 304 response is served from disk.
+Contents are stored once per SHA-256 digest. The total size of the stored
+contents is kept under a byte budget by evicting the least recently used
+entries. A lock file serializes changes to the cache, so it can be shared by
+parallel processes (e.g. Jenkins executors on the same agent) and threads.
+"""
+import collections
+import contextlib
+import fcntl
+import hashlib
+import json
+import os
+import pathlib
+import shutil
+import tempfile
+import threading
+import uuid
+
+import requests
+
+DEFAULT_MAX_BYTES = 20 * 1024**3
+CHUNK_SIZE = 1024**2
+
+
+class DownloadCacheStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self.bytes_downloaded = 0
+        self.evictions = 0
+
+    def as_dict(self):
+        return dict(vars(self))
+
+    def __str__(self):
+        return (
+            f"{self.hits} hits, {self.misses} misses, {self.bytes_saved / 1024**2:.1f} MiB saved, "
+            f"{self.bytes_downloaded / 1024**2:.1f} MiB downloaded, {self.evictions} evictions"
+        )
+
+
+class DownloadCache:
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES, session=None):
+        self.directory = pathlib.Path(directory)
+        self.max_bytes = max_bytes
+        self.stats = DownloadCacheStats()
+        self._session = session or requests
+        self._entries_dir = self.directory / "entries"
+        self._objects_dir = self.directory / "objects"
+        self._tmp_dir = self.directory / "tmp"
+        self._thread_lock = threading.Lock()
+
+        for path in (self._entries_dir, self._objects_dir, self._tmp_dir):
+            path.mkdir(parents=True, exist_ok=True)
+
+    @contextlib.contextmanager
+    def _locked(self):
+        with self._thread_lock, open(self.directory / ".lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _entry_path(self, url):
+        return self._entries_dir / (hashlib.sha256(url.encode()).hexdigest() + ".json")
+
+    def _object_path(self, digest):
+        return self._objects_dir / digest
+
+    def _read_entry(self, url):
+        try:
+            with open(self._entry_path(url)) as f:
+                entry = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+        if not self._object_path(entry["digest"]).exists():
+            return None
+
+        return entry
+
+    def get(self, url):
+        """
+        Returns the up-to-date contents of the given URL as bytes.
+        Raises requests.exceptions.HTTPError like requests would.
+        """
+        return self._fetch(url, lambda object_path: object_path.read_bytes())
+
+    def stream(self, url, use):
+        """
+        Calls use with an iterator over the up-to-date contents of the given
+        URL, in chunks, and returns what it returns.
+        Raises requests.exceptions.HTTPError like requests would.
+        """
+
+        def use_chunks(object_path):
+            with open(object_path, "rb") as f:
+                return use(iter(lambda: f.read(CHUNK_SIZE), b""))
+
+        return self._fetch(url, use_chunks)
+
+    def fetch_to(self, url, destination):
+        """
+        Places an up-to-date copy of the given URL at destination, hard-linked
+        to the cached contents when possible (see mkdtemp).
+        Raises requests.exceptions.HTTPError like requests would.
+        """
+
+        def link_or_copy(object_path):
+            try:
+                os.link(object_path, destination)
+            except OSError:
+                shutil.copyfile(object_path, destination)
+            return destination
+
+        return self._fetch(url, link_or_copy)
+
+    def mkdtemp(self):
+        """
+        A new temporary directory on the same filesystem as the cache, so
+        fetch_to destinations in it can be hard-linked instead of copied
+        """
+        return pathlib.Path(tempfile.mkdtemp(dir=self._tmp_dir, prefix="dir-"))
+
+    def _fetch(self, url, use):
+        """
+        Download or revalidate the given URL and call use with the path of the
+        cached contents. use runs without the lock held, on a hard link of the
+        contents, which stays readable even if the contents get evicted meanwhile.
+        """
+        with self._locked():
+            entry = self._read_entry(url)
+
+        headers = {}
+        if entry is not None:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        response = self._session.get(url, headers=headers, stream=True)
+        pinned = None
+        if entry is not None and response.status_code == 304:
+            response.close()
+            with self._locked():
+                object_path = self._object_path(entry["digest"])
+                if object_path.exists():
+                    # The modification time of the entry is used for LRU eviction
+                    os.utime(self._entry_path(url))
+                    self.stats.hits += 1
+                    self.stats.bytes_saved += entry["size"]
+                    pinned = self._pin(object_path)
+
+            if pinned is not None:
+                return self._use_pinned(pinned, use)
+
+            # Evicted by someone else in the meantime, download it again
+            response = self._session.get(url, stream=True)
+
+        with response:
+            response.raise_for_status()
+            return self._store(url, response, use)
+
+    def _store(self, url, response, use):
+        digest = hashlib.sha256()
+        size = 0
+        with tempfile.NamedTemporaryFile(dir=self._tmp_dir, delete=False) as tmp:
+            try:
+                for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                    digest.update(chunk)
+                    size += len(chunk)
+                    tmp.write(chunk)
+            except Exception:
+                os.unlink(tmp.name)
+                raise
+
+        entry = {
+            "url": url,
+            "digest": digest.hexdigest(),
+            "size": size,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+        }
+
+        with self._locked():
+            object_path = self._object_path(entry["digest"])
+            if object_path.exists():
+                os.unlink(tmp.name)
+            else:
+                os.replace(tmp.name, object_path)
+
+            entry_path = self._entry_path(url)
+            with tempfile.NamedTemporaryFile(mode="w", dir=self._tmp_dir, delete=False) as tmp_entry:
+                json.dump(entry, tmp_entry)
+            os.replace(tmp_entry.name, entry_path)
+
+            self.stats.misses += 1
+            self.stats.bytes_downloaded += size
+            self._evict(keep=entry["digest"])
+            pinned = self._pin(object_path)
+
+        return self._use_pinned(pinned, use)
+
+    def _pin(self, object_path):
+        """
+        Must be called with the lock held
+        """
+        pinned = self._tmp_dir / f"pin-{uuid.uuid4().hex}"
+        os.link(object_path, pinned)
+        return pinned
+
+    @staticmethod
+    def _use_pinned(pinned, use):
+        try:
+            return use(pinned)
+        finally:
+            pinned.unlink(missing_ok=True)
+
+    def _evict(self, keep):
+        """
+        Must be called with the lock held. Removes unreferenced contents, then
+        the least recently used entries until the stored contents fit in the
+        byte budget. The contents that were just stored are never evicted.
+        """
+        entries = []
+        for entry_path in self._entries_dir.glob("*.json"):
+            try:
+                with open(entry_path) as f:
+                    entries.append((entry_path.stat().st_mtime, entry_path, json.load(f)))
+            except (FileNotFoundError, json.JSONDecodeError):
+                continue
+
+        references = collections.Counter(entry["digest"] for _mtime, _path, entry in entries)
+
+        # Contents that were replaced by a newer version of their URL
+        for object_path in self._objects_dir.iterdir():
+            if object_path.name not in references:
+                object_path.unlink(missing_ok=True)
+
+        object_sizes = {entry["digest"]: entry["size"] for _mtime, _path, entry in entries}
+        total = sum(object_sizes.values())
+        if total <= self.max_bytes:
+            return
+
+        for _mtime, entry_path, entry in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_bytes:
+                break
+            if entry["digest"] == keep:
+                continue
+
+            entry_path.unlink(missing_ok=True)
+            self.stats.evictions += 1
+            references[entry["digest"]] -= 1
+            if references[entry["digest"]] == 0:
+                self._object_path(entry["digest"]).unlink(missing_ok=True)
+                total -= entry["size"]
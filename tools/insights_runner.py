@@ -0,0 +1,119 @@
+"""
+Runs of Insights (the ccx_rules_ocp rules) on must-gathers, for the
+MustGatherAnalysis signature.
+
+Runs happen in a pool of worker threads of their own, so the tickets don't
+wait for them: submit returns a future of the report. Every run has a
+timeout, after which Insights is killed.
+
+Reports are cached on disk by the SHA-256 of the must-gather, so a
+must-gather that was already analyzed (e.g. when re-evaluating a ticket)
+isn't analyzed again. The same must-gather submitted while it's being
+analyzed shares the run in progress.
+"""
+import concurrent.futures
+import hashlib
+import os
+import pathlib
+import subprocess
+import tempfile
+import threading
+from collections import Counter
+
+INSIGHTS_COMMAND = ("insights", "run", "-p", "ccx_rules_ocp")
+DEFAULT_TIMEOUT_SECONDS = 30 * 60
+
+
+class InsightsReport:
+    def __init__(self, digest, content):
+        # SHA-256 of the must-gather
+        self.digest = digest
+        self.content = content
+
+
+class InsightsRunner:
+    def __init__(self, workers=1, timeout=DEFAULT_TIMEOUT_SECONDS, cache_dir=None, command=INSIGHTS_COMMAND):
+        self.timeout = timeout
+        self.cache_dir = pathlib.Path(cache_dir) if cache_dir else None
+        self.command = tuple(command)
+        self.stats = Counter()
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix="insights")
+        self._lock = threading.Lock()
+        self._running = {}
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def submit(self, mustgather):
+        """
+        A future of the InsightsReport of the given must-gather (bytes). The
+        future raises subprocess.TimeoutExpired if Insights timed out.
+        """
+        digest = hashlib.sha256(mustgather).hexdigest()
+        content = self._read_cache(digest)
+        if content is not None:
+            self._count("cache_hits")
+            future = concurrent.futures.Future()
+            future.set_result(InsightsReport(digest, content))
+            return future
+
+        with self._lock:
+            if digest in self._running:
+                return self._running[digest]
+
+            # Written right away, so the must-gather isn't kept in memory until a worker is free
+            with tempfile.NamedTemporaryFile(prefix="must-gather-", suffix=".tar.gz", delete=False) as tmp:
+                tmp.write(mustgather)
+            future = self._running[digest] = self._executor.submit(self._run, digest, tmp.name)
+
+        # Not holding the lock, the callback runs right away if the run is already done
+        future.add_done_callback(lambda future: self._forget(future, digest, tmp.name))
+        return future
+
+    def _forget(self, future, digest, mustgather_path):
+        with self._lock:
+            if self._running.get(digest) is future:
+                del self._running[digest]
+        if future.cancelled():
+            os.unlink(mustgather_path)
+
+    def _count(self, stat):
+        with self._lock:
+            self.stats[stat] += 1
+
+    def _run(self, digest, mustgather_path):
+        try:
+            result = subprocess.run([*self.command, mustgather_path], stdout=subprocess.PIPE, timeout=self.timeout)
+        except subprocess.TimeoutExpired:
+            self._count("timeouts")
+            raise
+        finally:
+            os.unlink(mustgather_path)
+
+        self._count("runs")
+        if result.returncode == 0:
+            self._write_cache(digest, result.stdout)
+        return InsightsReport(digest, result.stdout)
+
+    def _cache_path(self, digest):
+        return self.cache_dir / f"{digest}.txt"
+
+    def _read_cache(self, digest):
+        if self.cache_dir is None:
+            return None
+        try:
+            return self._cache_path(digest).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def _write_cache(self, digest, content):
+        if self.cache_dir is None:
+            return
+        with tempfile.NamedTemporaryFile(dir=self.cache_dir, delete=False) as tmp:
+            tmp.write(content)
+        os.replace(tmp.name, self._cache_path(digest))
+
+    def close(self):
+        """
+        Drop the runs that didn't start, without waiting for the others
+        """
+        self._executor.shutdown(wait=False, cancel_futures=True)
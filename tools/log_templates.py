@@ -0,0 +1,294 @@
+"""
+Mining of log message templates, Drain style (He et al., "Drain: An Online Log
+Parsing Approach with Fixed Depth Tree"), and a persistent table of the
+templates seen across tickets.
+
+Messages are split into tokens after masking the obvious variables (numbers,
+addresses, UUIDs, hashes) with <*>. A message then walks a tree of fixed depth,
+by its number of tokens and its first tokens, to a leaf holding a bounded
+number of templates. It joins the most similar one, whose tokens that differ
+from the message's become <*>, or starts a new template. Messages and leaves
+are bounded too, so the cost of a message doesn't depend on how many were
+mined before it, and a whole log is mined in one linear pass.
+
+The templates of a ticket are mined locally, then merged into the templates
+of the table of their file (see LogTemplateStore.observe), which records in
+how many tickets every template was seen.
+"""
+import re
+import sqlite3
+import threading
+from collections import defaultdict
+
+WILDCARD = "<*>"
+
+DEFAULT_DEPTH = 3
+DEFAULT_SIMILARITY = 0.5
+DEFAULT_MAX_CHILDREN = 100
+DEFAULT_MAX_TEMPLATES_PER_LEAF = 32
+MAX_MESSAGE_LENGTH = 1000
+MAX_TOKENS = 64
+
+VARIABLE_REGEX = re.compile(
+    r"\b[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}\b"
+    r"|\b(?:[0-9a-fA-F]{2}:){5}[0-9a-fA-F]{2}\b"
+    r"|\b\d{1,3}(?:\.\d{1,3}){3}(?::\d+)?(?:/\d+)?\b"
+    r"|\b(?:sha256:)?[0-9a-fA-F]{8,}\b"
+    r"|\b\d+(?:\.\d+)*[a-zA-Z]{0,3}\b"
+)
+
+
+def tokenize(message):
+    """
+    The tokens of a message, with its variables masked
+    """
+    return VARIABLE_REGEX.sub(WILDCARD, message[:MAX_MESSAGE_LENGTH]).split()[:MAX_TOKENS]
+
+
+class LogTemplate:
+    __slots__ = ("id", "tokens", "count")
+
+    def __init__(self, template_id, tokens, count=0):
+        self.id = template_id
+        self.tokens = tokens
+        # Number of messages that joined the template
+        self.count = count
+
+    @property
+    def text(self):
+        return " ".join(self.tokens)
+
+
+class _Node:
+    __slots__ = ("children", "templates")
+
+    def __init__(self):
+        self.children = {}
+        self.templates = []
+
+
+class TemplateMiner:
+    """
+    The templates of the messages added so far, in order of creation, see the module docstring
+    """
+
+    def __init__(
+        self,
+        depth=DEFAULT_DEPTH,
+        similarity=DEFAULT_SIMILARITY,
+        max_children=DEFAULT_MAX_CHILDREN,
+        max_templates_per_leaf=DEFAULT_MAX_TEMPLATES_PER_LEAF,
+    ):
+        self.depth = depth
+        self.similarity = similarity
+        self.max_children = max_children
+        self.max_templates_per_leaf = max_templates_per_leaf
+        self.templates = []
+        self._root = _Node()
+
+    def add(self, message, count=1):
+        return self.add_tokens(tokenize(message), count)
+
+    def add_tokens(self, tokens, count=1):
+        """
+        Add the (already tokenized) message, returns its template
+        """
+        leaf = self._leaf(tokens)
+        template = self._most_similar(leaf.templates, tokens)
+        if template is None or (
+            self._similarity(template, tokens) < self.similarity and len(leaf.templates) < self.max_templates_per_leaf
+        ):
+            template = LogTemplate(len(self.templates), list(tokens))
+            self.templates.append(template)
+            leaf.templates.append(template)
+        else:
+            template.tokens = [
+                token if token == template_token else WILDCARD for token, template_token in zip(tokens, template.tokens)
+            ]
+        template.count += count
+        return template
+
+    def restore(self, template):
+        """
+        Add a template as it was mined before, e.g. loaded from a LogTemplateStore.
+        Templates must be restored in order of their IDs.
+        """
+        assert template.id == len(self.templates)
+        self.templates.append(template)
+        self._leaf(template.tokens).templates.append(template)
+
+    def _leaf(self, tokens):
+        node = self._root.children.get(len(tokens))
+        if node is None:
+            node = self._root.children[len(tokens)] = _Node()
+
+        for token in tokens[: self.depth]:
+            # The wildcard child doesn't count towards max_children, everything else goes to it once there are too many
+            key = WILDCARD if WILDCARD in token or any(c.isdigit() for c in token) else token
+            if key not in node.children and key != WILDCARD and len(node.children) >= self.max_children:
+                key = WILDCARD
+            child = node.children.get(key)
+            if child is None:
+                child = node.children[key] = _Node()
+            node = child
+        return node
+
+    def _most_similar(self, templates, tokens):
+        best = None
+        best_key = None
+        for template in templates:
+            key = (self._similarity(template, tokens), template.tokens.count(WILDCARD))
+            if best_key is None or key > best_key:
+                best, best_key = template, key
+        return best
+
+    @staticmethod
+    def _similarity(template, tokens):
+        if not tokens:
+            return 1.0
+        equal = sum(
+            1
+            for token, template_token in zip(tokens, template.tokens)
+            if token == template_token and template_token != WILDCARD
+        )
+        return equal / len(tokens)
+
+
+class TemplateObservation:
+    __slots__ = ("template", "lines", "previous_tickets")
+
+    def __init__(self, template, lines, previous_tickets):
+        self.template = template
+        # Lines of the ticket that joined the template
+        self.lines = lines
+        # Number of other tickets the template was seen in
+        self.previous_tickets = previous_tickets
+
+
+class LogTemplateStore:
+    """
+    The templates of every file mined across tickets, in SQLite, with the
+    tickets each template was seen in and how many lines of them joined it.
+    Every file has a TemplateMiner of its own, loaded on first use.
+    """
+
+    # Template IDs per query, within the SQLite limit on the number of parameters
+    QUERY_CHUNK_SIZE = 500
+
+    def __init__(self, path, miner_factory=TemplateMiner):
+        self.path = path
+        self._miner_factory = miner_factory
+        self._miners = {}
+        # IDs of the templates created or changed since they were last written, by file
+        self._dirty = defaultdict(set)
+        # The tickets recorded, by file
+        self._tickets = {}
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._db:
+            self._db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS log_templates (
+                    filename TEXT NOT NULL,
+                    id INTEGER NOT NULL,
+                    template TEXT NOT NULL,
+                    PRIMARY KEY (filename, id)
+                )
+                """
+            )
+            self._db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS ticket_log_templates (
+                    issue_key TEXT NOT NULL,
+                    filename TEXT NOT NULL,
+                    template_id INTEGER NOT NULL,
+                    lines INTEGER NOT NULL,
+                    PRIMARY KEY (issue_key, filename, template_id)
+                )
+                """
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS ticket_log_templates_template "
+                "ON ticket_log_templates (filename, template_id)"
+            )
+
+    def observe(self, issue_key, filename, templates, record=True):
+        """
+        Merge the templates mined from filename in a ticket, as (tokens, lines)
+        pairs, into the templates of the table. Returns the number of other
+        tickets the table has seen filename in, and a TemplateObservation of
+        each of the given templates, in the same order.
+
+        With record, the templates of the ticket replace those recorded for it
+        before, if any, otherwise the table isn't modified.
+        """
+        with self._lock:
+            miner = self._miner(filename)
+            observations = []
+            lines_by_id = defaultdict(int)
+            for tokens, lines in templates:
+                template = miner.add_tokens(tokens, lines)
+                observations.append(TemplateObservation(template, lines, 0))
+                lines_by_id[template.id] += lines
+                self._dirty[filename].add(template.id)
+
+            previous_tickets = {}
+            template_ids = list(lines_by_id)
+            for start in range(0, len(template_ids), self.QUERY_CHUNK_SIZE):
+                chunk = template_ids[start : start + self.QUERY_CHUNK_SIZE]
+                previous_tickets.update(
+                    self._db.execute(
+                        "SELECT template_id, COUNT(*) FROM ticket_log_templates "
+                        f"WHERE filename = ? AND template_id IN ({', '.join('?' * len(chunk))}) AND issue_key != ? "
+                        "GROUP BY template_id",
+                        (filename, *chunk, issue_key),
+                    )
+                )
+            history_tickets = len(self._tickets[filename] - {issue_key})
+            for observation in observations:
+                observation.previous_tickets = previous_tickets.get(observation.template.id, 0)
+
+            if record:
+                with self._db:
+                    self._db.executemany(
+                        "INSERT OR REPLACE INTO log_templates VALUES (?, ?, ?)",
+                        [
+                            (filename, template_id, miner.templates[template_id].text)
+                            for template_id in self._dirty[filename]
+                        ],
+                    )
+                    self._db.execute(
+                        "DELETE FROM ticket_log_templates WHERE issue_key = ? AND filename = ?", (issue_key, filename)
+                    )
+                    self._db.executemany(
+                        "INSERT INTO ticket_log_templates VALUES (?, ?, ?, ?)",
+                        [(issue_key, filename, template_id, lines) for template_id, lines in lines_by_id.items()],
+                    )
+                self._dirty[filename].clear()
+                self._tickets[filename].add(issue_key)
+
+        return history_tickets, observations
+
+    def _miner(self, filename):
+        miner = self._miners.get(filename)
+        if miner is None:
+            miner = self._miners[filename] = self._miner_factory()
+            rows = self._db.execute(
+                "SELECT t.id, t.template, COALESCE(SUM(r.lines), 0) FROM log_templates t "
+                "LEFT JOIN ticket_log_templates r ON r.filename = t.filename AND r.template_id = t.id "
+                "WHERE t.filename = ? GROUP BY t.id ORDER BY t.id",
+                (filename,),
+            )
+            for template_id, text, count in rows:
+                miner.restore(LogTemplate(template_id, text.split(" ") if text else [], count))
+            self._tickets[filename] = {
+                issue_key
+                for (issue_key,) in self._db.execute(
+                    "SELECT DISTINCT issue_key FROM ticket_log_templates WHERE filename = ?", (filename,)
+                )
+            }
+        return miner
+
+    def close(self):
+        with self._lock:
+            self._db.close()
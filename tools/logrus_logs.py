@@ -0,0 +1,91 @@
+"""
+Records of logs in the logrus text format, which the assisted installer
+controller, agent and installer all log in:
+
+    time="2023-01-01T00:00:00Z" level=error msg="something failed" file="x.go:12"
+
+A log is tokenized once into LogRecord objects, in a single pass of one
+regex over the whole text, which checks can then select from by level and
+message instead of each scanning the text with a regex of their own.
+
+Messages are kept as they appear in the log, escaped (e.g. with \\n and \\"
+for newlines and quotes).
+"""
+import re
+
+LOGRUS_RECORD_REGEX = re.compile(
+    r'time="(?P<time>[^"\n]*)" level=(?P<level>[a-z]+) msg="(?P<msg>[^"\\\n]*(?:\\.[^"\\\n]*)*)"(?P<fields>[^\n]*)'
+)
+FILE_FIELD_REGEX = re.compile(r'(?:^| )file="?(?P<file>[^"\s]*)')
+
+
+class LogRecord:
+    __slots__ = ("time", "level", "msg", "file", "start", "end")
+
+    def __init__(self, time, level, msg, file, start, end):
+        self.time = time
+        self.level = level
+        self.msg = msg
+        # The source file field, None when the record doesn't have one
+        self.file = file
+        # Offsets of the record in the text of the log, from time= to the end of the line
+        self.start = start
+        self.end = end
+
+
+def _record(match, offset=0):
+    fields = match.group("fields")
+    file_match = FILE_FIELD_REGEX.search(fields) if "file=" in fields else None
+    return LogRecord(
+        match.group("time"),
+        match.group("level"),
+        match.group("msg"),
+        file_match.group("file") if file_match is not None else None,
+        offset + match.start(),
+        offset + match.end(),
+    )
+
+
+def parse_line(line):
+    """
+    The LogRecord of a single line, None if it isn't a logrus record
+    """
+    match = LOGRUS_RECORD_REGEX.search(line)
+    return _record(match) if match is not None else None
+
+
+class LogRecords:
+    """
+    The records of a whole log, in order, indexed by level
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self.records = [_record(match) for match in LOGRUS_RECORD_REGEX.finditer(text)]
+        self._by_level = {}
+        for record in self.records:
+            self._by_level.setdefault(record.level, []).append(record)
+
+    def __len__(self):
+        return len(self.records)
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def select(self, level=None, prefix=None, contains=None):
+        """
+        The records of the given level whose message starts with prefix and contains contains, in order
+        """
+        records = self.records if level is None else self._by_level.get(level, ())
+        for record in records:
+            if prefix is not None and not record.msg.startswith(prefix):
+                continue
+            if contains is not None and contains not in record.msg:
+                continue
+            yield record
+
+    def line(self, record):
+        """
+        The text of the record as it appears in the log
+        """
+        return self.text[record.start : record.end]
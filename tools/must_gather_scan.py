@@ -0,0 +1,47 @@
+"""
+Scans of the resources of an extracted must-gather.
+
+A must-gather has the resources of every namespace as YAML lists (e.g.
+namespaces/<namespace>/core/pods.yaml), which can be large and slow to parse.
+Checks usually look for resources in a particular state, whose YAML has a
+telltale string (e.g. a waiting reason), so files that don't contain it are
+skipped without parsing them. The others are parsed with the libyaml loader
+when PyYAML has it, and the namespaces are spread over a pool of workers.
+"""
+import concurrent.futures
+import functools
+import os
+
+import yaml
+
+# The libyaml based loader is many times faster, it's missing when PyYAML was built without libyaml
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+DEFAULT_WORKERS = min(8, os.cpu_count() or 1)
+
+
+def scan_namespace_resources(namespaces_dir, resource, predicate, prefilter=None, workers=DEFAULT_WORKERS):
+    """
+    The items of the resource list at resource (e.g. "core/pods.yaml") of
+    every namespace in namespaces_dir (a pathlib.Path) for which predicate is
+    true, by namespace name. When prefilter (bytes) is given, only the files
+    containing it are parsed, so predicate must only accept items with it.
+    """
+    paths = [
+        namespace_dir / resource
+        for namespace_dir in sorted(namespaces_dir.iterdir())
+        if namespace_dir.is_dir() and (namespace_dir / resource).is_file()
+    ]
+
+    scan = functools.partial(_scan_resource_file, predicate=predicate, prefilter=prefilter)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        for items in executor.map(scan, paths):
+            yield from items
+
+
+def _scan_resource_file(path, predicate, prefilter):
+    content = path.read_bytes()
+    if prefilter is not None and prefilter not in content:
+        return []
+
+    resource_list = yaml.load(content, Loader=YAML_LOADER) or {}
+    return [item for item in resource_list.get("items") or [] if predicate(item)]
@@ -0,0 +1,412 @@
+"""
+Read members of a remote tar archive using HTTP range requests, so that only
+the parts of the archive that are actually used get downloaded.
+
+RangeRemoteArchive is a drop-in replacement for nestedarchive.RemoteNestedArchive:
+its get method takes the same nested archive paths. LocalNestedArchive does the
+same for an archive that's already on disk.
+
+Both keep an in-memory index of the members, built once per archive: a trie
+of member paths, through the nested archives too. The tar headers are read to
+index the root archive, and only the byte ranges of requested members are
+fetched. Uncompressed nested tars (e.g. the per-host .tar files inside the
+cluster logs tar) are indexed the same way, through ranges of the outer
+archive. Compressed nested archives can't be read partially, so the first
+time a path goes through one, it's fetched whole, extracted and the extracted
+files are indexed. Glob queries (get and glob) are then answered by walking
+the trie, without going back to the archive or the file system.
+
+Before fetching a compressed nested archive to look for a logs_host_<id>
+directory in it, only its first few KB are read to find out which host it
+belongs to, so reading the logs of one host only downloads that host's
+archive.
+
+If the server doesn't support range requests, the whole archive is downloaded
+once and read locally.
+
+usage reports the disk space taken by the archive's temporary directory and an
+estimate of the memory taken by its index, see archive_cache.
+
+Every request is made with the given limiter held, if any.
+"""
+import contextlib
+import fnmatch
+import io
+import itertools
+import os
+import re
+import shutil
+import tarfile
+import tempfile
+import threading
+from pathlib import Path, PurePosixPath
+
+import requests
+
+HEADER_READ_AHEAD = 16 * 1024
+# Small, every tar header read (512 bytes) costs at least that much
+RANGE_READ_AHEAD = 4 * 1024
+FETCH_CHUNK_SIZE = 8 * 1024**2
+CONTENT_RANGE_REGEX = re.compile(r"bytes (\d+)-(\d+)/(\d+)")
+COMPRESSED_ARCHIVE_SUFFIXES = (".tar.gz", ".tgz")
+# Don't let the extraction of an archive write outside of its destination, where supported
+EXTRACT_KWARGS = {"filter": "data"} if hasattr(tarfile, "data_filter") else {}
+# Rough memory taken by an entry of the index (its node, name and TarInfo)
+INDEX_ENTRY_BYTES = 640
+
+
+class _HTTPRangeReader(io.RawIOBase):
+    """
+    Seekable, read-only file object over a remote file, every read is a range request
+    """
+
+    def __init__(self, url, size, session, stats, limiter):
+        super().__init__()
+        self._url = url
+        self._size = size
+        self._session = session
+        self._stats = stats
+        self._limiter = limiter
+        self._position = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            self._position = offset
+        elif whence == io.SEEK_CUR:
+            self._position += offset
+        elif whence == io.SEEK_END:
+            self._position = self._size + offset
+        else:
+            raise ValueError(f"Invalid whence {whence}")
+        return self._position
+
+    def readinto(self, buffer):
+        if self._position >= self._size or len(buffer) == 0:
+            return 0
+
+        end = min(self._position + len(buffer), self._size) - 1
+        with self._limiter:
+            response = self._session.get(self._url, headers={"Range": f"bytes={self._position}-{end}"})
+        response.raise_for_status()
+        if response.status_code != 206:
+            raise RuntimeError(f"{self._url} stopped honoring range requests")
+
+        data = response.content
+        buffer[: len(data)] = data
+        self._position += len(data)
+        self._stats["requests"] += 1
+        self._stats["bytes_fetched"] += len(data)
+        return len(data)
+
+
+class _Directory(dict):
+    """
+    A directory of the index, name to child node. The children are
+    _Directory, _TarMember (in a tar being read in place) or Path (an
+    extracted file). local_path is set for extracted directories.
+    """
+
+    def __init__(self, local_path=None):
+        super().__init__()
+        self.local_path = local_path
+
+
+class _TarMember:
+    __slots__ = ("tar", "info")
+
+    def __init__(self, tar, info):
+        self.tar = tar
+        self.info = info
+
+
+class NestedArchive:
+    """
+    Reads the members of a tar archive and of the archives nested in it, see
+    the module docstring. Subclasses open the root archive in _open_root_tar.
+    """
+
+    def __init__(self, tmpdir=None):
+        self.stats = {"requests": 0, "bytes_fetched": 0}
+        self.tmpdir = Path(tmpdir) if tmpdir is not None else Path(tempfile.mkdtemp())
+        self._lock = threading.Lock()
+        self._root = None
+        self._nested = {}
+        self._root_dirs = {}
+        self._extractions = itertools.count()
+        self._disk_bytes = 0
+        self._index_entries = 0
+
+    def _open_root_tar(self):
+        raise NotImplementedError
+
+    def _index(self):
+        if self._root is None:
+            self._root = self._tar_tree(self._open_root_tar())
+        return self._root
+
+    def get(self, path, mode="r"):
+        """
+        Same as nestedarchive.RemoteNestedArchive.get: the content of the first
+        file matching path, or the local path of the directory matching it
+        """
+        with self._lock:
+            for member_path, node in self._walk(self._index(), PurePosixPath(path).parts, ""):
+                if isinstance(node, _Directory):
+                    return self._local_directory(node, member_path)
+                return self._read(node, mode)
+
+        raise FileNotFoundError(f"Couldn't find any files matching {path}")
+
+    def glob(self, pattern):
+        """
+        Paths of the members matching pattern, in archive order. Nested archives
+        on the way are opened as needed, the members themselves aren't read.
+        """
+        with self._lock:
+            return [member_path for member_path, _node in self._walk(self._index(), PurePosixPath(pattern).parts, "")]
+
+    def root_member_names(self):
+        """
+        Names of the top-level entries of the root archive, only the tar headers are read
+        """
+        with self._lock:
+            return list(self._index())
+
+    def root_dir(self, path):
+        """
+        Name of the top-level directory of the compressed archive at path, read
+        from its first entry without fetching the whole archive, or None
+        """
+        with self._lock:
+            for _member_path, node in self._walk(self._index(), PurePosixPath(path).parts, ""):
+                return self._peek_root_dir(node)
+
+        raise FileNotFoundError(f"Couldn't find any files matching {path}")
+
+    def usage(self):
+        """
+        (bytes on disk, estimated bytes in memory) taken by this archive
+        """
+        return self._disk_bytes, self._index_entries * INDEX_ENTRY_BYTES
+
+    def close(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def _walk(self, node, parts, path):
+        """
+        Yields the (path, node) of every member under node matching parts,
+        opening the nested archives on the way lazily
+        """
+        if not parts:
+            yield path, node
+            return
+
+        segment, *rest = parts
+        if not isinstance(node, _Directory):
+            node = self._nested_tree(node, path, segment)
+            if node is None:
+                return
+
+        for name in [name for name in node if fnmatch.fnmatchcase(name, segment)]:
+            yield from self._walk(node[name], rest, f"{path}/{name}" if path else name)
+
+    def _nested_tree(self, node, path, segment):
+        """
+        The index of the nested archive at node, None if it isn't an archive
+        or can't contain a top-level entry matching segment
+        """
+        if id(node) not in self._nested:
+            if path.endswith(".tar"):
+                tree = self._tar_tree(tarfile.open(fileobj=self._open_member(node), mode="r:"))
+            elif path.endswith(COMPRESSED_ARCHIVE_SUFFIXES):
+                if not self._may_contain(node, segment):
+                    return None
+                tree = self._extract(node)
+            else:
+                tree = None
+            # Keep the node alive along with its tree, it's keyed by id
+            self._nested[id(node)] = (node, tree)
+
+        return self._nested[id(node)][1]
+
+    def _may_contain(self, node, segment):
+        """
+        Whether the compressed archive may have a top-level entry matching
+        segment. Per-host log archives have a single logs_host_<id> directory,
+        which is their first entry, so for them that's decided by decompressing
+        just the beginning of the archive.
+        """
+        if not segment.startswith("logs_host_"):
+            return True
+
+        root_dir = self._peek_root_dir(node)
+        if root_dir is None or not root_dir.startswith("logs_host_"):
+            return True
+        return fnmatch.fnmatchcase(root_dir, segment)
+
+    def _peek_root_dir(self, node):
+        if id(node) not in self._root_dirs:
+            try:
+                with self._open_member(node) as compressed, tarfile.open(fileobj=compressed, mode="r|gz") as stream:
+                    first = stream.next()
+                root_dir = PurePosixPath(first.name).parts[0] if first is not None else None
+            except (tarfile.TarError, OSError, EOFError):
+                root_dir = None
+            self._root_dirs[id(node)] = (node, root_dir)
+
+        return self._root_dirs[id(node)][1]
+
+    def _tar_tree(self, tar):
+        tree = _Directory()
+        for info in tar.getmembers():
+            parts = PurePosixPath(info.name).parts
+            if not parts:
+                continue
+
+            *dirs, name = parts
+            parent = tree
+            for directory in dirs:
+                parent = parent.setdefault(directory, _Directory())
+            if info.isdir():
+                parent.setdefault(name, _Directory())
+            elif info.isfile():
+                parent[name] = _TarMember(tar, info)
+        self._index_entries += len(tar.getmembers())
+        return tree
+
+    def _extract(self, node):
+        """
+        Extract the compressed archive at node and index the extracted files
+        """
+        destination = self.tmpdir / "extracted" / str(next(self._extractions))
+        destination.mkdir(parents=True)
+        # Large reads, each one is a single range request when reading remotely
+        with io.BufferedReader(self._open_member(node), buffer_size=FETCH_CHUNK_SIZE) as compressed:
+            with tarfile.open(fileobj=compressed, mode="r|*") as tar:
+                tar.extractall(destination, **EXTRACT_KWARGS)
+
+        tree = _Directory(destination)
+        directories = {destination: tree}
+        for directory, dirnames, filenames in os.walk(destination):
+            parent = directories[Path(directory)]
+            for dirname in dirnames:
+                directories[Path(directory, dirname)] = parent[dirname] = _Directory(Path(directory, dirname))
+            for filename in filenames:
+                parent[filename] = Path(directory, filename)
+                self._disk_bytes += parent[filename].stat().st_size
+            self._index_entries += len(dirnames) + len(filenames)
+        return tree
+
+    @staticmethod
+    def _open_member(node):
+        if isinstance(node, Path):
+            return open(node, "rb")
+        return node.tar.extractfile(node.info)
+
+    @classmethod
+    def _read(cls, node, mode):
+        with cls._open_member(node) as member:
+            content = member.read()
+        if "b" in mode:
+            return content
+
+        try:
+            return content.decode()
+        except UnicodeDecodeError as e:
+            raise RuntimeError(
+                """Looks like you're trying to get a non utf-8 encoded file, try using the mode="rb" kwarg for the get method"""
+            ) from e
+
+    def _local_directory(self, node, member_path):
+        if node.local_path is None:
+            node.local_path = self.tmpdir / "members" / member_path
+            self._extract_directory(node, node.local_path)
+        return node.local_path
+
+    def _extract_directory(self, node, destination):
+        destination.mkdir(parents=True, exist_ok=True)
+        for name, child in node.items():
+            if isinstance(child, _Directory):
+                self._extract_directory(child, destination / name)
+                continue
+
+            with self._open_member(child) as src, open(destination / name, "wb") as dst:
+                shutil.copyfileobj(src, dst, FETCH_CHUNK_SIZE)
+                self._disk_bytes += dst.tell()
+
+
+class LocalNestedArchive(NestedArchive):
+    def __init__(self, root_tar_file_path, tmpdir=None):
+        super().__init__(tmpdir)
+        self.root_tar_file_path = Path(root_tar_file_path)
+        if self.root_tar_file_path.is_relative_to(self.tmpdir):
+            self._disk_bytes += self.root_tar_file_path.stat().st_size
+
+    def _open_root_tar(self):
+        return tarfile.open(self.root_tar_file_path, mode="r:")
+
+
+class RangeRemoteArchive(NestedArchive):
+    def __init__(self, root_archive_url, session=None, limiter=None):
+        super().__init__()
+        self.root_archive_url = root_archive_url
+        self._session = session or requests
+        self._limiter = limiter or contextlib.nullcontext()
+        self._root_tar = None
+        self._downloaded = False
+
+        try:
+            self._open()
+        except Exception:
+            self.close()
+            raise
+
+    @property
+    def root_tar_file_path(self):
+        return self.tmpdir / PurePosixPath(self.root_archive_url).name
+
+    @property
+    def supports_ranges(self):
+        return not self._downloaded
+
+    def _open_root_tar(self):
+        return self._root_tar
+
+    def _open(self):
+        with self._limiter, self._session.get(
+            self.root_archive_url, headers={"Range": f"bytes=0-{HEADER_READ_AHEAD - 1}"}, stream=True
+        ) as response:
+            response.raise_for_status()
+            content_range = CONTENT_RANGE_REGEX.match(response.headers.get("Content-Range", ""))
+            if response.status_code == 206 and content_range is not None:
+                size = int(content_range.group(3))
+            else:
+                # The server ignored the range, we're already downloading everything
+                self._download(response)
+                self._root_tar = tarfile.open(self.root_tar_file_path, mode="r:")
+                return
+
+        self.stats["requests"] += 1
+        reader = io.BufferedReader(
+            _HTTPRangeReader(self.root_archive_url, size, self._session, self.stats, self._limiter),
+            buffer_size=RANGE_READ_AHEAD,
+        )
+        self._root_tar = tarfile.open(fileobj=reader, mode="r:")
+
+    def _download(self, response):
+        with open(self.root_tar_file_path, "wb") as f:
+            for chunk in response.iter_content(chunk_size=FETCH_CHUNK_SIZE):
+                f.write(chunk)
+                self.stats["bytes_fetched"] += len(chunk)
+                self._disk_bytes += len(chunk)
+        self.stats["requests"] += 1
+        self._downloaded = True
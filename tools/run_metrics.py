@@ -0,0 +1,153 @@
+"""
+Per-signature instrumentation of add_triage_signature runs.
+
+Every (ticket, signature) pair is measured with RunMetrics.measure: wall time,
+CPU time of the measuring thread, and counters (archive bytes read, log
+server requests, Jira reads and writes) that the I/O code increments with
+RunMetrics.count while the measurement is active on the current thread.
+
+Run-wide values that aren't per signature (e.g. the usage of a cache) are
+recorded as gauges with RunMetrics.set_gauge.
+
+At the end of a run, the measurements can be written as a JSON run report
+and as a Prometheus textfile (for the node exporter textfile collector), and
+summarized as a table of the slowest signatures.
+"""
+import contextlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+
+from tabulate import tabulate
+
+COUNTERS = ("archive_bytes", "log_server_requests", "jira_reads", "jira_writes")
+PROMETHEUS_PREFIX = "triage_signature"
+
+
+class RunMetrics:
+    def __init__(self):
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        self._current = threading.local()
+        self._records = defaultdict(Counter)
+        self._gauges = {}
+
+    @contextlib.contextmanager
+    def measure(self, issue_key, signature_name):
+        """
+        Measure the block as part of the given signature's work on the given
+        ticket. Measurements can be nested, the innermost one gets the counts.
+        """
+        previous = getattr(self._current, "record", None)
+        record = Counter()
+        self._current.record = record
+        wall_start, cpu_start = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            record["wall_seconds"] += time.perf_counter() - wall_start
+            record["cpu_seconds"] += time.thread_time() - cpu_start
+            self._current.record = previous
+            with self._lock:
+                self._records[(issue_key, signature_name)].update(record)
+
+    def count(self, counter, amount=1):
+        record = getattr(self._current, "record", None)
+        if record is not None:
+            record[counter] += amount
+
+    def set_gauge(self, name, value):
+        with self._lock:
+            self._gauges[name] = value
+
+    def gauges(self):
+        with self._lock:
+            return dict(self._gauges)
+
+    def records(self):
+        with self._lock:
+            return {key: Counter(record) for key, record in self._records.items()}
+
+    def by_signature(self):
+        """
+        Totals of every signature over all the tickets it ran on
+        """
+        totals = defaultdict(Counter)
+        for (_issue_key, signature_name), record in self.records().items():
+            totals[signature_name].update(record)
+            totals[signature_name]["tickets"] += 1
+            totals[signature_name]["max_wall_seconds"] = max(
+                totals[signature_name]["max_wall_seconds"], record["wall_seconds"]
+            )
+        return totals
+
+    def report(self):
+        records = self.records()
+        return {
+            "started_at": self.started_at,
+            "duration_seconds": time.time() - self.started_at,
+            "tickets": len({issue_key for issue_key, _signature_name in records}),
+            "signatures": {name: dict(totals) for name, totals in sorted(self.by_signature().items())},
+            "gauges": dict(sorted(self.gauges().items())),
+            "runs": [
+                {"issue_key": issue_key, "signature": signature_name, **record}
+                for (issue_key, signature_name), record in sorted(records.items())
+            ],
+        }
+
+    def write_json_report(self, path):
+        _write_atomically(path, json.dumps(self.report(), indent=2, sort_keys=True))
+
+    def write_prometheus_textfile(self, path):
+        report = self.report()
+        lines = [
+            "# HELP triage_run_duration_seconds Duration of the triage run",
+            "# TYPE triage_run_duration_seconds gauge",
+            f"triage_run_duration_seconds {report['duration_seconds']:.6f}",
+            "# HELP triage_run_tickets Number of tickets processed by the triage run",
+            "# TYPE triage_run_tickets gauge",
+            f"triage_run_tickets {report['tickets']}",
+        ]
+        for gauge, value in report["gauges"].items():
+            lines.append(f"# HELP triage_{gauge} {gauge.replace('_', ' ').capitalize()} at the end of the triage run")
+            lines.append(f"# TYPE triage_{gauge} gauge")
+            lines.append(f"triage_{gauge} {value:g}")
+        for metric in ("tickets", "wall_seconds", "cpu_seconds") + COUNTERS:
+            name = f"{PROMETHEUS_PREFIX}_{metric}"
+            lines.append(f"# HELP {name} Total {metric.replace('_', ' ')} of the signature during the triage run")
+            lines.append(f"# TYPE {name} gauge")
+            for signature_name, totals in report["signatures"].items():
+                lines.append(f'{name}{{signature="{signature_name}"}} {totals.get(metric, 0):g}')
+
+        _write_atomically(path, "\n".join(lines) + "\n")
+
+    def slowest_table(self, top=10):
+        rows = [
+            {
+                "signature": signature_name,
+                "tickets": totals["tickets"],
+                "wall s": round(totals["wall_seconds"], 2),
+                "max wall s": round(totals["max_wall_seconds"], 2),
+                "cpu s": round(totals["cpu_seconds"], 2),
+                "archive MiB": round(totals["archive_bytes"] / 1024**2, 1),
+                "log server requests": totals["log_server_requests"],
+                "jira reads": totals["jira_reads"],
+                "jira writes": totals["jira_writes"],
+            }
+            for signature_name, totals in self.by_signature().items()
+        ]
+        rows.sort(key=lambda row: row["wall s"], reverse=True)
+        return tabulate(rows[:top], headers="keys")
+
+
+def _write_atomically(path, content):
+    """
+    The textfile collector may read the file at any time, never let it see a partial file
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    with tempfile.NamedTemporaryFile(mode="w", dir=directory, delete=False) as tmp:
+        tmp.write(content)
+    os.replace(tmp.name, path)
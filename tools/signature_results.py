@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Local store of what the signatures of add_triage_signature found on every
+ticket, so questions like "which tickets did a signature hit in the last N
+days" are answered without going through the Jira comments.
+
+For every ticket, the store records its cluster, email domain and creation
+time. For every (ticket, signature) pair, it records whether the signature
+matched (wrote its report), the labels it sets and a hash of its report.
+
+Example:
+
+    ./signature_results.py --db results.db hits AgentStepFailureSignature --days 7
+    ./signature_results.py --db results.db summary --days 30
+    ./signature_results.py --db results.db ticket AITRIAGE-1234
+"""
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+from datetime import datetime, timedelta, timezone
+
+import dateutil.parser
+from tabulate import tabulate
+
+
+def _timestamp(time):
+    """
+    Times are stored in UTC, in ISO format, so they compare as strings
+    """
+    return time.astimezone(timezone.utc).isoformat(timespec="seconds")
+
+
+class SignatureResultsStore:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        with self._lock, self._db:
+            self._db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS tickets (
+                    issue_key TEXT NOT NULL PRIMARY KEY,
+                    cluster_id TEXT,
+                    domain TEXT,
+                    openshift_version TEXT,
+                    created_at TEXT,
+                    updated_at TEXT NOT NULL
+                )
+                """
+            )
+            self._db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS signature_results (
+                    issue_key TEXT NOT NULL,
+                    signature TEXT NOT NULL,
+                    matched INTEGER NOT NULL,
+                    labels TEXT NOT NULL,
+                    report_sha256 TEXT,
+                    updated_at TEXT NOT NULL,
+                    PRIMARY KEY (issue_key, signature)
+                )
+                """
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS signature_results_signature ON signature_results (signature, matched)"
+            )
+            for column in ("cluster_id", "domain", "created_at"):
+                self._db.execute(f"CREATE INDEX IF NOT EXISTS tickets_{column} ON tickets ({column})")
+
+    def put_ticket(self, issue_key, cluster_id=None, domain=None, openshift_version=None, created_at=None):
+        """
+        created_at is an ISO time, e.g. the created field of the Jira issue
+        """
+        if created_at is not None:
+            created_at = _timestamp(dateutil.parser.isoparse(created_at))
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO tickets VALUES (?, ?, ?, ?, ?, ?)",
+                (issue_key, cluster_id, domain, openshift_version, created_at, _timestamp(datetime.now(timezone.utc))),
+            )
+
+    def put_result(self, issue_key, signature_name, report=None, labels=()):
+        """
+        The result of a signature that ran on a ticket, report is None when it didn't match
+        """
+        report_sha256 = hashlib.sha256(report.encode()).hexdigest() if report is not None else None
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO signature_results VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    issue_key,
+                    signature_name,
+                    report is not None,
+                    ",".join(labels),
+                    report_sha256,
+                    _timestamp(datetime.now(timezone.utc)),
+                ),
+            )
+
+    def hits(self, signature_name, days=None, domain=None, cluster_id=None, now=None):
+        """
+        The tickets the signature matched, newest first, optionally only those
+        created in the last days, of a domain or of a cluster
+        """
+        query = (
+            "SELECT t.issue_key, t.created_at, t.cluster_id, t.domain, t.openshift_version, r.labels "
+            "FROM signature_results r JOIN tickets t ON t.issue_key = r.issue_key "
+            "WHERE r.signature = ? AND r.matched"
+        )
+        parameters = [signature_name]
+        if days is not None:
+            query += " AND t.created_at >= ?"
+            parameters.append(_timestamp((now or datetime.now(timezone.utc)) - timedelta(days=days)))
+        if domain is not None:
+            query += " AND t.domain = ?"
+            parameters.append(domain)
+        if cluster_id is not None:
+            query += " AND t.cluster_id = ?"
+            parameters.append(cluster_id)
+        query += " ORDER BY t.created_at DESC, t.issue_key"
+        with self._lock:
+            return [dict(row) for row in self._db.execute(query, parameters)]
+
+    def summary(self, days=None, now=None):
+        """
+        The number of tickets every signature ran on and matched, optionally only of the tickets created in the last days
+        """
+        if days is None:
+            query = "SELECT signature, SUM(matched) AS matched, COUNT(*) AS ran FROM signature_results"
+            parameters = []
+        else:
+            # CROSS JOIN makes SQLite go through the tickets first, by the index of their creation time
+            query = (
+                "SELECT r.signature, SUM(r.matched) AS matched, COUNT(*) AS ran "
+                "FROM tickets t CROSS JOIN signature_results r ON r.issue_key = t.issue_key WHERE t.created_at >= ?"
+            )
+            parameters = [_timestamp((now or datetime.now(timezone.utc)) - timedelta(days=days))]
+        query += " GROUP BY signature ORDER BY matched DESC, signature"
+        with self._lock:
+            return [dict(row) for row in self._db.execute(query, parameters)]
+
+    def ticket_results(self, issue_key):
+        """
+        The results of every signature that ran on the ticket
+        """
+        with self._lock:
+            return [
+                dict(row)
+                for row in self._db.execute(
+                    "SELECT signature, matched, labels, report_sha256, updated_at FROM signature_results "
+                    "WHERE issue_key = ? ORDER BY signature",
+                    (issue_key,),
+                )
+            ]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Query the results of the triage signatures, without Jira")
+    parser.add_argument(
+        "--db",
+        default=os.environ.get("TRIAGE_RESULTS_DB"),
+        required="TRIAGE_RESULTS_DB" not in os.environ,
+        help="SQLite file add_triage_signature --results-db wrote the results to",
+    )
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    hits_parser = subparsers.add_parser("hits", help="The tickets a signature matched")
+    hits_parser.add_argument("signature", help="Name of the signature, e.g. AgentStepFailureSignature")
+    hits_parser.add_argument("--days", type=int, help="Only the tickets created in the last days")
+    hits_parser.add_argument("--domain", help="Only the tickets of this email domain")
+    hits_parser.add_argument("--cluster-id", help="Only the tickets of this cluster")
+
+    summary_parser = subparsers.add_parser("summary", help="The number of tickets every signature matched")
+    summary_parser.add_argument("--days", type=int, help="Only the tickets created in the last days")
+
+    ticket_parser = subparsers.add_parser("ticket", help="The results of every signature on a ticket")
+    ticket_parser.add_argument("issue_key", help="e.g. AITRIAGE-1234")
+
+    return parser.parse_args(argv)
+
+
+def main(args):
+    store = SignatureResultsStore(args.db)
+    try:
+        if args.command == "hits":
+            rows = store.hits(args.signature, days=args.days, domain=args.domain, cluster_id=args.cluster_id)
+        elif args.command == "summary":
+            rows = store.summary(days=args.days)
+        else:
+            rows = store.ticket_results(args.issue_key)
+    finally:
+        store.close()
+
+    if args.json:
+        json.dump(rows, sys.stdout, indent=2)
+        print()
+    else:
+        print(tabulate(rows, headers="keys"))
+
+
+if __name__ == "__main__":
+    main(parse_args())
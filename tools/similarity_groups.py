@@ -0,0 +1,257 @@
+"""
+Grouping of similar strings, as fuzzywuzzy's fuzz.ratio sees them, that
+scales to large numbers of strings (e.g. the status_info of every host of the
+fleet).
+
+The grouping is the same as comparing every string to every member of every
+group: strings are taken in order, and join the first group whose members
+they're all similar to (fuzz.ratio above the ratio), or start a new group.
+The work is cut down by:
+
+- Identical strings, which join the group of their first occurrence without
+  any comparison.
+- Blocking: a group can only accept strings similar to its first member.
+  Groups are indexed by the length of their first member, and only those
+  within the distance the ratio allows of the string's length are
+  considered, then only the ones whose first member's character histogram
+  is close enough to the string's (see character_histogram). Both are lower
+  bounds of the distance, so no group that would accept the string is
+  skipped.
+- Distance bounds: fuzz.ratio is derived from the indel distance between the
+  strings, which is a metric. Every distinct member of a group is kept with
+  the closest of a few members of the group, its pivots, and its distance to
+  it. Strings are compared to the pivots, then the triangle inequality
+  decides most members without comparing them. Members are kept by length in
+  order of distance to their pivot, so the ones it vouches for aren't even
+  visited.
+
+The remaining comparisons use Levenshtein.ratio, which fuzz.ratio is based on,
+directly.
+"""
+import bisect
+from collections import Counter, defaultdict
+from operator import sub
+
+import Levenshtein
+
+HISTOGRAM_BUCKETS = 64
+MAX_PIVOTS = 16
+
+
+def is_similar(distance, length_sum, ratio):
+    """
+    Whether fuzz.ratio of two strings is above ratio, given their indel
+    distance and the sum of their lengths. Increasing with length_sum and
+    decreasing with distance.
+    """
+    return int(round(100 * ((length_sum - distance) / length_sum))) > ratio
+
+
+def indel_distance(a, b):
+    """
+    The number of insertions and deletions turning a into b, which Levenshtein.ratio is based on
+    """
+    length_sum = len(a) + len(b)
+    return length_sum - round(Levenshtein.ratio(a, b) * length_sum)
+
+
+class MaxDistances(dict):
+    """
+    The largest distance at which strings whose lengths add up to a given sum
+    are similar, by that sum, -1 when they never are
+    """
+
+    def __init__(self, ratio):
+        super().__init__()
+        self.ratio = ratio
+
+    def __missing__(self, length_sum):
+        distance = min(max(int(length_sum * (1 - self.ratio / 100)), 0), length_sum)
+        while distance < length_sum and is_similar(distance + 1, length_sum, self.ratio):
+            distance += 1
+        while distance >= 0 and not is_similar(distance, length_sum, self.ratio):
+            distance -= 1
+        self[length_sum] = distance
+        return distance
+
+
+def character_histogram(item):
+    """
+    The counts of the characters of item, folded into HISTOGRAM_BUCKETS buckets.
+    As every insertion or deletion changes a single count by one, the L1
+    distance between the histograms of strings is at most their distance.
+    """
+    histogram = [0] * HISTOGRAM_BUCKETS
+    for character, count in Counter(item).items():
+        histogram[ord(character) % HISTOGRAM_BUCKETS] += count
+    return histogram
+
+
+class _Pivot:
+    __slots__ = ("item", "distance_to_first", "by_length")
+
+    def __init__(self, item, distance_to_first):
+        self.item = item
+        # Distance to the first pivot of the group
+        self.distance_to_first = distance_to_first
+        # The members closest to the pivot by length, as (distance to the pivot, member) in increasing distance
+        self.by_length = {len(item): [(0, item)]}
+
+    def add(self, item, distance):
+        bisect.insort(self.by_length.setdefault(len(item), []), (distance, item))
+
+
+class _Group:
+    __slots__ = ("items", "histogram", "pivots")
+
+    def __init__(self, item, histogram):
+        # Every item of the group, in order, with duplicates
+        self.items = [item]
+        # Of the first member
+        self.histogram = histogram
+        # The first one is the first member of the group
+        self.pivots = [_Pivot(item, 0)]
+
+    def add(self, item, distances, max_distances):
+        """
+        distances are those of item to the pivots, None for the ones that weren't computed
+        """
+        self.items.append(item)
+        distance, pivot = min(
+            ((distance, pivot) for distance, pivot in zip(distances, self.pivots) if distance is not None),
+            key=lambda distance_pivot: distance_pivot[0],
+        )
+        if len(self.pivots) < MAX_PIVOTS and 2 * distance > max_distances[len(item) + len(pivot.item)]:
+            # Too far from the pivots for the triangle inequality to vouch for its neighbors
+            self.pivots.append(_Pivot(item, distances[0]))
+        else:
+            pivot.add(item, distance)
+
+
+class SimilarityGroups:
+    """
+    Groups strings added in order, see the module docstring. The numbers of
+    groups that got past the blocking and of string comparisons are counted
+    in stats.
+    """
+
+    def __init__(self, ratio):
+        self.ratio = ratio
+        self.stats = {"candidates": 0, "comparisons": 0}
+        self._max_distances = MaxDistances(ratio)
+        self._groups = []
+        self._group_of = {}
+        # Indexes of the groups by the length of their first member
+        self._groups_by_length = defaultdict(list)
+
+    @property
+    def groups(self):
+        return [group.items for group in self._groups]
+
+    def extend(self, items):
+        for item in items:
+            self.add(item)
+
+    def add(self, item):
+        """
+        Add item to its group, returns the index of the group
+        """
+        index = self._group_of.get(item)
+        if index is not None:
+            # Joined the first group that accepts it before, that's still the case
+            self._groups[index].items.append(item)
+            return index
+
+        length = len(item)
+        histogram = character_histogram(item)
+        candidates = sorted(
+            index
+            for first_length, indexes in self._groups_by_length.items()
+            if abs(length - first_length) <= self._max_distances[length + first_length]
+            for index in indexes
+        )
+        for index in candidates:
+            group = self._groups[index]
+            if sum(map(abs, map(sub, histogram, group.histogram))) > self._max_distances[length + len(group.items[0])]:
+                continue
+            self.stats["candidates"] += 1
+            distances = self._distances_to_group(item, group)
+            if distances is not None:
+                group.add(item, distances, self._max_distances)
+                break
+        else:
+            index = len(self._groups)
+            self._groups.append(_Group(item, histogram))
+            self._groups_by_length[length].append(index)
+
+        self._group_of[item] = index
+        return index
+
+    def _distance(self, item, other):
+        """
+        The distance between the strings if they're similar, else None
+        """
+        self.stats["comparisons"] += 1
+        distance = indel_distance(item, other)
+        return distance if distance <= self._max_distances[len(item) + len(other)] else None
+
+    def _distances_to_group(self, item, group):
+        """
+        The distances of item to the pivots of group if it's similar to all its
+        members, else None. Distances to pivots that weren't needed are None.
+        """
+        max_distances = self._max_distances
+        length = len(item)
+        first, *others = group.pivots
+        if abs(length - len(first.item)) > max_distances[length + len(first.item)]:
+            return None
+        first_distance = self._distance(item, first.item)
+        if first_distance is None or not self._similar_to_members(item, first, first_distance):
+            return None
+
+        distances = [first_distance]
+        for pivot in others:
+            # Bounds of the distance to the pivot, through the first pivot
+            if abs(first_distance - pivot.distance_to_first) > max_distances[length + len(pivot.item)]:
+                return None
+            upper_bound = first_distance + pivot.distance_to_first
+            if all(
+                upper_bound + members[-1][0] <= max_distances[length + member_length]
+                for member_length, members in pivot.by_length.items()
+            ):
+                # The pivot and all its members are similar
+                distances.append(None)
+                continue
+
+            distance = self._distance(item, pivot.item)
+            if distance is None or not self._similar_to_members(item, pivot, distance):
+                return None
+            distances.append(distance)
+
+        return distances
+
+    def _similar_to_members(self, item, pivot, distance):
+        """
+        Whether item, at distance from pivot, is similar to all the members of pivot
+        """
+        length = len(item)
+        for member_length, members in pivot.by_length.items():
+            max_distance = self._max_distances[length + member_length]
+            # From the farthest from the pivot, until the triangle inequality vouches for the rest
+            for member_distance, member in reversed(members):
+                if distance + member_distance <= max_distance:
+                    break
+                if max(abs(distance - member_distance), abs(length - member_length)) > max_distance:
+                    return False
+                if self._distance(item, member) is None:
+                    return False
+        return True
+
+
+def group_similar_strings(items, ratio):
+    """
+    The groups of similar strings of items, as lists of strings, see SimilarityGroups
+    """
+    groups = SimilarityGroups(ratio)
+    groups.extend(items)
+    return groups.groups
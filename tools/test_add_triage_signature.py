@@ -1,4 +1,25 @@
-from add_triage_signature import ALL_SIGNATURES
+import fnmatch
+import io
+import time
+from collections import Counter, defaultdict
+from types import SimpleNamespace
+
+import jira
+import pytest
+
+import add_triage_signature
+import archive_cache
+import log_templates
+import signature_results
+from add_triage_signature import ALL_SIGNATURES, process_issues
+
+
+@pytest.fixture(autouse=True)
+def fresh_archive_cache(monkeypatch):
+    """
+    Tests use the same logs URLs, don't let them share archives
+    """
+    monkeypatch.setattr(add_triage_signature, "ARCHIVE_CACHE", archive_cache.ArchiveCache())
 
 
 def test_create_instances():
@@ -8,3 +29,550 @@ def test_create_instances():
     for signature in ALL_SIGNATURES:
         jira_client = None
         _ = signature(jira_client, "AITRIAGE-999999")
+
+
+def test_process_issues_workers_keep_ticket_output_together(monkeypatch):
+    """
+    Dry run output of concurrently processed tickets must not interleave
+    """
+
+    def fake_analyze(ticket_run):
+        for line in range(3):
+            ticket_run.dry_run_file.write(f"{ticket_run.issue_key} line {line}\n")
+            time.sleep(0.001)
+
+    monkeypatch.setattr(add_triage_signature, "get_logs_url_from_issue", lambda issue: "http://logs/files/x/")
+    monkeypatch.setattr(add_triage_signature.TicketRun, "analyze", fake_analyze)
+
+    issues = [SimpleNamespace(key=f"AITRIAGE-{i}") for i in range(20)]
+    dry_run_file = io.StringIO()
+    process_issues(None, issues, False, None, dry_run_file, workers=8)
+
+    lines = dry_run_file.getvalue().splitlines()
+    assert len(lines) == 60
+    for start in range(0, len(lines), 3):
+        keys = {line.split()[0] for line in lines[start : start + 3]}
+        assert len(keys) == 1
+
+
+class FakeJiraClient:
+    def __init__(self, labels=()):
+        self.calls = Counter()
+        self.labels = list(labels)
+        self._session = SimpleNamespace(put=lambda url, data: self.calls.update(["put"]))
+
+    def issue(self, key, fields=None):
+        self.calls["issue"] += 1
+        comment = SimpleNamespace(comments=[], total=0)
+        function_impact = add_triage_signature.custom_field_name(add_triage_signature.CUSTOM_FIELD_FUNCTION_IMPACT)
+        fields = SimpleNamespace(labels=self.labels, comment=comment, **{function_impact: None})
+        return SimpleNamespace(self=f"http://jira/issue/{key}", fields=fields, raw={"fields": {}})
+
+    def comments(self, key):
+        self.calls["comments"] += 1
+        return []
+
+    def add_comment(self, key, body):
+        self.calls["add_comment"] += 1
+        return SimpleNamespace(self=f"http://jira/issue/{key}/comment/1", body=body, raw={"body": body})
+
+
+def test_ticket_inputs_are_loaded_once(monkeypatch):
+    """
+    All signatures of a ticket share one TicketContext, so each input is fetched at most once
+    """
+    fetched = []
+
+    def fake_get_metadata_json(url):
+        fetched.append("metadata")
+        return {
+            "release_tag": "v1.0.0",
+            "cluster": {"id": "cluster-id", "tags": "ui_ocm", "hosts": [{"id": "h1", "skip_formatting_disks": "sda"}]},
+        }
+
+    def fake_get_installconfig_yaml(url):
+        fetched.append("install_config")
+        raise add_triage_signature.FailedToGetInstallConfigException
+
+    monkeypatch.setattr(add_triage_signature, "get_metadata_json", fake_get_metadata_json)
+    monkeypatch.setattr(add_triage_signature, "get_installconfig_yaml", fake_get_installconfig_yaml)
+
+    dry_run_file = io.StringIO()
+    add_triage_signature.process_ticket_with_signatures(
+        FakeJiraClient(),
+        "http://logs/files/x/",
+        "AITRIAGE-1",
+        only_specific_signatures=[
+            "ComponentsVersionSignature",
+            "TagAnalysis",
+            "SkipDisks",
+            "NonstandardNetworkType",
+            "HostsStatusSignature",
+        ],
+        dry_run_file=dry_run_file,
+    )
+
+    assert fetched == ["metadata", "install_config"]
+    assert "Release tag: v1.0.0" in dry_run_file.getvalue()
+    assert "ui_ocm" in dry_run_file.getvalue()
+
+
+class FakeLogsTar:
+    def __init__(self, files, tmpdir="/nonexistent"):
+        self.files = files
+        self.reads = Counter()
+        self.tmpdir = tmpdir
+
+    def get(self, path, mode="r"):
+        for name, content in self.files.items():
+            if fnmatch.fnmatch(name, path):
+                self.reads[name] += 1
+                return content
+        raise FileNotFoundError(path)
+
+    def glob(self, pattern):
+        depth = len(pattern.split("/"))
+        prefixes = dict.fromkeys("/".join(name.split("/")[:depth]) for name in self.files if name.count("/") >= depth)
+        return [prefix for prefix in prefixes if fnmatch.fnmatch(prefix, pattern)]
+
+    def root_dir(self, path):
+        return next(name[len(path) + 1 :].split("/")[0] for name in self.files if name.startswith(f"{path}/"))
+
+
+def test_host_log_files_are_scanned_once(monkeypatch):
+    """
+    Signatures scanning the same host log file share a single read of it
+    """
+    agent_logs = (
+        'time="2023-01-01T00:00:00Z" level=error msg="api.openshift.com/api/assisted-install/v2 Service Unavailable" file=x.go\n'
+        'time="2023-01-01T00:00:01Z" level=info msg="all good" file=x.go\n'
+    )
+    logs_tar = FakeLogsTar(
+        {
+            "host.tar/host.tar.gz/logs_host_h1/agent.logs": agent_logs,
+            "host.tar/host.tar.gz/logs_host_h1/installer.logs": (
+                'time="2023-01-01T00:00:00Z" level=error msg="failed to prepare install device: oops"\n'
+            ),
+            "host2.tar/host2.tar.gz/logs_host_h2/agent.logs": "",
+        }
+    )
+    timed_out = add_triage_signature.FailedRequestTriggersHostTimeout.HOST_TIMED_OUT_STATUS_INFO
+    metadata = {
+        "cluster": {
+            "id": "cluster-id",
+            "hosts": [
+                {"id": "h1", "requested_hostname": "host-1", "status_info": timed_out},
+                {"id": "h2", "requested_hostname": "host-2", "status_info": ""},
+            ],
+        }
+    }
+    monkeypatch.setattr(add_triage_signature, "get_metadata_json", lambda url: metadata)
+    monkeypatch.setattr(add_triage_signature, "get_triage_logs_tar", lambda triage_url, cluster_id: logs_tar)
+
+    dry_run_file = io.StringIO()
+    add_triage_signature.process_ticket_with_signatures(
+        FakeJiraClient(),
+        "http://logs/files/x/",
+        "AITRIAGE-1",
+        only_specific_signatures=[
+            "AgentStepFailureSignature",
+            "FailedRequestTriggersHostTimeout",
+            "ErrorOnCleanupInstallDevice",
+        ],
+        dry_run_file=dry_run_file,
+    )
+
+    assert logs_tar.reads == {
+        "host.tar/host.tar.gz/logs_host_h1/agent.logs": 1,
+        "host.tar/host.tar.gz/logs_host_h1/installer.logs": 1,
+        "host2.tar/host2.tar.gz/logs_host_h2/agent.logs": 1,
+    }
+    assert "Host h1 has request failures and timed out" in dry_run_file.getvalue()
+    assert "failed to prepare install device: oops" in dry_run_file.getvalue()
+
+
+def test_rare_log_templates_are_reported(monkeypatch, tmp_path):
+    """
+    Warnings and errors whose templates other tickets don't have are reported, the common ones aren't
+    """
+    common = 'time="2023-01-01T00:00:00Z" level=error msg="Failed to connect to host master-{n} after {n} attempts"\n'
+    store = log_templates.LogTemplateStore(tmp_path / "templates.db")
+    for ticket in range(2):
+        store.observe(
+            f"AITRIAGE-{ticket + 10}",
+            "agent.logs",
+            [(["error"] + log_templates.tokenize("Failed to connect to host master-0 after 3 attempts"), 1)],
+        )
+    monkeypatch.setattr(add_triage_signature, "LOG_TEMPLATES", store)
+    monkeypatch.setattr(add_triage_signature.RareLogTemplates, "MIN_HISTORY_TICKETS", 2)
+    monkeypatch.setattr(add_triage_signature.RareLogTemplates, "MAX_RARE_TICKETS", 1)
+
+    logs_tar = FakeLogsTar(
+        {
+            "host.tar/host.tar.gz/logs_host_h1/agent.logs": (
+                common.format(n=1)
+                + common.format(n=2)
+                + 'time="2023-01-01T00:00:01Z" level=error msg="Disk /dev/sdb went read-only"\n'
+                + 'time="2023-01-01T00:00:02Z" level=info msg="Nothing to see here"\n'
+            ),
+        }
+    )
+    metadata = {"cluster": {"id": "cluster-id", "hosts": [{"id": "h1", "requested_hostname": "host-1"}]}}
+    monkeypatch.setattr(add_triage_signature, "get_metadata_json", lambda url: metadata)
+    monkeypatch.setattr(add_triage_signature, "get_triage_logs_tar", lambda triage_url, cluster_id: logs_tar)
+
+    dry_run_file = io.StringIO()
+    add_triage_signature.process_ticket_with_signatures(
+        FakeJiraClient(),
+        "http://logs/files/x/",
+        "AITRIAGE-1",
+        only_specific_signatures=["RareLogTemplates"],
+        dry_run_file=dry_run_file,
+    )
+
+    report = dry_run_file.getvalue()
+    assert "Disk /dev/sdb went read-only" in report
+    assert "never seen" in report
+    assert "Failed to connect" not in report
+    assert "Nothing to see here" not in report
+
+
+class RecordingJiraClient(FakeJiraClient):
+    def __init__(self):
+        super().__init__()
+        self.added_comments = []
+
+    def add_comment(self, key, body):
+        self.added_comments.append(key)
+        return super().add_comment(key, body)
+
+
+def test_unchanged_signatures_are_skipped(monkeypatch, tmp_path):
+    """
+    Signatures only run again on a ticket once the inputs they used changed, unless forced to
+    """
+    metadata = {"release_tag": "v1.0.0", "cluster": {"id": "cluster-id", "hosts": []}}
+    validators = {"metadata.json": '"v1"'}
+    monkeypatch.setattr(add_triage_signature, "get_metadata_json", lambda url: metadata)
+    monkeypatch.setattr(
+        add_triage_signature, "get_log_server_file_validator", lambda url: validators.get(url.split("/")[-1])
+    )
+    monkeypatch.setattr(add_triage_signature, "ALL_SIGNATURES", [add_triage_signature.ComponentsVersionSignature])
+    add_triage_signature.configure_state_store(tmp_path / "state.db")
+
+    jira_client = RecordingJiraClient()
+
+    def run(should_reevaluate=False):
+        add_triage_signature.process_ticket_with_signatures(
+            jira_client,
+            "http://logs/files/x/",
+            "AITRIAGE-1",
+            only_specific_signatures=None,
+            dry_run_file=None,
+            should_reevaluate=should_reevaluate,
+        )
+
+    try:
+        run()
+        run()
+        assert jira_client.added_comments == ["AITRIAGE-1"]
+
+        validators["metadata.json"] = '"v2"'
+        run()
+        assert len(jira_client.added_comments) == 2
+
+        run(should_reevaluate=True)
+        assert len(jira_client.added_comments) == 3
+    finally:
+        add_triage_signature.configure_state_store(None)
+
+
+def test_signature_results_are_recorded(monkeypatch, tmp_path):
+    """
+    The results of the signatures that ran are recorded once their Jira writes are done, dry runs aren't
+    """
+    metadata = {
+        "release_tag": "v1.0.0",
+        "cluster": {"id": "cluster-id", "email_domain": "example.com", "tags": "", "hosts": []},
+    }
+    monkeypatch.setattr(add_triage_signature, "get_metadata_json", lambda url: metadata)
+    monkeypatch.setattr(add_triage_signature, "RESULTS_STORE", signature_results.SignatureResultsStore(":memory:"))
+
+    def run(issue_key, dry_run_file=None):
+        add_triage_signature.process_ticket_with_signatures(
+            FakeJiraClient(),
+            "http://logs/files/x/",
+            issue_key,
+            only_specific_signatures=["ComponentsVersionSignature", "TagAnalysis"],
+            dry_run_file=dry_run_file,
+        )
+
+    run("AITRIAGE-1")
+    run("AITRIAGE-2", dry_run_file=io.StringIO())
+
+    store = add_triage_signature.RESULTS_STORE
+    (hit,) = store.hits("ComponentsVersionSignature", domain="example.com")
+    assert (hit["issue_key"], hit["cluster_id"]) == ("AITRIAGE-1", "cluster-id")
+    results = {result["signature"]: result for result in store.ticket_results("AITRIAGE-1")}
+    assert results["ComponentsVersionSignature"]["matched"] == 1
+    assert results["TagAnalysis"]["matched"] == 0
+    assert store.ticket_results("AITRIAGE-2") == []
+
+
+def test_jira_ticket_is_fetched_once(monkeypatch):
+    """
+    All signatures of a ticket read the same Jira snapshot, which is updated locally after writes
+    """
+    metadata = {
+        "release_tag": "v1.0.0",
+        "cluster": {"id": "cluster-id", "tags": "ui_ocm", "hosts": [{"id": "h1", "skip_formatting_disks": "sda"}]},
+    }
+    monkeypatch.setattr(add_triage_signature, "get_metadata_json", lambda url: metadata)
+    monkeypatch.setattr(
+        add_triage_signature, "get_installconfig_yaml", add_triage_signature.FailedToGetInstallConfigException
+    )
+
+    jira_client = FakeJiraClient(labels=["existing"])
+    signature_names = ["ComponentsVersionSignature", "TagAnalysis", "SkipDisks"]
+    add_triage_signature.process_ticket_with_signatures(
+        jira_client,
+        "http://logs/files/x/",
+        "AITRIAGE-1",
+        only_specific_signatures=signature_names,
+        dry_run_file=None,
+    )
+
+    assert jira_client.calls["issue"] == 1
+    assert jira_client.calls["comments"] == 0
+    assert jira_client.calls["add_comment"] == len(signature_names)
+    assert {signature_name for _issue_key, signature_name in add_triage_signature.RUN_METRICS.records()} >= set(
+        signature_names
+    )
+    assert jira_client.calls["put"] == 1
+
+
+def test_process_issues_pipeline_defers_jira_writes(monkeypatch):
+    """
+    The pipeline prefetches the tickets inputs, and only sends the Jira writes once a ticket was analyzed
+    """
+    prefetched = []
+
+    def fake_get_metadata_json(url):
+        prefetched.append(url)
+        return {"release_tag": "v1.0.0", "cluster": {"id": "cluster-id", "hosts": []}}
+
+    monkeypatch.setattr(add_triage_signature, "get_logs_url_from_issue", lambda issue: f"http://logs/files/{issue.key}")
+    monkeypatch.setattr(add_triage_signature, "get_metadata_json", fake_get_metadata_json)
+    for name in ("get_installconfig_yaml", "_get_cluster_events"):
+        monkeypatch.setattr(add_triage_signature, name, lambda *args, **kwargs: {})
+    monkeypatch.setattr(add_triage_signature, "get_triage_logs_tar", lambda triage_url, cluster_id: FakeLogsTar({}))
+
+    jira_client = FakeJiraClient()
+    comments_at_analysis = []
+
+    class CheckingSignature(add_triage_signature.ComponentsVersionSignature):
+        def _process_ticket(self, url, issue_key):
+            super()._process_ticket(url, issue_key)
+            comments_at_analysis.append(jira_client.calls["add_comment"])
+
+    monkeypatch.setattr(add_triage_signature, "ALL_SIGNATURES", [CheckingSignature])
+
+    issues = [SimpleNamespace(key=f"AITRIAGE-{i}") for i in range(10)]
+    process_issues(jira_client, issues, False, None, None, workers=1, prefetch=2)
+
+    assert sorted(prefetched) == sorted(f"http://logs/files/{issue.key}" for issue in issues)
+    assert jira_client.calls["add_comment"] == len(issues)
+    assert jira_client.calls["issue"] == len(issues)
+    # With a single analysis worker, the first ticket is analyzed before anything was written
+    assert comments_at_analysis[0] == 0
+
+
+def test_failed_jira_write_only_drops_its_signature_writes():
+    jira_client = FakeJiraClient()
+    written = []
+
+    def failing_add_comment(key, body):
+        if "first" in body:
+            raise RuntimeError("Jira is down")
+        written.append(body)
+
+    jira_client.add_comment = failing_add_comment
+    snapshot = add_triage_signature.JiraTicketSnapshot(jira_client, "AITRIAGE-1", defer_writes=True)
+    with snapshot.writes_by("FirstSignature"):
+        snapshot.add_comment("first")
+        snapshot.after_writes(lambda: written.append("first recorded"))
+    with snapshot.writes_by("SecondSignature"):
+        snapshot.add_comment("second")
+        snapshot.after_writes(lambda: written.append("second recorded"))
+
+    snapshot.flush()
+    assert written == ["second", "second recorded"]
+
+
+class ClusterTicketsJiraClient(FakeJiraClient):
+    def __init__(self, cluster_ids, issuelinks):
+        super().__init__()
+        self.cluster_ids = cluster_ids
+        self.issuelinks = issuelinks
+        self.searches = []
+        self.created_links = []
+
+    def issue(self, key, fields=None):
+        issue = super().issue(key, fields)
+        issue.fields.issuelinks = self.issuelinks.get(key, [])
+        return issue
+
+    def search_issues(self, query, startAt=0, maxResults=50, fields=None):
+        self.searches.append((query, startAt, fields))
+        field = add_triage_signature.custom_field_name(add_triage_signature.CUSTOM_FIELD_CLUSTER_ID)
+        issues = [
+            SimpleNamespace(key=key, raw={"fields": {field: cluster_id}})
+            for key, cluster_id in sorted(self.cluster_ids.items())
+            if f'"{cluster_id}"' in query
+        ]
+        return jira.client.ResultList(issues[startAt : startAt + maxResults], startAt, maxResults, len(issues))
+
+    def create_issue_link(self, link_type, issue_key, other_issue_key):
+        self.created_links.append((issue_key, other_issue_key))
+
+
+def test_cluster_tickets_are_resolved_in_bulk_and_only_missing_links_are_created(monkeypatch):
+    monkeypatch.setattr(add_triage_signature, "CLUSTER_TICKETS", add_triage_signature.ClusterTickets())
+    monkeypatch.setattr(add_triage_signature.ClusterTickets, "PAGE_SIZE", 2)
+    monkeypatch.setattr(add_triage_signature, "get_logs_url_from_issue", lambda issue: f"http://logs/files/{issue.key}")
+    monkeypatch.setattr(
+        add_triage_signature,
+        "get_metadata_json",
+        lambda url: {"cluster": {"id": jira_client.cluster_ids[url.split("/")[-1]], "hosts": []}},
+    )
+
+    related = SimpleNamespace(name="Related", inward="is related to", outward="relates to")
+    jira_client = ClusterTicketsJiraClient(
+        cluster_ids={"AITRIAGE-0": "c1", "AITRIAGE-1": "c1", "AITRIAGE-2": "c1", "AITRIAGE-3": "c2"},
+        issuelinks={"AITRIAGE-1": [SimpleNamespace(type=related, outwardIssue=SimpleNamespace(key="AITRIAGE-0"))]},
+    )
+    field = add_triage_signature.custom_field_name(add_triage_signature.CUSTOM_FIELD_CLUSTER_ID)
+    description = add_triage_signature.JIRA_DESCRIPTION.format_map(defaultdict(str, cluster_id="c2"))
+    issues = [
+        SimpleNamespace(key="AITRIAGE-1", raw={"fields": {field: "c1"}}),
+        SimpleNamespace(key="AITRIAGE-2", raw={"fields": {field: None}}),
+        SimpleNamespace(key="AITRIAGE-3", raw={"fields": {field: None, "description": description}}),
+    ]
+    process_issues(jira_client, issues, False, ["AllInstallationAttemptsSignature"], None)
+
+    # Both clusters are resolved by a single paginated query
+    assert [start_at for _query, start_at, _fields in jira_client.searches] == [0, 2]
+    assert all(fields == [field] for _query, _start_at, fields in jira_client.searches)
+    assert jira_client.created_links == [("AITRIAGE-1", "AITRIAGE-2"), ("AITRIAGE-2", "AITRIAGE-0")]
+
+
+def test_process_issues_pipeline_stops_when_writer_fails(monkeypatch):
+    """
+    If the writer stage fails, the other stages must not stay blocked on the queues
+    """
+    monkeypatch.setattr(add_triage_signature, "get_logs_url_from_issue", lambda issue: f"http://logs/files/{issue.key}")
+    monkeypatch.setattr(add_triage_signature.TicketRun, "analyze", lambda ticket_run: None)
+
+    class FailingProgressBar:
+        def update(self):
+            raise RuntimeError("writer failed")
+
+    pipeline = add_triage_signature._IssuesPipeline(
+        FakeJiraClient(),
+        should_reevaluate=False,
+        only_specific_signatures=None,
+        dry_run_file=None,
+        workers=2,
+        prefetch=2,
+    )
+    issues = [SimpleNamespace(key=f"AITRIAGE-{i}") for i in range(20)]
+    with pytest.raises(RuntimeError):
+        pipeline.run(issues, FailingProgressBar())
+
+
+def test_signature_version_covers_base_classes_and_helpers(monkeypatch):
+    signature_class = add_triage_signature.ControllerWarnings
+    add_triage_signature.signature_version.cache_clear()
+    original_version = add_triage_signature.signature_version(signature_class)
+    assert original_version is not None
+
+    original_sources = add_triage_signature._top_level_sources(add_triage_signature.__name__)
+    for changed in ("Signature", "warnings_from_controller_logs"):
+        sources = dict(original_sources, **{changed: original_sources[changed] + "# changed\n"})
+        monkeypatch.setattr(add_triage_signature, "_top_level_sources", lambda module_name: sources)
+        add_triage_signature.signature_version.cache_clear()
+        assert add_triage_signature.signature_version(signature_class) != original_version
+
+    add_triage_signature.signature_version.cache_clear()
+
+
+def test_input_digest_without_validators_does_not_download(monkeypatch):
+    monkeypatch.setattr(add_triage_signature, "get_log_server_file_validator", lambda url: None)
+    monkeypatch.setattr(add_triage_signature, "get_log_server_file", pytest.fail)
+    context = add_triage_signature.TicketContext("http://logs/files/x")
+    assert context.input_digest("metadata") is None
+    assert context.fingerprint("version", ["metadata"]) is None
+
+
+def test_signatures_missing_inputs_are_not_run(monkeypatch):
+    """
+    Signatures are only run on tickets that have all the artifacts they declare, each artifact is looked up once
+    """
+    logs_tar = FakeLogsTar(
+        {
+            "c_bootstrap_h1.tar/c_bootstrap_h1.tar.gz/logs_host_h1/log-bundle-1.tar.gz/log-bundle-1/resources/nodes.json": "{}"
+        }
+    )
+    metadata = {"cluster": {"id": "cluster-id", "hosts": []}}
+    monkeypatch.setattr(add_triage_signature, "get_metadata_json", lambda url: metadata)
+    monkeypatch.setattr(add_triage_signature, "get_triage_logs_tar", lambda triage_url, cluster_id: logs_tar)
+
+    processed = []
+    for signature_class in add_triage_signature.ALL_SIGNATURES:
+        monkeypatch.setattr(
+            signature_class, "_process_ticket", lambda self, url, issue_key: processed.append(type(self).__name__)
+        )
+
+    add_triage_signature.process_ticket_with_signatures(
+        FakeJiraClient(),
+        "http://logs/files/x/",
+        "AITRIAGE-1",
+        only_specific_signatures=[
+            "ControllerWarnings",
+            "ControllerOperatorStatus",
+            "MustGatherAnalysis",
+            "NodeStatus",
+            "DualStackBadRoute",
+        ],
+        dry_run_file=io.StringIO(),
+    )
+
+    assert sorted(processed) == ["DualStackBadRoute", "NodeStatus"]
+    assert logs_tar.reads == Counter()
+
+
+def test_triage_logs_index():
+    new_layout = add_triage_signature.TriageLogsIndex(
+        FakeLogsTar(
+            {
+                "c_bootstrap_x.tar/c_bootstrap_x.tar.gz/logs_host_h1/log-bundle-1.tar.gz/log-bundle-1/x": "",
+                "c_master_y.tar/c_master_y.tar.gz/logs_host_h2/agent.logs": "",
+                "controller_logs.tar.gz/assisted-installer-controller.logs": "",
+            }
+        )
+    )
+    old_layout = add_triage_signature.TriageLogsIndex(
+        FakeLogsTar(
+            {"c_bootstrap_x.tar.gz/logs_host_h1/agent.logs": "", "c_master_y.tar.gz/logs_host_h2/agent.logs": ""}
+        )
+    )
+
+    assert new_layout.layout == "new"
+    assert new_layout.host_dir("h2") == "c_master_y.tar/c_master_y.tar.gz/logs_host_h2"
+    assert new_layout.log_bundle_path.startswith("c_bootstrap_x.tar/c_bootstrap_x.tar.gz/logs_host_h1/log-bundle-")
+    assert old_layout.layout == "old"
+    assert old_layout.host_dir("h1") == "c_bootstrap_x.tar.gz/logs_host_h1"
+    with pytest.raises(FileNotFoundError):
+        old_layout.host_dir("h3")
+    with pytest.raises(FileNotFoundError):
+        add_triage_signature.TriageLogsIndex(FakeLogsTar({"c_master_y.tar.gz/logs_host_h2/x": ""})).log_bundle_path
@@ -0,0 +1,44 @@
+from archive_cache import ArchiveCache
+
+
+class FakeArchive:
+    def __init__(self, disk_bytes):
+        self.disk_bytes = disk_bytes
+        self.closed = False
+
+    def usage(self):
+        return self.disk_bytes, 0
+
+    def close(self):
+        self.closed = True
+
+
+def test_archive_cache_evicts_unpinned_archives_over_budget():
+    cache = ArchiveCache(max_bytes=100)
+    first, second, third = FakeArchive(60), FakeArchive(30), FakeArchive(30)
+
+    assert cache.acquire("first", lambda: first) is first
+    cache.release("first")
+    with cache.pinned("second", lambda: second), cache.pinned("first", lambda: FakeArchive(60)) as archive:
+        # Cached
+        assert archive is first
+        # Over budget, the only archive that isn't pinned is closed as soon as it's released
+        assert cache.acquire("third", lambda: third) is third
+        assert cache.usage()["pinned"] == 3
+        cache.release("third")
+        assert third.closed and not first.closed and cache.usage()["pinned"] == 2
+
+    # Within budget once the third was evicted
+    assert not first.closed and not second.closed
+    assert cache.usage() == {
+        "archives": 2,
+        "pinned": 0,
+        "disk_bytes": 90,
+        "memory_bytes": 0,
+        "peak_bytes": 120,
+        "max_bytes": 100,
+        "evictions": 1,
+    }
+
+    cache.close()
+    assert first.closed and second.closed and cache.usage()["archives"] == 0
@@ -0,0 +1,27 @@
+import json
+
+import requests
+
+import benchmark_signatures
+
+
+def test_log_server_serves_ranges(tmp_path):
+    (tmp_path / "file").write_bytes(b"0123456789")
+    with benchmark_signatures.log_server(str(tmp_path)) as url:
+        head = requests.head(f"{url}/file")
+        ranged = requests.get(f"{url}/file", headers={"Range": "bytes=2-4"})
+        missing = requests.get(f"{url}/missing")
+
+    assert head.headers["ETag"] and head.headers["Content-Length"] == "10"
+    assert ranged.status_code == 206 and ranged.content == b"234"
+    assert missing.status_code == 404
+
+
+def test_synthetic_cluster_benchmark(tmp_path):
+    signature_names = ["HostsStatusSignature", "InstallationDiskFIOSignature", "FailedRequestTriggersHostTimeout"]
+    results = benchmark_signatures.benchmark([(3, 500, 4096)], signature_names, work_dir=str(tmp_path))
+
+    assert [result["signature"] for result in results] == signature_names + [benchmark_signatures.END_TO_END]
+    for result in results:
+        assert result["seconds"] > 0 and result["peak_bytes"] > 0
+    json.dumps(results)
@@ -0,0 +1,151 @@
+import random
+from collections import Counter
+from types import SimpleNamespace
+
+import close_by_signature
+from add_triage_signature import ALL_SIGNATURES
+from close_by_signature import (
+    Filter,
+    FilterMatcher,
+    candidate_issues_jql_queries,
+    filter_and_generate_issues,
+    filter_jql_clause,
+    get_candidate_issues,
+    jql_text_words,
+)
+
+
+def comment(body):
+    return SimpleNamespace(body=body)
+
+
+def issue(key, status="New"):
+    return SimpleNamespace(key=key, fields=SimpleNamespace(status=SimpleNamespace(name=status)))
+
+
+class CommentsJiraClient:
+    def __init__(self, comments, page_size=2):
+        self._comments = comments
+        self.page_size = page_size
+        self.calls = Counter()
+
+    def search_issues(self, query, maxResults, fields, validate_query):
+        self.calls["search_issues"] += 1
+        keys = query[len("key in (") : -1].split(", ")
+        return [
+            SimpleNamespace(
+                key=key,
+                fields=SimpleNamespace(
+                    comment=SimpleNamespace(
+                        comments=self._comments[key][: self.page_size], total=len(self._comments[key])
+                    )
+                ),
+            )
+            for key in keys
+            if key in self._comments
+        ]
+
+    def comments(self, issue):
+        self.calls["comments"] += 1
+        return self._comments[issue.key]
+
+
+def find_first_filter(filters, comments):
+    for _filter in filters:
+        signature_comment = _filter.signature.find_signature_comment(comments=comments)
+        if signature_comment is not None and (not _filter.message or _filter.message in signature_comment.body):
+            return _filter, signature_comment
+    return None, None
+
+
+def test_matcher_agrees_with_trying_every_filter():
+    rng = random.Random(0)
+    signatures = [signature_class(None, "AITRIAGE-1") for signature_class in ALL_SIGNATURES[:8]]
+    messages = ["", "timed out", "out", "Disk /dev/sda", "certificate"]
+    filters = [Filter(rng.choice(signatures), rng.choice(messages), None) for _ in range(20)]
+    matcher = FilterMatcher(filters)
+
+    fragments = [string for signature in signatures for string in signature.identifying_strings] + messages[1:]
+    for _ in range(300):
+        comments = [
+            comment(" ".join(rng.choices(fragments + ["noise"], k=rng.randrange(1, 4))))
+            for _ in range(rng.randrange(1, 5))
+        ]
+        assert matcher.match(comments) == find_first_filter(filters, comments)
+
+
+def test_comments_are_fetched_in_bulk(monkeypatch):
+    monkeypatch.setattr(close_by_signature, "COMMENTS_SEARCH_BATCH_SIZE", 2)
+    signature = ALL_SIGNATURES[0](None, "AITRIAGE-1")
+    signature_comment = comment(f"{signature.identifying_strings[0]}\nHost timed out")
+    jira_client = CommentsJiraClient(
+        {
+            "AITRIAGE-1": [comment("hello"), signature_comment],
+            "AITRIAGE-2": [comment("hello")],
+            "AITRIAGE-3": [comment("a"), comment("b"), signature_comment],
+        }
+    )
+    issues = [issue("AITRIAGE-1"), issue("AITRIAGE-2"), issue("AITRIAGE-4", status="Closed"), issue("AITRIAGE-3")]
+
+    matched = list(filter_and_generate_issues(jira_client, [Filter(signature, "timed out", None)], issues))
+
+    assert [issue_data.issue.key for issue_data in matched] == ["AITRIAGE-1", "AITRIAGE-3"]
+    assert all(issue_data.comment is signature_comment for issue_data in matched)
+    # One search per batch of open issues, AITRIAGE-3 has more comments than the search returns
+    assert jira_client.calls == {"search_issues": 2, "comments": 1}
+
+
+def test_jql_text_words_are_the_ones_jira_indexes_as_they_are():
+    assert jql_text_words("h1. Invalid SAN values (x509) on v4.12 for api.example.com: AND must-gather") == [
+        "h1",
+        "invalid",
+        "san",
+        "values",
+        "x509",
+        "on",
+        "for",
+        "and",
+    ]
+
+
+def test_candidate_queries_are_chunked(monkeypatch):
+    monkeypatch.setattr(close_by_signature, "MAX_JQL_LENGTH", 600)
+    filters = [
+        Filter(signature_class(None, "AITRIAGE-1"), "failed to pull", None)
+        for signature_class in ALL_SIGNATURES
+        if signature_class(None, "AITRIAGE-1").identifying_strings[0]
+    ]
+
+    queries = candidate_issues_jql_queries(filters, only_recent=True)
+
+    assert len(queries) > 1
+    assert all(len(query) <= 600 for query in queries)
+    assert all("status not in (Closed, Done, Obsolete)" in query and "created >= -31d" in query for query in queries)
+    clauses = dict.fromkeys(filter_jql_clause(_filter) for _filter in filters)
+    assert [sum(clause in query for query in queries) for clause in clauses] == [1] * len(clauses)
+
+
+def test_candidate_issues_fall_back_to_all_open_issues():
+    signature = next(
+        signature
+        for signature in (signature_class(None, "AITRIAGE-1") for signature_class in ALL_SIGNATURES)
+        if not signature.identifying_strings[0]
+    )
+    (query,) = candidate_issues_jql_queries([Filter(signature, "", None)], only_recent=False)
+    assert "comment ~" not in query
+
+
+def test_candidate_issues_are_deduplicated(monkeypatch):
+    monkeypatch.setattr(close_by_signature, "MAX_JQL_LENGTH", 0)
+    searches = []
+
+    class SearchJiraClient:
+        def search_issues(self, query, maxResults, fields):
+            searches.append(query)
+            return [issue("AITRIAGE-1"), issue(f"AITRIAGE-{len(searches) + 1}")]
+
+    filters = [Filter(signature_class(None, "AITRIAGE-1"), "", None) for signature_class in ALL_SIGNATURES[:2]]
+    issues = get_candidate_issues(SearchJiraClient(), filters, only_recent=False)
+
+    assert len(searches) == 2
+    assert [candidate.key for candidate in issues] == ["AITRIAGE-1", "AITRIAGE-2", "AITRIAGE-3"]
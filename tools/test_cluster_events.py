@@ -0,0 +1,56 @@
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+from cluster_events import EventsStore, MessageClassifier, iter_json_array
+
+
+def event(second, message, name="host_event", host_id="h1"):
+    event = {"name": name, "event_time": f"2023-01-01T00:00:{second:02d}.000Z", "message": message}
+    if host_id is not None:
+        event["host_id"] = host_id
+    return event
+
+
+def test_events_store_keeps_last_attempt():
+    classifier = MessageClassifier()
+    classifier.add("fio", r"fdatasync duration: (\d+) ms", literal="fdatasync")
+    events = [
+        event(0, "fdatasync duration: 1 ms"),
+        event(1, "reset", name="cluster_installation_reset", host_id=None),
+        event(2, "cluster installing", name="cluster_status", host_id=None),
+        event(4, "fdatasync duration: 20 ms", host_id="h2"),
+        event(3, "fdatasync duration: 30 ms"),
+        event(5, "rebooting"),
+    ]
+    store = EventsStore.from_events(events, classifier)
+
+    assert (store.attempt_sizes, len(store), store.host_ids) == ([1, 4], 4, ["h2", "h1"])
+    assert store.first_event_time == "2023-01-01T00:00:02.000Z"
+    assert [store.message(row) for row in store.rows(host_id="h1")] == [
+        "fdatasync duration: 30 ms",
+        "rebooting",
+    ]
+    assert list(store.rows(name="cluster_status")) == [0]
+    assert list(store.rows(host_id="h2", name="host_event")) == [1]
+    assert list(store.rows(host_id="h3")) == []
+
+    # Out of order events are returned in time order
+    assert list(store.between("2023-01-01T00:00:03Z", datetime(2023, 1, 1, 0, 0, 5, tzinfo=timezone.utc))) == [2, 1]
+    assert store.time(3) == datetime(2023, 1, 1, 0, 0, 5, tzinfo=timezone.utc)
+
+    assert [(store.host_id(row), match.group(1)) for row, match in store.matches("fio")] == [("h2", "20"), ("h1", "30")]
+    assert [match.group(1) for _row, match in store.matches("fio", host_id="h1")] == ["30"]
+
+
+def test_iter_json_array_parses_chunks():
+    events = [event(second, f"message {second} é") for second in range(10)] + [1.5, [], "x"]
+    content = json.dumps(events, ensure_ascii=False, indent=1).encode()
+    chunks = (content[i : i + 7] for i in range(0, len(content), 7))
+    assert list(iter_json_array(chunks)) == events
+    assert list(iter_json_array([b" [ ", b"]\n"])) == []
+
+    for invalid in (b'[{"a": 1}', b'[{"a": 1},]', b'{"a": 1}', b"[1] 2"):
+        with pytest.raises(ValueError):
+            list(iter_json_array([invalid]))
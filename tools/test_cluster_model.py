@@ -0,0 +1,46 @@
+import json
+
+import cluster_model
+
+
+def test_host_inventory_is_parsed_once(monkeypatch):
+    inventory = {
+        "hostname": "worker-0",
+        "boot": {"current_boot_mode": "uefi"},
+        "system_vendor": {"product_name": "KVM", "manufacturer": "Red Hat", "virtual": True},
+        "disks": [{"name": "vda", "drive_type": "HDD", "bootable": True}],
+        "interfaces": [{"name": "eth0", "mac_address": "52:54:00:00:00:01", "ipv4_addresses": ["10.0.0.2/24"]}],
+        "routes": [{"destination": "0.0.0.0", "gateway": "10.0.0.1", "interface": "eth0", "family": 2}],
+    }
+    cluster = cluster_model.Cluster(
+        {
+            "id": "c1",
+            "high_availability_mode": "None",
+            "machine_networks": [{"cidr": "10.0.0.0/24"}],
+            "hosts": [
+                {"id": "h1", "role": "master", "inventory": json.dumps(inventory)},
+                {"id": "h2", "role": "master", "requested_hostname": "master-1", "inventory": json.dumps({})},
+            ],
+        }
+    )
+
+    parsed = []
+    real_loads = json.loads
+    monkeypatch.setattr(cluster_model.json, "loads", lambda s: parsed.append(s) or real_loads(s))
+
+    host, renamed_host = cluster.hosts
+    assert (host.id, host["role"], host.get("status_info", "")) == ("h1", "master", "")
+    assert host.hostname == "worker-0"
+    assert host.inventory.boot_mode == "uefi"
+    assert host.inventory.system_vendor.product_name == "KVM"
+    assert [(disk.name, disk.drive_type, disk.bootable) for disk in host.inventory.disks] == [("vda", "HDD", True)]
+    assert [interface.ipv6_addresses for interface in host.inventory.interfaces] == [[]]
+    assert [route.gateway for route in host.inventory.routes] == ["10.0.0.1"]
+    assert len(parsed) == 1
+
+    # The requested hostname doesn't need the inventory
+    assert renamed_host.hostname == "master-1"
+    assert len(parsed) == 1
+    assert renamed_host.inventory.boot_mode is None and renamed_host.inventory.disks == ()
+
+    assert cluster.is_sno and cluster.machine_cidrs == ["10.0.0.0/24"]
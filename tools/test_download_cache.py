@@ -0,0 +1,95 @@
+import hashlib
+import os
+import http.server
+import threading
+
+import pytest
+import requests
+
+from download_cache import DownloadCache
+
+
+class ETagHandler(http.server.BaseHTTPRequestHandler):
+    files = {}
+    requests_served = []
+
+    def do_GET(self):
+        content = self.files.get(self.path)
+        if content is None:
+            self.send_error(404)
+            return
+
+        etag = '"' + hashlib.md5(content).hexdigest() + '"'
+        if self.headers.get("If-None-Match") == etag:
+            self.requests_served.append((self.path, 304))
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        self.requests_served.append((self.path, 200))
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def log_server():
+    ETagHandler.files = {}
+    ETagHandler.requests_served = []
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), ETagHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}", ETagHandler
+    server.shutdown()
+
+
+def test_download_cache_revalidates_and_evicts(tmp_path, log_server):
+    url, handler = log_server
+    handler.files = {"/a": b"a" * 100, "/b": b"b" * 100, "/c": b"c" * 100}
+
+    cache = DownloadCache(tmp_path, max_bytes=250)
+    assert cache.get(f"{url}/a") == b"a" * 100
+    assert cache.get(f"{url}/a") == b"a" * 100
+    assert handler.requests_served == [("/a", 200), ("/a", 304)]
+    assert (cache.stats.hits, cache.stats.misses, cache.stats.bytes_saved) == (1, 1, 100)
+
+    # The content changed on the server, the cached copy must not be used
+    handler.files["/a"] = b"A" * 100
+    assert cache.get(f"{url}/a") == b"A" * 100
+
+    cache.get(f"{url}/b")
+    cache.get(f"{url}/c")
+    assert cache.stats.evictions == 1
+    assert len(list((tmp_path / "objects").iterdir())) == 2
+
+    # a was the least recently used, so it was evicted and has to be downloaded again
+    handler.requests_served.clear()
+    cache.get(f"{url}/a")
+    assert handler.requests_served == [("/a", 200)]
+
+    destination = tmp_path / "c.tar"
+    cache.fetch_to(f"{url}/c", destination)
+    assert destination.read_bytes() == b"c" * 100
+
+    with pytest.raises(requests.exceptions.HTTPError):
+        cache.get(f"{url}/missing")
+
+
+def test_download_cache_fetch_to_survives_eviction(tmp_path, log_server):
+    url, handler = log_server
+    handler.files = {"/a": b"a" * 100, "/b": b"b" * 100}
+
+    cache = DownloadCache(tmp_path / "cache", max_bytes=150)
+    destination = cache.mkdtemp() / "a.tar"
+    cache.fetch_to(f"{url}/a", destination)
+
+    # Evicts a, the fetched copy must not be affected
+    cache.get(f"{url}/b")
+    assert cache.stats.evictions == 1
+    assert destination.read_bytes() == b"a" * 100
+    assert os.stat(destination).st_nlink == 1
+    assert not list((tmp_path / "cache" / "tmp").glob("pin-*"))
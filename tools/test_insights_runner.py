@@ -0,0 +1,45 @@
+import subprocess
+import sys
+
+import pytest
+
+from insights_runner import InsightsRunner
+
+# Reports the size of the must-gather, after sleeping for the seconds it starts with
+FAKE_INSIGHTS = (
+    sys.executable,
+    "-c",
+    "import sys, time; data = open(sys.argv[1], 'rb').read(); time.sleep(float(data.split()[0])); print(len(data))",
+)
+
+
+def test_insights_reports_are_cached_by_digest(tmp_path):
+    runner = InsightsRunner(workers=2, timeout=30, cache_dir=tmp_path / "cache", command=FAKE_INSIGHTS)
+    try:
+        first, concurrent = runner.submit(b"0.3 must-gather"), runner.submit(b"0.3 must-gather")
+        # The same must-gather shares the run in progress
+        assert concurrent is first
+        assert first.result().content == b"15\n"
+        assert runner.submit(b"0.3 must-gather").result().content == b"15\n"
+        assert runner.submit(b"0 other must-gather").result().content == b"19\n"
+        assert dict(runner.stats) == {"runs": 2, "cache_hits": 1}
+    finally:
+        runner.close()
+
+    # Cached for later runs
+    runner = InsightsRunner(cache_dir=tmp_path / "cache", command=("false",))
+    try:
+        assert runner.submit(b"0.3 must-gather").result().content == b"15\n"
+    finally:
+        runner.close()
+
+
+def test_insights_runs_time_out(tmp_path):
+    runner = InsightsRunner(timeout=0.2, cache_dir=tmp_path, command=FAKE_INSIGHTS)
+    try:
+        with pytest.raises(subprocess.TimeoutExpired):
+            runner.submit(b"10").result()
+        assert runner.stats["timeouts"] == 1
+        assert list(tmp_path.iterdir()) == []
+    finally:
+        runner.close()
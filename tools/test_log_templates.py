@@ -0,0 +1,56 @@
+from log_templates import WILDCARD, LogTemplateStore, TemplateMiner, tokenize
+
+
+def test_variables_are_masked():
+    assert tokenize("Sending step <free-network-addresses-1a2b3c4d> to 10.0.0.1:6443 after 30s") == [
+        "Sending",
+        "step",
+        "<free-network-addresses-<*>>",
+        "to",
+        WILDCARD,
+        "after",
+        WILDCARD,
+    ]
+
+
+def test_messages_of_a_template_are_grouped():
+    miner = TemplateMiner()
+    first = miner.add("Failed to connect to host master-0 after 3 attempts")
+    assert miner.add("Failed to connect to host worker-1 after 12 attempts") is first
+    other = miner.add("Disk /dev/sda is not eligible for installation")
+
+    assert first is not other
+    assert first.text == "Failed to connect to host <*> after <*> attempts"
+    assert (first.count, other.count) == (2, 1)
+
+
+def test_leaves_are_bounded():
+    miner = TemplateMiner(max_templates_per_leaf=2)
+    for word in ["alpha", "beta", "gamma", "delta"]:
+        miner.add(f"step of host {word} {word} {word} {word}")
+
+    assert len(miner.templates) == 2
+    assert sum(template.count for template in miner.templates) == 4
+
+
+def test_store_counts_other_tickets_and_persists_templates(tmp_path):
+    path = tmp_path / "templates.db"
+    store = LogTemplateStore(path)
+    known = tokenize("Failed to connect to host master-0")
+    store.observe("AITRIAGE-1", "agent.logs", [(known, 3)])
+    store.observe("AITRIAGE-2", "agent.logs", [(tokenize("Failed to connect to host worker-1"), 1)])
+    store.close()
+
+    store = LogTemplateStore(path)
+    history_tickets, (seen, new) = store.observe(
+        "AITRIAGE-1", "agent.logs", [(known, 5), (tokenize("Disk /dev/sda is not eligible"), 1)]
+    )
+    assert history_tickets == 1
+    assert (seen.template.id, seen.previous_tickets) == (0, 1)
+    assert new.previous_tickets == 0
+
+    # Recording a ticket again replaces what was recorded for it
+    history_tickets, (seen,) = store.observe("AITRIAGE-3", "agent.logs", [(known, 1)], record=False)
+    assert (history_tickets, seen.previous_tickets) == (2, 2)
+    history_tickets, _observations = store.observe("AITRIAGE-3", "installer.logs", [(known, 1)])
+    assert history_tickets == 0
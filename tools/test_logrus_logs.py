@@ -0,0 +1,32 @@
+from logrus_logs import LogRecords, parse_line
+
+LOG = (
+    'time="2023-01-01T00:00:00Z" level=info msg="Operator console, statuses: [{Available True}]"\n'
+    "not a logrus line\n"
+    'time="2023-01-01T00:00:01Z" level=warning msg="quoted \\"x\\" and \\\\n" file="x.go:12" func=f\n'
+    'prefix time="2023-01-01T00:00:02Z" level=error msg="Step execution failed (exit code 1)" request_id=1 file=y.go:3\n'
+    'time="2023-01-01T00:00:03Z" level=error msg="unterminated\n'
+)
+
+
+def test_log_records_are_parsed_and_selected():
+    records = LogRecords(LOG)
+
+    assert [(record.time, record.level, record.file) for record in records] == [
+        ("2023-01-01T00:00:00Z", "info", None),
+        ("2023-01-01T00:00:01Z", "warning", "x.go:12"),
+        ("2023-01-01T00:00:02Z", "error", "y.go:3"),
+    ]
+    (warning,) = records.select(level="warning")
+    assert warning.msg == 'quoted \\"x\\" and \\\\n'
+    assert records.line(warning) == LOG.splitlines()[2]
+
+    assert [record.time for record in records.select(prefix="Step execution failed")] == ["2023-01-01T00:00:02Z"]
+    assert [record.level for record in records.select(contains="Operator ")] == ["info"]
+    assert list(records.select(level="debug")) == []
+
+
+def test_parse_line():
+    record = parse_line(LOG.splitlines()[3])
+    assert (record.level, record.msg, record.file) == ("error", "Step execution failed (exit code 1)", "y.go:3")
+    assert parse_line("not a logrus line") is None
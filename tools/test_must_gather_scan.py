@@ -0,0 +1,43 @@
+import yaml
+
+import must_gather_scan
+from add_triage_signature import ErrorCreatingReadWriteLayer
+
+
+def pod(namespace, name, reason="ContainerCreating", message=""):
+    return {
+        "metadata": {"namespace": namespace, "name": name},
+        "status": {"containerStatuses": [{"state": {"waiting": {"reason": reason, "message": message}}}]},
+    }
+
+
+def test_bad_pods_scan_only_parses_candidate_files(tmp_path, monkeypatch):
+    namespaces = {
+        "openshift-etcd": [pod("openshift-etcd", "etcd-0")],
+        "openshift-apiserver": [
+            pod(
+                "openshift-apiserver",
+                "apiserver-0",
+                "CreateContainerError",
+                "error creating read-write layer with ID x",
+            ),
+            pod("openshift-apiserver", "apiserver-1", "CreateContainerError", "no such image"),
+        ],
+        "openshift-dns": [
+            pod("openshift-dns", "dns-0", "CreateContainerError", "error creating read-write layer with ID y")
+        ],
+    }
+    for namespace, pods in namespaces.items():
+        (tmp_path / namespace / "core").mkdir(parents=True)
+        (tmp_path / namespace / "core" / "pods.yaml").write_text(yaml.safe_dump({"items": pods}))
+    (tmp_path / "no-pods" / "core").mkdir(parents=True)
+
+    parsed = []
+    load = yaml.load
+    monkeypatch.setattr(
+        must_gather_scan.yaml, "load", lambda content, Loader: parsed.append(content) or load(content, Loader)
+    )
+
+    bad_pods = list(ErrorCreatingReadWriteLayer._get_bad_pods(tmp_path))
+    assert [bad_pod["metadata"]["name"] for bad_pod in bad_pods] == ["apiserver-0", "dns-0"]
+    assert len(parsed) == 2
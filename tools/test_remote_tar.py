@@ -0,0 +1,163 @@
+import http.server
+import io
+import os
+import re
+import tarfile
+import tempfile
+import threading
+
+import pytest
+import requests
+
+from remote_tar import LocalNestedArchive, RangeRemoteArchive
+
+
+def make_tar(members, compression=""):
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode=f"w:{compression}") as tar:
+        for name, content in members.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(content)
+            tar.addfile(info, io.BytesIO(content))
+    return buffer.getvalue()
+
+
+class RangeHandler(http.server.BaseHTTPRequestHandler):
+    content = b""
+    support_ranges = True
+    bytes_served = 0
+
+    def do_GET(self):
+        if self.content is None:
+            self.send_error(404)
+            return
+
+        range_match = re.match(r"bytes=(\d+)-(\d+)", self.headers.get("Range", ""))
+        if self.support_ranges and range_match:
+            start, end = int(range_match.group(1)), min(int(range_match.group(2)), len(self.content) - 1)
+            body = self.content[start : end + 1]
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(self.content)}")
+        else:
+            body = self.content
+            self.send_response(200)
+
+        type(self).bytes_served += len(body)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def cluster_logs_tar_url():
+    host_tar = make_tar({"host1.tar.gz": make_tar({"logs_host_h1/agent.logs": b"agent log line\n"}, compression="gz")})
+    controller_logs = make_tar({"assisted-installer-controller-abc.logs": b"controller log line\n"}, compression="gz")
+    RangeHandler.content = make_tar(
+        {
+            "controller_logs.tar.gz": controller_logs,
+            "padding.bin": b"\0" * 4 * 1024**2,
+            "host1.tar": host_tar,
+            "dir/nodes.json": b"{}",
+        }
+    )
+    RangeHandler.bytes_served = 0
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), RangeHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}/cluster_logs.tar"
+    server.shutdown()
+
+
+@pytest.mark.parametrize("support_ranges", [True, False])
+def test_range_remote_archive(cluster_logs_tar_url, support_ranges, monkeypatch):
+    monkeypatch.setattr(RangeHandler, "support_ranges", support_ranges)
+    archive = RangeRemoteArchive(cluster_logs_tar_url)
+    try:
+        assert archive.supports_ranges == support_ranges
+        assert archive.get("controller_logs.tar.gz/assisted-installer-controller-*.logs") == "controller log line\n"
+        assert archive.get("*.tar/*.tar.gz/logs_host_h1/agent.logs") == "agent log line\n"
+        assert archive.get("dir/nodes.json", mode="rb") == b"{}"
+        assert (archive.get("dir") / "nodes.json").read_text() == "{}"
+
+        with pytest.raises(FileNotFoundError):
+            archive.get("*.tar/*.tar.gz/logs_host_h2/agent.logs")
+    finally:
+        archive.close()
+
+    if support_ranges:
+        # The padding member is never requested, so it should never be downloaded
+        assert RangeHandler.bytes_served < 1024**2
+    else:
+        assert RangeHandler.bytes_served == len(RangeHandler.content)
+
+
+class CountingLimiter:
+    def __init__(self):
+        self.entered = 0
+
+    def __enter__(self):
+        self.entered += 1
+
+    def __exit__(self, *args):
+        pass
+
+
+def test_range_remote_archive_fetches_only_the_requested_host(cluster_logs_tar_url, monkeypatch):
+    def host_tar(host_id):
+        # Random, so it doesn't compress away
+        agent_logs = os.urandom(512 * 1024).hex().encode()
+        return make_tar(
+            {f"host{host_id}.tar.gz": make_tar({f"logs_host_h{host_id}/agent.logs": agent_logs}, compression="gz")}
+        )
+
+    monkeypatch.setattr(RangeHandler, "content", make_tar({f"host{i}.tar": host_tar(i) for i in range(20)}))
+    limiter = CountingLimiter()
+    archive = RangeRemoteArchive(cluster_logs_tar_url, limiter=limiter)
+    try:
+        assert len(archive.get("*.tar/*.tar.gz/logs_host_h17/agent.logs")) == 1024 * 1024
+    finally:
+        archive.close()
+
+    assert archive.stats["bytes_fetched"] < len(RangeHandler.content) / 4
+    assert limiter.entered == archive.stats["requests"]
+
+
+def test_range_remote_archive_cleans_up_missing_archive(cluster_logs_tar_url, monkeypatch):
+    monkeypatch.setattr(RangeHandler, "content", None)
+    tmpdirs_before = set(os.listdir(tempfile.gettempdir()))
+    with pytest.raises(requests.exceptions.HTTPError):
+        RangeRemoteArchive(cluster_logs_tar_url)
+    assert set(os.listdir(tempfile.gettempdir())) <= tmpdirs_before
+
+
+def test_nested_archive_index(tmp_path):
+    log_bundle = make_tar({"log-bundle-1/control-plane/10.0.0.1/rpm-ostree/status": b"pivot://x"}, compression="gz")
+    bootstrap_logs = make_tar(
+        {"logs_host_h1/agent.logs": b"agent", "logs_host_h1/log-bundle-1.tar.gz": log_bundle}, compression="gz"
+    )
+    master_logs = make_tar({"logs_host_h2/agent.logs": b"agent"}, compression="gz")
+    (tmp_path / "logs.tar").write_bytes(
+        make_tar(
+            {"c_bootstrap_x.tar": make_tar({"c_bootstrap_x.tar.gz": bootstrap_logs}), "c_master_y.tar.gz": master_logs}
+        )
+    )
+
+    archive = LocalNestedArchive(tmp_path / "logs.tar", tmpdir=tmp_path / "tmp")
+    node_dirs = "*.tar/*.tar.gz/logs_host_*/log-bundle-*.tar.gz/log-bundle-*/control-plane/*"
+    try:
+        assert archive.root_member_names() == ["c_bootstrap_x.tar", "c_master_y.tar.gz"]
+        assert archive.glob("*.tar/*.tar.gz") == ["c_bootstrap_x.tar/c_bootstrap_x.tar.gz"]
+        assert archive.root_dir("c_master_y.tar.gz") == "logs_host_h2"
+        assert archive.glob(node_dirs) == [
+            "c_bootstrap_x.tar/c_bootstrap_x.tar.gz/logs_host_h1/log-bundle-1.tar.gz/log-bundle-1/control-plane/10.0.0.1"
+        ]
+        assert archive.get(f"{node_dirs}/rpm-ostree/status") == "pivot://x"
+        # The master's archive was only peeked at, and the nested archives were only extracted once
+        assert len(list((tmp_path / "tmp" / "extracted").iterdir())) == 2
+        disk_bytes, memory_bytes = archive.usage()
+        assert disk_bytes == len(b"agent" + b"pivot://x") + len(log_bundle)
+        assert memory_bytes > 0
+    finally:
+        archive.close()
@@ -0,0 +1,38 @@
+import json
+import threading
+
+from run_metrics import RunMetrics
+
+
+def test_run_metrics_report(tmp_path):
+    metrics = RunMetrics()
+    with metrics.measure("AITRIAGE-1", "SlowSignature"):
+        metrics.count("archive_bytes", 1024)
+        metrics.count("jira_reads")
+        sum(range(100000))
+    with metrics.measure("AITRIAGE-2", "SlowSignature"):
+        metrics.count("jira_writes", 2)
+
+    # Counts outside of a measurement, or from other threads, aren't attributed
+    metrics.count("jira_reads")
+    thread = threading.Thread(target=metrics.count, args=("jira_reads",))
+    thread.start()
+    thread.join()
+
+    totals = metrics.by_signature()["SlowSignature"]
+    assert (totals["tickets"], totals["archive_bytes"], totals["jira_reads"], totals["jira_writes"]) == (2, 1024, 1, 2)
+    assert totals["cpu_seconds"] > 0
+    assert "SlowSignature" in metrics.slowest_table()
+
+    metrics.set_gauge("archive_cache_disk_bytes", 2048)
+    metrics.write_json_report(tmp_path / "report.json")
+    report = json.loads((tmp_path / "report.json").read_text())
+    assert report["tickets"] == 2
+    assert report["gauges"] == {"archive_cache_disk_bytes": 2048}
+    assert [run["issue_key"] for run in report["runs"]] == ["AITRIAGE-1", "AITRIAGE-2"]
+
+    metrics.write_prometheus_textfile(tmp_path / "metrics.prom")
+    textfile = (tmp_path / "metrics.prom").read_text()
+    assert 'triage_signature_jira_writes{signature="SlowSignature"} 2\n' in textfile
+    assert "triage_run_tickets 2\n" in textfile
+    assert "triage_archive_cache_disk_bytes 2048\n" in textfile
@@ -0,0 +1,37 @@
+from datetime import datetime, timezone
+
+from signature_results import SignatureResultsStore, main, parse_args
+
+
+def test_hits_are_filtered_by_age_and_summarized(tmp_path, capsys):
+    store = SignatureResultsStore(tmp_path / "results.db")
+    store.put_ticket("AITRIAGE-1", cluster_id="c1", domain="example.com", created_at="2023-01-10T10:00:00.000+0000")
+    store.put_ticket("AITRIAGE-2", cluster_id="c2", domain="redhat.com", created_at="2023-01-01T10:00:00.000+0200")
+    store.put_result("AITRIAGE-1", "AgentStepFailureSignature", "report", ["SIGNATURE_agent_step"])
+    store.put_result("AITRIAGE-2", "AgentStepFailureSignature", "other report")
+    store.put_result("AITRIAGE-2", "SkipDisks")
+
+    now = datetime(2023, 1, 12, tzinfo=timezone.utc)
+    assert [hit["issue_key"] for hit in store.hits("AgentStepFailureSignature", now=now)] == [
+        "AITRIAGE-1",
+        "AITRIAGE-2",
+    ]
+    (hit,) = store.hits("AgentStepFailureSignature", days=7, now=now)
+    assert (hit["issue_key"], hit["created_at"], hit["labels"]) == (
+        "AITRIAGE-1",
+        "2023-01-10T10:00:00+00:00",
+        "SIGNATURE_agent_step",
+    )
+    assert store.hits("SkipDisks") == []
+    assert store.summary() == [
+        {"signature": "AgentStepFailureSignature", "matched": 2, "ran": 2},
+        {"signature": "SkipDisks", "matched": 0, "ran": 1},
+    ]
+    store.close()
+
+    main(
+        parse_args(
+            ["--db", str(tmp_path / "results.db"), "hits", "AgentStepFailureSignature", "--domain", "redhat.com"]
+        )
+    )
+    assert "AITRIAGE-2" in capsys.readouterr().out
@@ -0,0 +1,64 @@
+import random
+
+import pytest
+from fuzzywuzzy import fuzz
+
+from similarity_groups import SimilarityGroups, group_similar_strings, indel_distance, is_similar
+
+TEMPLATES = [
+    "Host failed to install due to timeout while connecting to host {n}",
+    "Host is not reachable on {ip}, failed to connect after {n} attempts",
+    "Failed to pull image quay.io/openshift/release@sha256:{h} {n}",
+    "error: {h} disk /dev/sd{c} is not eligible",
+]
+
+
+def exhaustive_group_similar_strings(items, ratio):
+    groups = []
+    for item in items:
+        for group in groups:
+            if all(fuzz.ratio(item, w) > ratio for w in group):
+                group.append(item)
+                break
+        else:
+            groups.append([item])
+    return groups
+
+
+def synthetic_strings(count, seed=0):
+    rng = random.Random(seed)
+    return [
+        rng.choice(TEMPLATES).format(
+            n=rng.randrange(1000),
+            ip=f"10.0.{rng.randrange(4)}.{rng.randrange(256)}",
+            h=f"{rng.getrandbits(32):08x}",
+            c=rng.choice("abc"),
+        )
+        for _ in range(count)
+    ]
+
+
+def test_docstring_example():
+    assert group_similar_strings(["rakesh", "zakesh", "goldman LLC", "oldman LLC", "bakesh"], 60) == [
+        ["rakesh", "zakesh", "bakesh"],
+        ["goldman LLC", "oldman LLC"],
+    ]
+
+
+@pytest.mark.parametrize("ratio", [50, 80, 90, 97])
+def test_groups_match_exhaustive_grouping(ratio):
+    items = synthetic_strings(600) + ["", "", "x"]
+    random.Random(1).shuffle(items)
+    groups = SimilarityGroups(ratio)
+    groups.extend(items)
+
+    assert groups.groups == exhaustive_group_similar_strings(items, ratio)
+
+
+def test_distances_agree_with_fuzz_ratio():
+    items = synthetic_strings(50, seed=2) + ["a", "ab"]
+    for a in items:
+        for b in items:
+            if a != b:
+                distance = indel_distance(a, b)
+                assert is_similar(distance, len(a) + len(b), 79.5) == (fuzz.ratio(a, b) > 79.5)
@@ -0,0 +1,62 @@
+"""
+Local state of previous add_triage_signature runs, used to skip signatures
+whose inputs haven't changed since they last ran on a ticket.
+
+For every (ticket, signature) pair, the store records which ticket inputs the
+signature consumed and a fingerprint of those inputs together with the
+version of the signature code.
+"""
+import sqlite3
+import threading
+from datetime import datetime
+
+
+class SignatureRunState:
+    def __init__(self, inputs, fingerprint, updated_at):
+        self.inputs = inputs
+        self.fingerprint = fingerprint
+        self.updated_at = updated_at
+
+
+class TriageStateStore:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._db:
+            self._db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS signature_runs (
+                    issue_key TEXT NOT NULL,
+                    signature TEXT NOT NULL,
+                    inputs TEXT NOT NULL,
+                    fingerprint TEXT NOT NULL,
+                    updated_at TEXT NOT NULL,
+                    PRIMARY KEY (issue_key, signature)
+                )
+                """
+            )
+
+    def get(self, issue_key, signature_name):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT inputs, fingerprint, updated_at FROM signature_runs WHERE issue_key = ? AND signature = ?",
+                (issue_key, signature_name),
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        inputs, fingerprint, updated_at = row
+        return SignatureRunState(inputs.split(",") if inputs else [], fingerprint, updated_at)
+
+    def put(self, issue_key, signature_name, inputs, fingerprint):
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO signature_runs VALUES (?, ?, ?, ?, ?)",
+                (issue_key, signature_name, ",".join(inputs), fingerprint, datetime.utcnow().isoformat()),
+            )
+
+    def close(self):
+        with self._lock:
+            self._db.close()